@@ -0,0 +1,144 @@
+# Quantized Art Frames: compact binary encoding of art-mode frames
+#
+# A frame is the point list of ArtMode.as_points(): positions quantized to int16
+# (1/1000 of a scene unit), sizes to uint8 (8 x the marker diameter, i.e. the
+# square root of matplotlib's area in points^2) and colours to uint8 indices
+# into a 256-entry palette. Keyframes carry the values themselves; delta frames
+# carry the difference to the previous frame, and second-order delta frames
+# the change of that difference (near zero for steady motion such as a
+# rotation). All arithmetic wraps, so decoding is exact.
+#
+# Layout (little-endian): kind (uint8, 0 key / 1 delta / 2 second-order delta), 3 padding bytes,
+# frame number (uint32), point count N (uint32), then N x 2 int16 positions,
+# N uint8 sizes and N uint8 colours.
+#
+# A delta is as long as a keyframe; it pays off once compressed, as its
+# bytes are mostly small repeated values. compress() deflates a frame behind a
+# COMPRESSED marker byte (zlib format, which browsers inflate with
+# DecompressionStream('deflate')).
+import struct
+import zlib
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgb
+
+HEADER = struct.Struct('<BxxxII')
+KEYFRAME, DELTA, DELTA2 = 0, 1, 2
+COMPRESSED = 0x80  # first byte of a compressed frame (never a frame kind)
+FIELDS = ('xy', 'size', 'color')
+POSITION_SCALE = 1000.0
+SIZE_SCALE = 8.0
+
+# Indicator colours of points without colour values (same scheme as the enhanced panel)
+INDICATOR_COLORS = {
+    'ph': '#FF6B6B', 'Hardness': '#4ECDC4', 'Solids': '#45B7D1', 'Chloramines': '#96CEB4',
+    'Sulfate': '#FFD93D', 'Conductivity': '#A8E6CF', 'Organic_carbon': '#FF8B94',
+    'Trihalomethanes': '#B4A7D6', 'Turbidity': '#D4A574',
+}
+
+
+def palette_rgb(palette, color='#888888'):
+    """(256, 3) uint8 colours of a colour map name, or 256 copies of one colour"""
+    if palette is None:
+        rgb = np.tile(to_rgb(color), (256, 1))
+    else:
+        rgb = plt.get_cmap(palette)(np.arange(256))[:, :3]
+    return np.round(rgb * 255).astype(np.uint8)
+
+
+def compress(data, level=1):
+    """A key or delta frame deflated for sending"""
+    return bytes([COMPRESSED]) + zlib.compress(data, level)
+
+
+class FrameEncoder:
+    """Quantizes frames into reused buffers and encodes them as key or delta frames"""
+
+    def __init__(self):
+        self.n = None
+        self.frame = -1
+
+    def _reset(self, n):
+        self.n = n
+        self.current = np.zeros(n, dtype=[('xy', np.int16, 2), ('size', np.uint8), ('color', np.uint8)])
+        self.previous = np.zeros_like(self.current)
+        self.step = np.zeros_like(self.current)  # current - previous
+        self.prior_step = np.zeros_like(self.current)
+        self.xy = np.empty((n, 2))
+        self.sizes = np.empty(n)
+
+    def update(self, offsets, sizes, values=None):
+        """Quantize the next frame; a different point count starts from scratch"""
+        n = len(offsets)
+        if n != self.n:
+            self._reset(n)
+        self.previous, self.current = self.current, self.previous
+        cur = self.current
+        np.multiply(offsets, POSITION_SCALE, out=self.xy)
+        np.clip(self.xy, -32767, 32767, out=self.xy)
+        cur['xy'] = np.rint(self.xy)
+        np.sqrt(np.broadcast_to(sizes, (n,)), out=self.sizes)
+        self.sizes *= SIZE_SCALE
+        np.clip(self.sizes, 0, 255, out=self.sizes)
+        cur['size'] = np.rint(self.sizes)
+        cur['color'] = 0 if values is None else np.clip(np.asarray(values) * 256, 0, 255)
+        self.prior_step, self.step = self.step, self.prior_step
+        for field in FIELDS:
+            np.subtract(cur[field], self.previous[field], out=self.step[field])
+        self.frame += 1
+
+    def keyframe(self):
+        """The current frame as self-contained bytes"""
+        cur = self.current
+        return b''.join([HEADER.pack(KEYFRAME, self.frame, self.n), cur['xy'].tobytes(),
+                         cur['size'].tobytes(), cur['color'].tobytes()])
+
+    def delta(self):
+        """The current frame as a difference to the previous one"""
+        return b''.join([HEADER.pack(DELTA, self.frame, self.n)] + [self.step[f].tobytes() for f in FIELDS])
+
+    def delta2(self):
+        """The current frame as the change of the previous frame's difference"""
+        return b''.join([HEADER.pack(DELTA2, self.frame, self.n)] +
+                        [(self.step[f] - self.prior_step[f]).tobytes() for f in FIELDS])
+
+
+class FrameDecoder:
+    """Rebuilds the quantized frames from a stream of key and delta frames"""
+
+    def __init__(self):
+        self.frame = None
+        self.xy = self.sizes = self.colors = None
+        self.step = None  # last applied difference (xy, sizes, colours)
+
+    def decode(self, data):
+        """Apply one encoded (or compressed) frame; returns (xy int16, sizes uint8, colours uint8)"""
+        if data[0] == COMPRESSED:
+            data = zlib.decompress(memoryview(data)[1:])
+        kind, frame, n = HEADER.unpack_from(data)
+        xy = np.frombuffer(data, np.int16, 2 * n, HEADER.size).reshape(n, 2)
+        sizes = np.frombuffer(data, np.uint8, n, HEADER.size + 4 * n)
+        colors = np.frombuffer(data, np.uint8, n, HEADER.size + 5 * n)
+        if kind == KEYFRAME:
+            self.xy, self.sizes, self.colors = xy.copy(), sizes.copy(), colors.copy()
+            self.step = None
+        elif self.frame is None or frame != self.frame + 1 or len(self.xy) != n:
+            raise ValueError(f'delta frame {frame} does not follow frame {self.frame}')
+        elif kind == DELTA:
+            self.step = (xy.copy(), sizes.copy(), colors.copy())
+        elif self.step is None:
+            raise ValueError(f'second-order delta frame {frame} follows no delta frame')
+        else:
+            for step, change in zip(self.step, (xy, sizes, colors)):
+                step += change
+        if kind != KEYFRAME:
+            self.xy += self.step[0]
+            self.sizes += self.step[1]
+            self.colors += self.step[2]
+        self.frame = frame
+        return self.xy, self.sizes, self.colors
+
+
+def dequantize(xy, sizes):
+    """Scene positions and matplotlib marker areas of quantized points"""
+    return xy / POSITION_SCALE, (sizes / SIZE_SCALE) ** 2
@@ -0,0 +1,729 @@
+# Art Mode Registry: every art mode of the interactive panels as a plugin class
+#
+# A mode computes its scene geometry once in a vectorized layout(data, rng),
+# and writes frame t into preallocated buffers in step(t, out). Only draw()
+# (create the matplotlib artists) and apply(out) (push the buffers into them)
+# touch matplotlib, so layout/step also run headless; as_points(out) gives a
+# headless renderer the frame as plain points. show_only(keep) restricts the
+# drawn points to a subset of the data; apply() then gathers the visible
+# points' buffers through shown(). Each mode declares:
+#
+#   supports_blit  apply() returns every artist that changes between frames
+#   stateless      step(t) depends only on t, so frames can run in any order
+#   max_points     cap on the number of drawn samples (None: all of them)
+#   fed            layout entries that follow new data from a time-series
+#                  source (None: all of them, (): the mode ignores fed data)
+#
+# Modes register under a family ('classic' for interactive_water_art.py and
+# _v2.py, 'enhanced' for the enhanced panel); a ModeEngine hosts one family.
+from collections import OrderedDict
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Circle
+
+MODES = {}
+
+
+def register_mode(family):
+    """Class decorator adding an ArtMode to a family, in display order"""
+    def decorator(cls):
+        MODES.setdefault(family, {})[cls.name] = cls
+        return cls
+    return decorator
+
+
+def rotate(x, y, angle, out):
+    """Rotate points by angle into an (N, 2) buffer"""
+    cos_a, sin_a = np.cos(angle), np.sin(angle)
+    np.multiply(x, cos_a, out=out[:, 0])
+    out[:, 0] -= y * sin_a
+    np.multiply(x, sin_a, out=out[:, 1])
+    out[:, 1] += y * cos_a
+    return out
+
+
+class ArtMode:
+    """Base class: layout/step are pure NumPy, draw/apply talk to matplotlib"""
+
+    name = None
+    label = None
+    title = None
+    supports_blit = True
+    stateless = True
+    max_points = None
+    fed = None
+    palette = None  # colour map of the values returned by as_points() (None: the indicator's colour)
+
+    def __init__(self):
+        self.state = None
+        self.points = None  # main point scatter, if any (used by transitions)
+        self.rows = None    # positions in the data array of its points
+        self.visible = None  # positions in rows of the points drawn (None: all of them)
+        self.hidden = None   # data positions left out of line modes (None: none)
+        self._full = None
+        self._shown = {}
+
+    def select(self, data):
+        """Evenly spaced sample positions, at most max_points of them"""
+        n = len(data) if self.max_points is None else min(len(data), self.max_points)
+        return np.linspace(0, len(data) - 1, n, dtype=int)
+
+    def layout(self, data, rng):
+        """Scene geometry for normalized (0-1) data, as a dict of arrays"""
+        raise NotImplementedError
+
+    def feed(self, data, rng):
+        """Follow new data of the same length, keeping the motion state
+
+        The state dict is replaced, never written into, as stateless modes
+        share theirs with the engine's layout cache.
+        """
+        if self.fed == ():
+            return
+        fresh = self.layout(data, rng)
+        self.state = {**self.state, **(fresh if self.fed is None else {k: fresh[k] for k in self.fed})}
+
+    def allocate(self):
+        """Per-frame output buffers, sized for the current layout"""
+        raise NotImplementedError
+
+    def step(self, t, out):
+        """Write frame t into the buffers"""
+        raise NotImplementedError
+
+    def draw(self, ax, panel):
+        """Create this scene's artists on ax (panel provides colours and data hooks)"""
+        raise NotImplementedError
+
+    def apply(self, out):
+        """Push the buffers into the artists; return the artists that changed"""
+        raise NotImplementedError
+
+    def as_points(self, out):
+        """Frame out as (offsets (N, 2), sizes (N,), colour values in 0-1 or None)"""
+        raise NotImplementedError
+
+    def filtered_artists(self):
+        """Scatters with one point per entry of rows, which show_only() subsets"""
+        return [] if self.points is None else [self.points]
+
+    def faded_artists(self, ax):
+        """What draw() put on ax besides the point scatter, which transitions fade in"""
+        return [a for a in (*ax.lines, *ax.collections, *ax.patches) if a is not self.points]
+
+    def show_only(self, keep):
+        """Draw only the data positions where the boolean mask keep is True (None: all)
+
+        The artists' static properties are gathered here, once per filter
+        change; apply() gathers the per-frame buffers through shown().
+        """
+        if self.rows is None:
+            self.hidden = None if keep is None else np.flatnonzero(~keep)
+            return
+        artists = self.filtered_artists()
+        if self._full is None or [entry[0] for entry in self._full] != artists:
+            # Full-length properties of freshly drawn artists
+            self._full = [(a, np.asarray(a.get_offsets()).copy(), a.get_facecolors().copy(),
+                           a.get_edgecolors().copy(), np.asarray(a.get_linewidths()).copy(),
+                           np.asarray(a.get_sizes()).copy()) for a in artists]
+        self.visible = None if keep is None else np.flatnonzero(keep[self.rows])
+        n = len(self.rows)
+
+        def pick(values):
+            return values if self.visible is None or len(values) != n else values[self.visible]
+        for artist, offsets, faces, edges, widths, sizes in self._full:
+            artist.set_offsets(pick(offsets))
+            artist.set_facecolors(pick(faces))
+            artist.set_edgecolors(pick(edges))
+            artist.set_linewidths(pick(widths))
+            artist.set_sizes(pick(sizes))
+
+    def shown(self, name, values):
+        """values of the visible points, gathered into a reused buffer (values itself when unfiltered)"""
+        if self.visible is None:
+            return values
+        k = len(self.visible)
+        buffer = self._shown.get(name)
+        if buffer is None or buffer.shape[1:] != values.shape[1:] or len(buffer) < k:
+            buffer = self._shown[name] = np.empty(values.shape, dtype=values.dtype)
+        return np.take(values, self.visible, axis=0, out=buffer[:k])
+
+
+def line_points(x, ys, out):
+    """Points along several lines sharing x, written to an (lines * N, 2) buffer"""
+    n = len(x)
+    for i, y in enumerate(ys):
+        out[i*n:(i+1)*n, 0] = x
+        out[i*n:(i+1)*n, 1] = y
+    return out
+
+
+class ModeEngine:
+    """Hosts the modes of one family: preloaded instances and a warm layout cache
+
+    activate() lays a mode out (or reuses a cached layout for the same key),
+    allocates its frame buffers once, and step() then runs the active mode
+    without any per-frame lookup by name.
+    """
+
+    def __init__(self, family, cache_size=8):
+        self.modes = {name: cls() for name, cls in MODES[family].items()}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.active = None
+        self.out = None
+        self.t = 0
+
+    def _layout(self, name, data, rng, key):
+        cache_key = None if key is None else (name, key)
+        state = self.cache.get(cache_key) if cache_key is not None else None
+        if state is None:
+            state = self.modes[name].layout(data, rng)
+            if cache_key is not None:
+                self.cache[cache_key] = state
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(cache_key)
+        return state
+
+    def preload(self, data, rng_factory, key, names=None):
+        """Warm the layout cache of several modes for the same data"""
+        for name in names or self.modes:
+            self._layout(name, data, rng_factory(), key)
+
+    def activate(self, name, data, rng, key=None):
+        """Make a mode current for the given data; returns the mode"""
+        mode = self.modes[name]
+        state = self._layout(name, data, rng, key)
+        # Stateful modes advance their layout arrays in place, so they get a copy
+        mode.state = state if mode.stateless else {k: np.copy(v) for k, v in state.items()}
+        mode.visible = mode.hidden = None
+        self.active = mode
+        self.out = mode.allocate()
+        self.t = 0
+        return mode
+
+    def feed(self, data, rng):
+        """Pass the active mode the next values of a time-series source"""
+        self.active.feed(data, rng)
+
+    def step(self):
+        """Advance the active mode one frame; returns its buffers"""
+        self.t += 1
+        self.active.step(self.t, self.out)
+        return self.out
+
+
+# Classic modes (interactive_water_art.py and interactive_water_art_v2.py)
+
+@register_mode('classic')
+class ClassicGalaxy(ArtMode):
+    name, label, title = 'galaxy', 'Galaxy', 'Galaxy Mode'
+
+    def layout(self, data, rng):
+        n = len(data)
+        t = np.linspace(0, 4 * np.pi, n)
+        r = 1 + 3 * data
+        return {'x': r * np.cos(t) + rng.normal(0, 0.2, n),
+                'y': r * np.sin(t) + rng.normal(0, 0.2, n),
+                'sizes': data * 60 + 20}
+
+    def allocate(self):
+        return {'offsets': np.empty((len(self.state['x']), 2))}
+
+    def step(self, t, out):
+        rotate(self.state['x'], self.state['y'], t * 0.02, out['offsets'])
+
+    def draw(self, ax, panel):
+        s = self.state
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        self.scatter = ax.scatter(s['x'], s['y'], s=s['sizes'], c=color,
+                                  alpha=0.7, edgecolors='white', linewidths=0.5)
+        ax.add_patch(Circle((0, 0), 0.8, color='black', alpha=0.8))
+        self.points, self.rows = self.scatter, np.arange(len(s['x']))
+
+    def apply(self, out):
+        self.scatter.set_offsets(self.shown('offsets', out['offsets']))
+        return [self.scatter]
+
+    def as_points(self, out):
+        return out['offsets'], self.state['sizes'], None
+
+
+@register_mode('classic')
+class ClassicParticle(ArtMode):
+    name, label, title = 'particle', 'Particle', 'Particle Mode'
+    stateless = False
+    fed = ('sizes',)  # positions and velocities keep bouncing
+
+    def layout(self, data, rng):
+        n = len(data)
+        x = rng.uniform(-8, 8, n)
+        y = rng.uniform(-6, 6, n)
+        return {'x': x, 'y': y, 'vx': (data - 0.5) * 0.2, 'vy': rng.uniform(-0.1, 0.1, n),
+                'sizes': data * 40 + 10}
+
+    def allocate(self):
+        return {'offsets': np.empty((len(self.state['x']), 2))}
+
+    def step(self, t, out):
+        s = self.state
+        s['x'] += s['vx']
+        s['y'] += s['vy']
+        # Boundary bounce
+        s['vx'][(s['x'] < -8) | (s['x'] > 8)] *= -1
+        s['vy'][(s['y'] < -6) | (s['y'] > 6)] *= -1
+        out['offsets'][:, 0] = s['x']
+        out['offsets'][:, 1] = s['y']
+
+    def draw(self, ax, panel):
+        s = self.state
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        self.scatter = ax.scatter(s['x'], s['y'], s=s['sizes'], c=color, alpha=0.8)
+        self.points, self.rows = self.scatter, np.arange(len(s['x']))
+
+    def apply(self, out):
+        self.scatter.set_offsets(self.shown('offsets', out['offsets']))
+        # Sizes follow fed data (feed() replaces them)
+        self.scatter.set_sizes(self.shown('sizes', self.state['sizes']))
+        return [self.scatter]
+
+    def as_points(self, out):
+        return out['offsets'], self.state['sizes'], None
+
+
+@register_mode('classic')
+class ClassicWave(ArtMode):
+    name, label, title = 'wave', 'Wave', 'Wave Mode'
+
+    def layout(self, data, rng):
+        x = np.linspace(-10, 10, len(data))
+        # Phase offsets and amplitudes of the main wave and the three extra layers
+        return {'x': x, 'base_y': (data - 0.5) * 4,
+                'phase': np.array([0, 0, np.pi / 3, 2 * np.pi / 3]),
+                'amplitude': np.array([2.0, 1.5, 1.2, 0.9])}
+
+    def allocate(self):
+        n = len(self.state['x'])
+        return {'y': np.empty((4, n)), 'points': np.empty((4 * n, 2)), 'sizes': np.full(4 * n, 6.0)}
+
+    def step(self, t, out):
+        s = self.state
+        np.sin(s['x'] * 0.5 + t * 0.2 + s['phase'][:, None], out=out['y'])
+        out['y'] *= s['amplitude'][:, None]
+        out['y'] += s['base_y']
+
+    def draw(self, ax, panel):
+        s = self.state
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        self.lines = [ax.plot(s['x'], s['base_y'], color=color, linewidth=3, alpha=0.9)[0]]
+        for i in range(3):
+            self.lines.append(ax.plot(s['x'], s['base_y'] + i*0.5, color=color,
+                                      linewidth=2-i*0.5, alpha=0.6-i*0.15)[0])
+
+    def apply(self, out):
+        if self.hidden is not None:
+            out['y'][:, self.hidden] = np.nan  # filtered-out samples leave gaps
+        for line, y in zip(self.lines, out['y']):
+            line.set_ydata(y)
+        return self.lines
+
+    def as_points(self, out):
+        return line_points(self.state['x'], out['y'], out['points']), out['sizes'], None
+
+
+@register_mode('classic')
+class ClassicSpiral(ArtMode):
+    name, label, title = 'spiral', 'Spiral', 'Spiral Mode'
+
+    def layout(self, data, rng):
+        t = np.linspace(0, 6 * np.pi, len(data))
+        r = 0.5 + 2 * data
+        # Double helix: the second strand is the first turned by half a circle
+        return {'x': r * np.cos(t), 'y': r * np.sin(t), 'sizes': data * 50 + 15}
+
+    def allocate(self):
+        return {'offsets': np.empty((2, len(self.state['x']), 2))}
+
+    def step(self, t, out):
+        s = self.state
+        rotate(s['x'], s['y'], t * 0.03, out['offsets'][0])
+        # Strand 2 sits at angle + pi and turns by another pi: back on strand 1's angle
+        rotate(s['x'], s['y'], t * 0.03 + 2 * np.pi, out['offsets'][1])
+
+    def draw(self, ax, panel):
+        s = self.state
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        self.scatter1 = ax.scatter(s['x'], s['y'], s=s['sizes'], c=color, alpha=0.7)
+        self.scatter2 = ax.scatter(-s['x'], -s['y'], s=s['sizes'], c=color, alpha=0.5)
+        self.points, self.rows = self.scatter1, np.arange(len(s['x']))
+
+    def filtered_artists(self):
+        return [self.scatter1, self.scatter2]
+
+    def apply(self, out):
+        self.scatter1.set_offsets(self.shown('strand1', out['offsets'][0]))
+        self.scatter2.set_offsets(self.shown('strand2', out['offsets'][1]))
+        return [self.scatter1, self.scatter2]
+
+    def as_points(self, out):
+        return out['offsets'].reshape(-1, 2), np.tile(self.state['sizes'], 2), None
+
+
+# Enhanced panel modes (interactive_water_art_enhanced.py)
+
+@register_mode('enhanced')
+class EnhancedGalaxy(ArtMode):
+    name, label, title = 'galaxy', '🌌 Galaxy', 'Galaxy Mode'
+    max_points = 1000
+    palette = 'viridis'
+
+    def layout(self, data, rng):
+        indices = self.select(data)
+        selected = data[indices]
+        n = len(indices)
+        # Spiral coordinates with data-driven radius
+        t = np.linspace(0, 6 * np.pi, n)
+        r = 2 + 4 * selected
+        return {'indices': indices, 'selected': selected, 't': t, 'r': r,
+                'x': r * np.cos(t) + rng.normal(0, 0.3, n),
+                'y': r * np.sin(t) + rng.normal(0, 0.3, n),
+                'sizes': selected * 80 + 20}
+
+    def allocate(self):
+        n = len(self.state['x'])
+        return {'offsets': np.empty((n, 2)), 'sizes': np.empty(n)}
+
+    def step(self, t, out):
+        s = self.state
+        rotate(s['x'], s['y'], t * 0.015, out['offsets'])
+        # Pulsing effect based on data values
+        np.multiply(s['sizes'], 1 + 0.3 * np.sin(t * 0.1), out=out['sizes'])
+
+    def draw(self, ax, panel):
+        s = self.state
+        indices, selected = s['indices'], s['selected']
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        colors = panel.point_colors(indices, plt.get_cmap('viridis')(selected))
+        edges, widths = panel.point_edges(indices, color, 1)
+        self.scatter = ax.scatter(s['x'], s['y'], s=s['sizes'], c=colors,
+                                  alpha=0.8, edgecolors=edges, linewidths=widths)
+        self.points, self.rows = self.scatter, indices
+
+        # Central black hole with data-based size
+        ax.add_patch(Circle((0, 0), 0.5 + np.mean(selected) * 0.8, color='black', alpha=0.9))
+
+        # Data value labels around the galaxy
+        data_values = panel.column(panel.current_indicator)
+        n = len(indices)
+        for i in range(0, n, max(1, n//8)):
+            ax.text((s['r'][i] + 1) * np.cos(s['t'][i]), (s['r'][i] + 1) * np.sin(s['t'][i]),
+                    f'{data_values[indices[i]]:.1f}', fontsize=8, color='white', alpha=0.7,
+                    ha='center', va='center')
+
+    def apply(self, out):
+        self.scatter.set_offsets(self.shown('offsets', out['offsets']))
+        self.scatter.set_sizes(self.shown('sizes', out['sizes']))
+        return [self.scatter]
+
+    def as_points(self, out):
+        return out['offsets'], out['sizes'], self.state['selected']
+
+
+@register_mode('enhanced')
+class EnhancedParticle(ArtMode):
+    name, label, title = 'particle', '✨ Particle', 'Enhanced Particle Mode'
+    stateless = False
+    fed = ('selected', 'target_x')  # particles drift towards their new value range
+    max_points = 800
+
+    def layout(self, data, rng):
+        indices = self.select(data)
+        selected = data[indices]
+        n = len(indices)
+        # Clusters by value range: low values left, medium centre, high right
+        x, y = np.zeros(n), np.zeros(n)
+        for mask, (x_lo, x_hi), (y_lo, y_hi) in (
+                (selected < 0.33, (-8, -2), (-6, 6)),
+                ((selected >= 0.33) & (selected < 0.67), (-2, 2), (-4, 4)),
+                (selected >= 0.67, (2, 8), (-6, 6))):
+            x[mask] = rng.uniform(x_lo, x_hi, np.sum(mask))
+            y[mask] = rng.uniform(y_lo, y_hi, np.sum(mask))
+        return {'indices': indices, 'selected': selected, 'x': x, 'y': y,
+                'vx': (selected - 0.5) * 0.3, 'vy': rng.uniform(-0.15, 0.15, n),
+                'target_x': np.where(selected < 0.33, -5, np.where(selected < 0.67, 0, 5)).astype(float)}
+
+    def allocate(self):
+        n = len(self.state['x'])
+        return {'offsets': np.empty((n, 2)), 'sizes': np.empty(n)}
+
+    def step(self, t, out):
+        s = self.state
+        # Gentle attraction towards each value range's region, slight damping
+        s['vx'] += (s['target_x'] - s['x']) * 0.02
+        s['vy'] *= 0.99
+        s['x'] += s['vx']
+        s['y'] += s['vy']
+        # Wrap around the edges
+        s['x'][s['x'] < -10] = 10
+        s['x'][s['x'] > 10] = -10
+        s['y'][s['y'] < -8] = 8
+        s['y'][s['y'] > 8] = -8
+        out['offsets'][:, 0] = s['x']
+        out['offsets'][:, 1] = s['y']
+        # Size variation based on velocity
+        speeds = np.hypot(s['vx'], s['vy'])
+        np.multiply(s['selected'] * 80 + 30, 1 + speeds * 2, out=out['sizes'])
+
+    def draw(self, ax, panel):
+        s = self.state
+        indices = s['indices']
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        edges, widths = panel.point_edges(indices, 'white', 1)
+        self.scatter = ax.scatter(s['x'], s['y'], s=s['selected'] * 100 + 30,
+                                  c=panel.point_colors(indices, color),
+                                  alpha=0.7, edgecolors=edges, linewidths=widths)
+        self.points, self.rows = self.scatter, indices
+        for x, label, label_color in ((-6, 'Low Values', 'lightblue'), (0, 'Medium Values', 'yellow'),
+                                      (6, 'High Values', 'orange')):
+            ax.text(x, -7, label, fontsize=12, color=label_color, fontweight='bold', ha='center')
+
+    def apply(self, out):
+        self.scatter.set_offsets(self.shown('offsets', out['offsets']))
+        self.scatter.set_sizes(self.shown('sizes', out['sizes']))
+        return [self.scatter]
+
+    def as_points(self, out):
+        return out['offsets'], out['sizes'], None
+
+
+@register_mode('enhanced')
+class EnhancedWave(ArtMode):
+    name, label, title = 'wave', '🌊 Wave', 'Wave Mode'
+
+    def layout(self, data, rng):
+        layers = np.arange(4)
+        return {'x': np.linspace(-10, 10, len(data)), 'base_y': (data - 0.5) * 6,
+                # Main wave plus four layers with their own phase, frequency and amplitude
+                'phase': np.concatenate([[0.0], layers * np.pi / 4]),
+                'frequency': np.concatenate([[0.4], 0.4 + layers * 0.1]),
+                'amplitude': np.concatenate([[3.0], 2 - layers * 0.3]),
+                'base_scale': np.concatenate([[1.0], 1 - layers * 0.2])}
+
+    def allocate(self):
+        n = len(self.state['x'])
+        return {'y': np.empty((5, n)), 'points': np.empty((5 * n, 2)), 'sizes': np.full(5 * n, 9.0)}
+
+    def step(self, t, out):
+        s = self.state
+        wave_phase = t * 0.15
+        # The main wave's data amplitude is modulated over time as well
+        scale = s['base_scale'].copy()
+        scale[0] = 1 + 0.5 * np.sin(t * 0.05)
+        np.sin(s['x'] * s['frequency'][:, None] + wave_phase + s['phase'][:, None], out=out['y'])
+        out['y'] *= s['amplitude'][:, None]
+        out['y'] += scale[:, None] * s['base_y']
+
+    def draw(self, ax, panel):
+        s = self.state
+        x, base_y = s['x'], s['base_y']
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        self.lines = [ax.plot(x, base_y, color=color, linewidth=4, alpha=0.9)[0]]
+
+        # Data points on the wave (and the outliers themselves, looked up from the index)
+        sample_indices = np.linspace(0, len(x)-1, 20, dtype=int)
+        if panel.show_outliers:
+            sample_indices = np.union1d(sample_indices, panel.outlier_index().top[panel.current_indicator])
+        edges, widths = panel.point_edges(sample_indices, color, 2)
+        ax.scatter(x[sample_indices], base_y[sample_indices], s=80,
+                   c=panel.point_colors(sample_indices, 'white'), edgecolors=edges, linewidths=widths, zorder=5)
+
+        # Multi-layer waves
+        for i in range(4):
+            self.lines.append(ax.plot(x, base_y + i*0.8, color=color, linewidth=3-i*0.5, alpha=0.7-i*0.15)[0])
+
+    def apply(self, out):
+        if self.hidden is not None:
+            out['y'][:, self.hidden] = np.nan  # filtered-out samples leave gaps
+        for line, y in zip(self.lines, out['y']):
+            line.set_ydata(y)
+        return self.lines
+
+    def as_points(self, out):
+        return line_points(self.state['x'], out['y'], out['points']), out['sizes'], None
+
+
+@register_mode('enhanced')
+class EnergyField(ArtMode):
+    name, label, title = 'energy', '⚡ Energy Field', 'Energy Field Mode'
+    max_points = 600
+    fed = ('energies',)  # nodes and field lines stay put; sizes, colours and waves follow
+    palette = 'plasma'
+    lut = plt.cm.plasma(np.arange(256))  # colours of the plasma map, looked up by index
+    shift_colors = True
+
+    def layout(self, data, rng):
+        indices = self.select(data)
+        grid_size = int(np.sqrt(len(indices)))
+        energies = data[indices][:grid_size * grid_size]
+        # Grid nodes, displaced by an energy-dependent distance and angle
+        cell = np.arange(len(energies))
+        x_grid = np.linspace(-8, 8, grid_size)
+        y_grid = np.linspace(-6, 6, grid_size)
+        distortion, angle = energies * 2, energies * 4 * np.pi
+        x = x_grid[cell % grid_size] + distortion * np.cos(angle)
+        y = y_grid[cell // grid_size] + distortion * np.sin(angle)
+
+        # Field lines join each high-energy node (top 30%) to the next three that are close
+        high = np.flatnonzero(energies > np.percentile(energies, 70))
+        pairs = np.concatenate([np.column_stack([high[:-k], high[k:]]) for k in (1, 2, 3)])
+        pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+        close = np.hypot(x[pairs[:, 1]] - x[pairs[:, 0]], y[pairs[:, 1]] - y[pairs[:, 0]]) < 6
+        return {'indices': indices[:len(energies)], 'energies': energies, 'x': x, 'y': y,
+                'pairs': pairs[close]}
+
+    def allocate(self):
+        n = len(self.state['x'])
+        return {'offsets': np.empty((n, 2)), 'sizes': np.empty(n), 'values': np.empty(n),
+                'colors': np.empty((n, 4)), 'core_size': np.empty(1), 'line_alpha': np.empty(())}
+
+    def step(self, t, out):
+        s = self.state
+        e = s['energies']
+        time_factor = t * 0.1
+        # Energy waves propagating through the field
+        out['offsets'][:, 0] = s['x'] + np.sin(time_factor + e * 8) * 0.3 * e
+        out['offsets'][:, 1] = s['y'] + np.cos(time_factor * 0.7 + e * 5) * 0.2 * e
+        np.multiply(e * 120 + 40, 1 + 0.4 * np.sin(time_factor * 2 + e * 10), out=out['sizes'])
+        out['core_size'][0] = (np.mean(e) * 200 + 100) * (1 + 0.6 * np.sin(time_factor * 3))
+        out['line_alpha'][()] = max(0.0, 0.3 + 0.4 * np.sin(time_factor * 1.5))
+        # Colours drift through the plasma map
+        np.mod(e + time_factor * 0.1, 1.0, out=out['values'])
+        lut_index = np.minimum((out['values'] * 256).astype(np.intp), 255)
+        np.take(self.lut, lut_index, axis=0, out=out['colors'])
+
+    def draw(self, ax, panel):
+        s = self.state
+        indices, e = s['indices'], s['energies']
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        # Potability colours stay fixed instead of drifting
+        self.shift_colors = not panel.color_by_potability
+
+        edges, widths = panel.point_edges(indices, color, 2)
+        self.nodes = ax.scatter(s['x'], s['y'], s=e * 120 + 40,
+                                c=panel.point_colors(indices, plt.cm.plasma(e)),
+                                alpha=0.8, edgecolors=edges, linewidths=widths)
+        self.points, self.rows = self.nodes, indices
+
+        self.field_lines = []
+        for i, j in s['pairs']:
+            line_alpha = (e[i] + e[j]) / 2
+            self.field_lines.append(ax.plot([s['x'][i], s['x'][j]], [s['y'][i], s['y'][j]], color=color,
+                                            alpha=line_alpha*0.6, linewidth=2, linestyle='--')[0])
+
+        # Central energy core
+        self.core = ax.scatter([0], [0], s=np.mean(e) * 200 + 100, c='white', alpha=0.9,
+                               edgecolors=color, linewidths=3, marker='*')
+
+        # Energy level indicators
+        data_values = panel.column(panel.current_indicator)
+        hi, lo = np.argmax(e), np.argmin(e)
+        ax.text(s['x'][hi], s['y'][hi] + 1, f'Max: {data_values[indices[hi]]:.1f}', fontsize=10,
+                color='yellow', fontweight='bold', ha='center')
+        ax.text(s['x'][lo], s['y'][lo] - 1, f'Min: {data_values[indices[lo]]:.1f}', fontsize=10,
+                color='cyan', fontweight='bold', ha='center')
+
+    def apply(self, out):
+        self.nodes.set_offsets(self.shown('offsets', out['offsets']))
+        self.nodes.set_sizes(self.shown('sizes', out['sizes']))
+        self.core.set_sizes(out['core_size'])
+        for line in self.field_lines:
+            line.set_alpha(float(out['line_alpha']))
+        if self.shift_colors:
+            self.nodes.set_facecolor(self.shown('colors', out['colors']))
+        return [self.nodes, self.core] + self.field_lines
+
+    def as_points(self, out):
+        return out['offsets'], out['sizes'], out['values']
+
+
+@register_mode('enhanced')
+class Embedding(ArtMode):
+    name, label, title = 'embedding', '🧭 Embedding', 'Embedding Mode'
+    stateless = False  # waits for the background projection
+    max_points = 5000
+    fed = ()  # a projection of all indicators, not of one series
+    palette = 'viridis'
+    future = None
+    target = None
+    message = 'Computing embedding...'
+
+    def layout(self, data, rng):
+        # Every row is projected; drawing is limited to an evenly spaced subset
+        indices = self.select(data)
+        selected = data[indices]
+        n = len(indices)
+        # Start from a compact sunflower disc; points glide out once the projection is ready
+        order = np.arange(n)
+        radius = 1.5 * np.sqrt((order + 0.5) / n)
+        theta = order * np.pi * (3 - np.sqrt(5))
+        return {'indices': indices, 'selected': selected,
+                'start': np.column_stack([radius * np.cos(theta), radius * np.sin(theta)]),
+                'phase': selected * 2 * np.pi}
+
+    def allocate(self):
+        return {'offsets': np.empty((len(self.state['indices']), 2))}
+
+    def step(self, t, out):
+        s = self.state
+        if self.target is None and self.future is not None and self.future.done():
+            try:
+                self.target = self.future.result()[s['indices']]
+                self.message = 'Principal components of all indicators'
+            except Exception as e:
+                self.message = f'Embedding failed: {e}'
+                self.target = s['start']
+            self.arrival = t
+
+        if self.target is None:
+            # Still computing: slowly spin the starting disc
+            rotate(s['start'][:, 0], s['start'][:, 1], t * 0.02, out['offsets'])
+            return
+
+        # Smoothstep tween from the disc to the projection over 40 frames, then a gentle drift
+        u = min(1.0, (t - self.arrival) / 40)
+        ease = u * u * (3 - 2 * u)
+        np.subtract(self.target, s['start'], out=out['offsets'])
+        out['offsets'] *= ease
+        out['offsets'] += s['start']
+        wobble = 0.08 * ease * np.sin(t * 0.05 + s['phase'])
+        out['offsets'][:, 0] += wobble
+        out['offsets'][:, 1] += np.roll(wobble, 1)
+
+    def draw(self, ax, panel):
+        s = self.state
+        indices, selected = s['indices'], s['selected']
+        color = panel.indicator_colors.get(panel.current_indicator, '#888888')
+        colors = panel.point_colors(indices, plt.get_cmap('viridis')(selected))
+        edges, widths = panel.point_edges(indices, color, 0.5)
+        self.scatter = ax.scatter(s['start'][:, 0], s['start'][:, 1], s=selected * 30 + 8,
+                                  c=colors, alpha=0.8, edgecolors=edges, linewidths=widths)
+        self.points, self.rows = self.scatter, indices
+        self.status = ax.text(0, -7, 'Computing embedding...', fontsize=12,
+                              color='white', alpha=0.8, ha='center')
+        self.wait_for(panel.embedding_future())
+
+    def wait_for(self, future):
+        """Glide to the projection delivered by future (a 2-D embedding of every row)"""
+        self.future = future
+        self.target = None
+        self.message = 'Computing embedding...'
+
+    def apply(self, out):
+        self.scatter.set_offsets(self.shown('offsets', out['offsets']))
+        self.status.set_text(self.message)
+        return [self.scatter, self.status]
+
+    def as_points(self, out):
+        return out['offsets'], self.state['selected'] * 30 + 8, self.state['selected']
@@ -0,0 +1,214 @@
+# Art Mode Recordings: compact, seekable files of quantized art-mode frames
+#
+# A recording holds the frames of one art mode run in the format of
+# art_frames.py (int16 positions, uint8 sizes and colour indices). Frames are
+# grouped into chunks that each start with a keyframe, followed by a delta and
+# second-order deltas (small for steady motion).
+# Each chunk is zlib-compressed on its own, so any frame can be reached by
+# inflating one chunk. File layout:
+#
+#   MAGIC, header length (uint32), JSON header (dataset hash, family, mode,
+#   indicator, seed, fps, frame and point counts, palette), the chunks, the
+#   chunk offsets (uint64), and the offset of that index (uint64) + MAGIC.
+#
+# Playback memory-maps the file and pushes decoded frames into a scatter
+# artist, without running the simulation again.
+import argparse
+import json
+import mmap
+import struct
+import time
+import zlib
+from concurrent.futures import Future
+import numpy as np
+from art_frames import HEADER, INDICATOR_COLORS, FrameDecoder, FrameEncoder, dequantize, palette_rgb
+from art_modes import ModeEngine
+from water_data import DATA_FILE, open_columns
+from water_embedding import dataset_hash, load_or_compute
+
+MAGIC = b'AQREC1\n'
+FORMAT_VERSION = 1
+TRAILER = struct.Struct('<Q')
+
+
+def record(path, mode='galaxy', indicator=None, family='enhanced', frames=600, fps=20,
+           seed=0, data_path=DATA_FILE, chunk_frames=64, level=6):
+    """Run an art mode headlessly and save its frames; returns the header"""
+    store = open_columns(data_path)
+    indicators = [col for col in store.columns if col != 'Potability']
+    indicator = indicator or indicators[0]
+    X = np.column_stack([store.column(col, fill='median') for col in indicators])
+    data = X[:, indicators.index(indicator)].astype(np.float64)
+    normalized = (data - data.min()) / (data.max() - data.min() + 1e-8)
+
+    engine = ModeEngine(family)
+    art_mode = engine.activate(mode, normalized, np.random.default_rng(seed))
+    if hasattr(art_mode, 'wait_for'):
+        # The projection is ready from the first frame, so recordings are reproducible
+        future = Future()
+        future.set_result(load_or_compute(X))
+        art_mode.wait_for(future)
+
+    encoder = FrameEncoder()
+    offsets = []
+    with open(path, 'wb') as f:
+        header = None
+        chunk = []
+        for i in range(frames):
+            encoder.update(*art_mode.as_points(engine.step()))
+            if header is None:
+                header = {
+                    'version': FORMAT_VERSION, 'dataset_hash': dataset_hash(X), 'family': family,
+                    'mode': mode, 'indicator': indicator, 'title': f'{indicator} - {art_mode.title}',
+                    'seed': seed, 'fps': fps, 'frames': frames, 'points': encoder.n,
+                    'chunk_frames': chunk_frames,
+                    'palette': palette_rgb(art_mode.palette, INDICATOR_COLORS.get(indicator, '#888888')).ravel().tolist(),
+                }
+                encoded = json.dumps(header).encode()
+                f.write(MAGIC + struct.pack('<I', len(encoded)) + encoded)
+            # Each chunk: a keyframe, one delta, then second-order deltas
+            position = i % chunk_frames
+            chunk.append(encoder.keyframe() if position == 0 else encoder.delta() if position == 1 else encoder.delta2())
+            if len(chunk) == chunk_frames or i == frames - 1:
+                offsets.append(f.tell())
+                f.write(zlib.compress(b''.join(chunk), level))
+                chunk = []
+        offsets.append(f.tell())
+        index_offset = f.tell()
+        f.write(np.asarray(offsets, dtype='<u8').tobytes())
+        f.write(TRAILER.pack(index_offset) + MAGIC)
+    return header
+
+
+class Recording:
+    """Random-access reader of a recording (memory-mapped; one chunk inflated at a time)"""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC or self.map[-len(MAGIC):] != MAGIC:
+            raise ValueError(f'{path} is not an art mode recording')
+        length, = struct.unpack_from('<I', self.map, len(MAGIC))
+        self.header = json.loads(self.map[len(MAGIC) + 4:len(MAGIC) + 4 + length])
+        index_offset, = TRAILER.unpack_from(self.map, len(self.map) - len(MAGIC) - TRAILER.size)
+        count = (len(self.map) - len(MAGIC) - TRAILER.size - index_offset) // 8
+        self.offsets = np.frombuffer(self.map, '<u8', count, index_offset).astype(np.int64)
+        self.chunk_frames = self.header['chunk_frames']
+        self.frame_bytes = HEADER.size + 6 * self.header['points']
+        self.palette = np.asarray(self.header['palette'], dtype=np.float64).reshape(256, 3) / 255
+        self._chunk = None
+        self._data = None
+        self._decoder = None
+
+    def __len__(self):
+        return self.header['frames']
+
+    def frame(self, k):
+        """Quantized (xy int16, sizes uint8, colours uint8) of frame k; sequential reads are O(1)"""
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        chunk, position = divmod(k, self.chunk_frames)
+        if chunk != self._chunk or self._decoder.frame > k:
+            # Inflate the chunk and start from its keyframe
+            self._data = zlib.decompress(self.map[self.offsets[chunk]:self.offsets[chunk + 1]])
+            self._chunk = chunk
+            self._decoder = FrameDecoder()
+            self._position = 0
+        while self._position <= position:
+            start = self._position * self.frame_bytes
+            self._decoder.decode(self._data[start:start + self.frame_bytes])
+            self._position += 1
+        return self._decoder.xy, self._decoder.sizes, self._decoder.colors
+
+    def points(self, k):
+        """Frame k as scene offsets, matplotlib marker areas and RGB colours"""
+        xy, sizes, colors = self.frame(k)
+        offsets, areas = dequantize(xy, sizes)
+        return offsets, areas, self.palette[colors]
+
+    def close(self):
+        self._data = None
+        self._decoder = None
+        self.offsets = None
+        self.map.close()
+        self.file.close()
+
+
+def play(path, fast=False, loop=True):
+    """Replay a recording through a matplotlib scatter artist"""
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+
+    recording = Recording(path)
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(12.8, 7.2))
+    ax.set_facecolor('#0a0a1a')
+    ax.set_xlim(-10, 10)
+    ax.set_ylim(-8, 8)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.set_title(f"{recording.header['title']} (recorded, seed {recording.header['seed']})",
+                 fontsize=16, color='white', fontweight='bold')
+    offsets, sizes, colors = recording.points(0)
+    scatter = ax.scatter(offsets[:, 0], offsets[:, 1], s=sizes, c=colors, alpha=0.8)
+
+    def update(k):
+        offsets, sizes, colors = recording.points(k)
+        scatter.set_offsets(offsets)
+        scatter.set_sizes(sizes)
+        scatter.set_facecolors(colors)
+        return [scatter]
+
+    interval = 1 if fast else 1000 / recording.header['fps']
+    fig.ani = animation.FuncAnimation(fig, update, frames=len(recording), interval=interval,
+                                      blit=True, repeat=loop)
+    plt.show()
+    return recording
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record art mode runs to compact files and play them back')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='run an art mode headlessly and save its frames')
+    rec.add_argument('out', help='recording file to write (e.g. galaxy.aqrec)')
+    rec.add_argument('--mode', default='galaxy')
+    rec.add_argument('--indicator')
+    rec.add_argument('--family', default='enhanced', choices=['enhanced', 'classic'])
+    rec.add_argument('--frames', type=int, default=600)
+    rec.add_argument('--fps', type=float, default=20)
+    rec.add_argument('--seed', type=int, default=0)
+    rec.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    rec.add_argument('--chunk-frames', type=int, default=64, help='frames per compressed chunk (keyframe interval)')
+    show = sub.add_parser('play', help='replay a recording')
+    show.add_argument('path')
+    show.add_argument('--fast', action='store_true', help='as fast as frames can be drawn')
+    info = sub.add_parser('info', help='print the header and time decoding of every frame')
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        start = time.perf_counter()
+        header = record(args.out, args.mode, args.indicator, args.family, args.frames, args.fps,
+                        args.seed, args.data, args.chunk_frames)
+        elapsed = time.perf_counter() - start
+        size = len(Recording(args.out).map)
+        raw = header['frames'] * header['points'] * 3 * 8  # float64 x, y and size
+        print(f"{header['frames']} frames of {header['points']:,} points in {elapsed:.2f}s -> {args.out}: "
+              f"{size / 1e6:.2f} MB ({raw / size:.0f}x smaller than float64 frames)")
+    elif args.command == 'play':
+        play(args.path, args.fast)
+    else:
+        recording = Recording(args.path)
+        header = {k: v for k, v in recording.header.items() if k != 'palette'}
+        print(json.dumps(header, indent=2))
+        start = time.perf_counter()
+        for k in range(len(recording)):
+            recording.frame(k)
+        elapsed = time.perf_counter() - start
+        print(f'Decoded {len(recording)} frames in {elapsed:.3f}s ({len(recording) / elapsed:,.0f} frames/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+# Art Mode Data Sources: drive the art modes from a CSV column or a tide series
+#
+# A source hands an art mode normalized (0-1) values, one per point:
+#
+#   CsvSource   one indicator of the water quality CSV; the same every frame
+#   TideSource  a sliding window over tide heights resampled to the frame
+#               clock (one sample per frame), so the window moves by one
+#               sample per frame and a year of tides plays as one continuous
+#               animation
+#
+# Both expose values/raw arrays, the frame count (None when static) and
+# window(k), the slice of the arrays shown in frame k. The end of every
+# frame's window is found once, with np.searchsorted over the precomputed frame
+# timestamps, so a frame only slices views and re-runs the mode's vectorized
+# layout via ArtMode.feed().
+import argparse
+import time
+import numpy as np
+from art_frames import INDICATOR_COLORS
+from art_modes import MODES, ModeEngine
+from water_data import DATA_FILE, open_columns
+
+TIDE_COLOR = '#45B7D1'
+
+
+def normalize(values):
+    """Values scaled to 0-1 against their own bounds"""
+    return (values - values.min()) / (values.max() - values.min() + 1e-8)
+
+
+class CsvSource:
+    """One indicator column of the water quality CSV (missing values filled with medians)"""
+
+    frames = None
+
+    def __init__(self, path=DATA_FILE, indicator=None):
+        store = open_columns(path)
+        self.indicator = indicator or [col for col in store.columns if col != 'Potability'][0]
+        self.raw = np.asarray(store.column(self.indicator, fill='median'), dtype=np.float64)
+        self.values = normalize(self.raw)
+        self.title = self.indicator
+        self.color = INDICATOR_COLORS.get(self.indicator, '#888888')
+
+    def window(self, k):
+        return slice(None)
+
+    def frame(self, k):
+        return self.values
+
+    def describe(self, k):
+        return f'{len(self.values):,} samples'
+
+
+class TideSource:
+    """Sliding window of tide heights, resampled to one sample per frame"""
+
+    def __init__(self, times, heights, window=600, minutes_per_frame=20, method='cosine'):
+        from tide_series import resample
+        self.step = np.timedelta64(minutes_per_frame, 'm')
+        self.grid, self.raw = resample(times, heights, self.step, method)
+        if len(self.grid) <= window:
+            raise ValueError(f'{len(self.grid)} resampled heights do not fill a window of {window}')
+        self.values = normalize(self.raw)
+        self.window_size = window
+        # Frame k shows the window ending at clock[k]; both lookups run once for every frame
+        self.clock = self.grid[0] + self.step * np.arange(window - 1, len(self.grid))
+        self.ends = np.searchsorted(self.grid, self.clock, side='right')
+        self.frames = len(self.clock)
+        self.title = 'Tide Height'
+        self.color = TIDE_COLOR
+
+    def at(self, when):
+        """Frame whose window ends at (or just after) a time"""
+        return min(int(np.searchsorted(self.clock, np.datetime64(when, 'm'))), self.frames - 1)
+
+    def window(self, k):
+        end = self.ends[k % self.frames]
+        return slice(end - self.window_size, end)
+
+    def frame(self, k):
+        return self.values[self.window(k)]
+
+    def describe(self, k):
+        k %= self.frames
+        return f'{str(self.clock[k])[:16].replace("T", " ")}  {self.raw[self.ends[k] - 1]:.2f} m'
+
+
+class SourcePanel:
+    """What ArtMode.draw() asks of a panel, for a single source (no potability, outliers or embedding)"""
+
+    show_outliers = False
+    color_by_potability = False
+
+    def __init__(self, source, k=0):
+        self.source = source
+        self.k = k
+        self.current_indicator = source.title
+        self.indicator_colors = {source.title: source.color}
+
+    def column(self, indicator):
+        return self.source.raw[self.source.window(self.k)]
+
+    def point_colors(self, indices, default):
+        return default
+
+    def point_edges(self, indices, default, width):
+        return default, width
+
+
+def drivable_modes(family):
+    """Modes that follow fed data (every mode except the multi-indicator ones)"""
+    return [name for name, cls in MODES[family].items() if cls.fed != ()]
+
+
+def play(source, mode='wave', family='enhanced', seed=0, fps=20, start=0):
+    """Animate an art mode from a source in a matplotlib window"""
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(12.8, 7.2))
+    ax.set_facecolor('#0a0a1a')
+    ax.set_xlim(-10, 10)
+    ax.set_ylim(-8, 8)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    engine = ModeEngine(family)
+    art_mode = engine.activate(mode, source.frame(start), np.random.default_rng(seed))
+    art_mode.draw(ax, SourcePanel(source, start))
+    ax.set_title(f'{source.title} - {art_mode.title}', fontsize=16, color='white', fontweight='bold')
+    clock = ax.text(-9.5, 7.2, source.describe(start), fontsize=12, color='white')
+
+    def animate(k):
+        k += start
+        if source.frames is not None:
+            # The same seed every frame keeps the layout's jitter still while the values move
+            engine.feed(source.frame(k), np.random.default_rng(seed))
+            clock.set_text(source.describe(k))
+        return art_mode.apply(engine.step()) + [clock]
+
+    fig.ani = animation.FuncAnimation(fig, animate, frames=source.frames, interval=1000 / fps,
+                                      blit=False, repeat=True, cache_frame_data=False)
+    plt.show()
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive the art modes from the water quality CSV or tide heights')
+    parser.add_argument('--source', default='tides', choices=['tides', 'csv'])
+    parser.add_argument('--mode', default='wave', help='art mode (any mode except embedding)')
+    parser.add_argument('--family', default='enhanced', choices=['enhanced', 'classic'])
+    parser.add_argument('--html', default='crawled-page-2023.html', help='tide table page')
+    parser.add_argument('--years', type=int, help='synthetic tides of this many years instead of the table')
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--indicator', help='CSV column to draw')
+    parser.add_argument('--window', type=int, default=600, help='tide samples on screen')
+    parser.add_argument('--minutes-per-frame', type=int, default=20, help='tide time per frame')
+    parser.add_argument('--start', help='first tide frame time, e.g. 2023-06-01')
+    parser.add_argument('--fps', type=float, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bench', type=int, metavar='FRAMES', help='time FRAMES headless frames instead of playing')
+    args = parser.parse_args()
+    if args.mode not in drivable_modes(args.family):
+        parser.error(f"mode {args.mode!r} cannot be driven by a source; choose from {drivable_modes(args.family)}")
+
+    if args.source == 'csv':
+        source = CsvSource(args.data, args.indicator)
+    else:
+        if args.years:
+            from tide_series import synthetic_tides
+            times, heights = synthetic_tides(args.years)
+        else:
+            from main import parse_tide_series
+            times, heights = parse_tide_series(args.html)
+        source = TideSource(times, heights, args.window, args.minutes_per_frame)
+        print(f'{len(times):,} turning points -> {source.frames:,} frames of {args.minutes_per_frame} minutes')
+    start = source.at(args.start) if args.start and source.frames else 0
+
+    if args.bench:
+        engine = ModeEngine(args.family)
+        art_mode = engine.activate(args.mode, source.frame(start), np.random.default_rng(args.seed))
+        began = time.perf_counter()
+        for k in range(start, start + args.bench):
+            if source.frames is not None:
+                engine.feed(source.frame(k), np.random.default_rng(args.seed))
+            art_mode.as_points(engine.step())
+        elapsed = time.perf_counter() - began
+        print(f'{args.mode}: {elapsed / args.bench * 1e3:.3f} ms per frame (feed + step) over {args.bench} frames')
+        return
+    play(source, args.mode, args.family, args.seed, args.fps, start)
+
+
+if __name__ == '__main__':
+    main()
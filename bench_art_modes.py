@@ -0,0 +1,165 @@
+# Frame-Level Benchmark for the interactive art modes
+#
+# Builds every mode of every interactive panel headlessly (Agg backend) on a
+# seeded synthetic dataset of N rows, and times scene set-up (the mode's layout
+# and draw), one animation frame (step and apply) and the Agg canvas draw
+# separately. Modes come from the registry in art_modes.py. Results are written as
+# JSON; save one as a baseline with --save and guard against regressions with
+# --check, as bench_startup.py does for start-up time.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from water_data import COLUMNS
+from water_impute import synthetic_table
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Panel class of every mode family
+PANELS = {
+    'classic': ('interactive_water_art', 'WaterArtVisualization'),
+    'v2': ('interactive_water_art_v2', 'WaterArtVisualization'),
+    'enhanced': ('interactive_water_art_enhanced', 'EnhancedWaterArtVisualization'),
+}
+
+
+def write_dataset(rows, directory, seed=0):
+    """Seeded synthetic water quality CSV of the given size (reused if present)"""
+    path = os.path.join(directory, f'synthetic_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        X, labels = synthetic_table(rows, len(COLUMNS) - 1, seed=seed)
+        # Shift into positive, water-quality-like ranges
+        frame = pd.DataFrame(X * 10 + 50, columns=COLUMNS[:-1])
+        frame[COLUMNS[-1]] = labels
+        frame.to_csv(path, index=False)
+    return path
+
+
+def _median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def bench_panel(name, data_path, rows, frames=10, seed=0):
+    """Timings of every mode of one panel on one dataset"""
+    import importlib
+    module_name, class_name = PANELS[name]
+    panel_class = getattr(importlib.import_module(module_name), class_name)
+    panel = panel_class(data_path=data_path, seed=seed)
+    ax = getattr(panel, 'ax_main', None) or panel.ax
+    engine = panel.engine
+    results = []
+    for mode in engine.modes:
+        # Build the scene as a mode switch would, then stop the timer-driven animation
+        panel.current_mode = mode
+        panel.update_visualization()
+        panel.ani.event_source.stop()
+        panel.transition.cancel()
+
+        def init():
+            # Uncached layout (no key), then the artists
+            ax.clear()
+            engine.activate(mode, panel.normalized_data, np.random.default_rng(seed)).draw(ax, panel)
+        init_s = _median_time(init, 3)
+        if mode == 'embedding':
+            panel.embedding_future().result()
+
+        animate_times, draw_times = [], []
+        for _ in range(frames):
+            start = time.perf_counter()
+            engine.active.apply(engine.step())
+            drawn = time.perf_counter()
+            panel.fig.canvas.draw()
+            animate_times.append(drawn - start)
+            draw_times.append(time.perf_counter() - drawn)
+        results.append({'panel': name, 'mode': mode, 'rows': rows, 'init_s': init_s,
+                        'animate_s': float(np.median(animate_times)),
+                        'draw_s': float(np.median(draw_times))})
+    plt.close(panel.fig)
+    return results
+
+
+def check_regressions(results, baseline, tolerance, floor=0.0005):
+    """(panel, mode, rows) entries slower than the baseline by more than tolerance
+
+    Slowdowns under floor seconds are ignored: relative changes of
+    sub-millisecond medians are mostly timer noise.
+    """
+    previous = {(r['panel'], r['mode'], r['rows']): r for r in baseline['results']}
+    failures = []
+    for result in results:
+        old = previous.get((result['panel'], result['mode'], result['rows']))
+        if old is None:
+            continue
+        for key in ('init_s', 'animate_s', 'draw_s'):
+            if result[key] > old[key] * (1 + tolerance) and result[key] - old[key] > floor:
+                failures.append(f"{result['panel']}/{result['mode']} N={result['rows']}: "
+                                f"{key} {old[key] * 1e3:.2f}ms -> {result[key] * 1e3:.2f}ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time init, animate and draw of every art mode')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='dataset sizes (rows)')
+    parser.add_argument('--panels', nargs='+', default=list(PANELS), choices=list(PANELS))
+    parser.add_argument('--frames', type=int, default=10, help='animation frames timed per mode')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help='where to keep the synthetic datasets (default: a temp dir)')
+    parser.add_argument('--out', metavar='FILE', help='write results as JSON')
+    parser.add_argument('--save', metavar='FILE', help='write results as a JSON baseline')
+    parser.add_argument('--check', metavar='FILE', help='compare against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown relative to the baseline (default 25%%)')
+    parser.add_argument('--floor-ms', type=float, default=0.5,
+                        help='ignore slowdowns smaller than this many milliseconds (default 0.5)')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='aquaart_bench_')
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    for rows in args.sizes:
+        data_path = write_dataset(rows, data_dir, args.seed)
+        for name in args.panels:
+            for result in bench_panel(name, data_path, rows, args.frames, args.seed):
+                results.append(result)
+                print(f"{name:9s} {result['mode']:10s} N={rows:<9,d} init {result['init_s'] * 1e3:9.2f}ms  "
+                      f"animate {result['animate_s'] * 1e3:8.2f}ms  draw {result['draw_s'] * 1e3:8.2f}ms")
+
+    report = {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'seed': args.seed,
+        'frames': args.frames,
+        'results': results,
+    }
+    for path in (args.out, args.save):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f'Results written to {path}')
+
+    if args.check:
+        with open(args.check, encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.tolerance, args.floor_ms / 1e3)
+        for failure in failures:
+            print(f'REGRESSION {failure}')
+        if failures:
+            sys.exit(1)
+        print('No frame-time regressions')
+
+
+if __name__ == '__main__':
+    main()
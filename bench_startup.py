@@ -0,0 +1,118 @@
+# Startup-Time Profile for the visualization entry points
+#
+# Runs each script headlessly (Agg backend, so plt.show() returns at once)
+# under `python -X importtime`, and reports wall-clock start-to-window time,
+# total import time and the heaviest top-level imports. Save a baseline with
+# --save and guard against regressions with --check.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+SCRIPTS = [
+    'main.py',
+    'plot_water_quality.py',
+    'plot_water_quality_art.py',
+    'water_quality_galaxy.py',
+    'interactive_water_art.py',
+    'interactive_water_art_v2.py',
+    'interactive_water_art_enhanced.py',
+]
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (module, self_us, cumulative_us, depth) tuples"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        # Nesting is shown by two spaces of indentation per level after the first space
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def profile_script(script, repeat=3, timeout=300):
+    """Best-of-repeat wall time and import profile of one script"""
+    env = dict(os.environ, MPLBACKEND='Agg')
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', script],
+                              capture_output=True, text=True, env=env, timeout=timeout)
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f'{script} failed:\n{proc.stderr[-2000:]}')
+        records = parse_importtime(proc.stderr)
+        top_level = [r for r in records if r[3] == 0]
+        result = {
+            'script': script,
+            'wall_s': wall,
+            'import_s': sum(r[2] for r in top_level) / 1e6,
+            'modules': len(records),
+            'top_imports': [(name, cumulative / 1e3) for name, _, cumulative, _ in
+                            sorted(top_level, key=lambda r: r[2], reverse=True)[:8]],
+        }
+        if best is None or result['wall_s'] < best['wall_s']:
+            best = result
+    return best
+
+
+def check_regressions(results, baseline, tolerance):
+    """Scripts whose wall or import time exceeds the baseline by more than tolerance"""
+    previous = {r['script']: r for r in baseline['results']}
+    failures = []
+    for result in results:
+        old = previous.get(result['script'])
+        if old is None:
+            continue
+        for key in ('wall_s', 'import_s'):
+            if result[key] > old[key] * (1 + tolerance):
+                failures.append(f"{result['script']}: {key} {old[key]:.3f}s -> {result[key]:.3f}s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile start-up time of the visualization scripts')
+    parser.add_argument('scripts', nargs='*', default=SCRIPTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', metavar='FILE', help='write results as a JSON baseline')
+    parser.add_argument('--check', metavar='FILE', help='compare against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown relative to the baseline (default 25%%)')
+    args = parser.parse_args()
+
+    results = []
+    for script in args.scripts:
+        result = profile_script(script, args.repeat)
+        results.append(result)
+        print(f"{script:36s} wall {result['wall_s']:6.3f}s  imports {result['import_s']:6.3f}s  "
+              f"({result['modules']} modules)")
+        for name, ms in result['top_imports'][:5]:
+            print(f"    {name:32s} {ms:8.1f} ms")
+
+    report = {'python': sys.version.split()[0], 'results': results}
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline saved to {args.save}')
+
+    if args.check:
+        with open(args.check, encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.tolerance)
+        for failure in failures:
+            print(f'REGRESSION {failure}')
+        if failures:
+            sys.exit(1)
+        print('No start-up regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Galaxy Spiral-Arm Layout for the water quality art scripts
+import functools
+import numpy as np
+from matplotlib.colors import to_rgba_array
+
+
+@functools.lru_cache(maxsize=16)
+def arm_geometry(seed, num_arms, points_per_arm, noise_scale=0.3):
+    """Spiral arm coordinates for all arms, cached per (seed, arm count, N)"""
+    rng = np.random.default_rng(seed)
+
+    # One (num_arms, points_per_arm) grid instead of a Python loop per arm
+    arm_offset = (np.arange(num_arms) * 2 * np.pi / num_arms)[:, None]
+    t = np.linspace(0, 4 * np.pi, points_per_arm)[None, :]
+    r = 0.5 + 2 * t / (4 * np.pi)  # Radius increases with angle
+
+    noise = rng.normal(0, noise_scale, (2, num_arms, points_per_arm))
+    x = (r * np.cos(t + arm_offset) + noise[0]).astype(np.float32).ravel()
+    y = (r * np.sin(t + arm_offset) + noise[1]).astype(np.float32).ravel()
+    arm_ids = np.repeat(np.arange(num_arms, dtype=np.int32), points_per_arm)
+
+    # Cached arrays are shared between callers, so keep them read-only
+    for arr in (x, y, arm_ids):
+        arr.setflags(write=False)
+    return x, y, arm_ids
+
+
+class GalaxyLayout:
+    """Point positions and attributes of a galaxy, aligned one entry per point"""
+
+    def __init__(self, x, y, arm_ids, sizes, alphas, colors):
+        self.x = x
+        self.y = y
+        self.arm_ids = arm_ids
+        self.sizes = sizes
+        self.alphas = alphas
+        self.colors = colors
+
+    def __len__(self):
+        return len(self.x)
+
+
+def create_galaxy_layout(values, arm_colors, seed=42, noise_scale=0.3):
+    """Build a galaxy layout from normalized values of shape (num_arms, points_per_arm)
+
+    Arm i takes its sizes and alphas from row i of values and its colour
+    from arm_colors[i] (cycled if there are fewer colours than arms), so
+    every attribute array lines up with the points.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    num_arms, points_per_arm = values.shape
+    x, y, arm_ids = arm_geometry(seed, num_arms, points_per_arm, noise_scale)
+
+    flat = values.ravel()
+    # Point size: larger values = larger points
+    sizes = flat * 60 + 10
+    # Transparency: larger values = brighter
+    alphas = flat * 0.8 + 0.2
+
+    # RGBA colours from a per-arm lookup table
+    lut = to_rgba_array(arm_colors).astype(np.float32)
+    colors = lut[arm_ids % len(lut)]
+    colors[:, 3] = alphas
+
+    return GalaxyLayout(x, y, arm_ids, sizes, alphas, colors)
+
+
+class GalaxyFrameBuffers:
+    """Preallocated per-frame RGBA and size arrays for a galaxy layout"""
+
+    def __init__(self, layout):
+        self.layout = layout
+        # RGB channels come from the colour LUT once; only alpha changes per frame
+        self.colors = layout.colors.copy()
+        self.sizes = layout.sizes.copy()
+
+    def update(self, alpha_scale=1.0, size_scale=1.0):
+        """Write this frame's alpha channel and sizes in place"""
+        np.multiply(self.layout.alphas, alpha_scale, out=self.colors[:, 3])
+        np.multiply(self.layout.sizes, size_scale, out=self.sizes)
+        return self.colors, self.sizes
@@ -1,14 +1,26 @@
 # Enhanced Interactive Water Quality Art Visualization
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.animation as animation
-from matplotlib.widgets import Button
-from matplotlib.patches import Circle
-import matplotlib.patches as patches
+from matplotlib.widgets import Button, RangeSlider
+from matplotlib.colors import to_rgba
+import argparse
+from art_modes import ModeEngine
+from water_stream import StreamingDataset, open_source
+from online_stats import ColumnSummary
+from water_data import DATA_FILE, open_columns, scan_csv
+from water_impute import Imputer
+from potability_model import FEATURES, load_or_train
+from water_outliers import OutlierIndex
+from water_embedding import EmbeddingWorker
+from water_transitions import PointTransition
+from water_instrument import Instrumentation
+from water_inspect import HoverInspector
+from water_query import QueryIndex
 
 class EnhancedWaterArtVisualization:
-    def __init__(self):
+    def __init__(self, source=None, refresh_interval=2000, data_path=DATA_FILE, sample_size=None,
+                 impute='median', seed=0, instrument=False):
         plt.style.use('dark_background')
         
         # Create figure with 16:9 aspect ratio (1920x1080 optimized)
@@ -24,12 +36,39 @@ class EnhancedWaterArtVisualization:
         # Data distribution panel (bottom right)
         self.ax_dist = plt.subplot2grid((4, 6), (2, 5), colspan=1, rowspan=1)
         
-        # Load data
-        self.df = pd.read_csv('water_potability.csv')
-        self.df = self.df.dropna()
+        # Load data: memory-mapped binary columns of the CSV, a bounded sample of a
+        # CSV scanned out-of-core, or live samples from a stream source. Missing
+        # values are imputed with the given method ('none' drops incomplete rows)
+        self.impute = None if impute == 'none' else impute
+        self.data_path = data_path
+        self.stream = None
+        self.store = None
+        self.df = None
+        self.summaries = {}
+        if source is None and sample_size is None:
+            self.store = open_columns(data_path)
+            columns = self.store.columns
+        elif source is None:
+            # Statistics cover every row; only the sample is kept in memory for drawing
+            scan = scan_csv(data_path, sample_size=sample_size, dropna=self.impute is None)
+            self.df = scan.sample_frame()
+            self.summaries = scan.summaries
+            columns = scan.columns
+            if self.impute is not None:
+                labels = self.df['Potability'].to_numpy(dtype=np.float32) if 'Potability' in self.df else None
+                values = self.df[columns].to_numpy(dtype=np.float32, copy=True)
+                self.df_missing = self.df.isna()  # remembered for the hover inspector
+                imputer = Imputer(self.impute).fit([values[:, j] for j in range(len(columns))], labels)
+                self.df[columns] = imputer.transform(values, labels)
+        else:
+            self.stream = StreamingDataset(source)
+            self.stream.poll()
+            self.summaries = self.stream.summaries
+            columns = self.stream.columns
         
         # Water quality indicators
-        self.indicators = [col for col in self.df.columns if col != 'Potability']
+        self.columns = list(columns)
+        self.indicators = [col for col in columns if col != 'Potability']
         self.current_indicator = self.indicators[0]
         self.current_mode = 'galaxy'
         
@@ -46,23 +85,269 @@ class EnhancedWaterArtVisualization:
             'Turbidity': '#D4A574'        # Orange
         }
         
-        # Animation control
+        # Layouts draw their jitter from a generator reseeded for every scene,
+        # so the same indicator and mode always give the same picture
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        
+        # Art modes (see art_modes.py) and animation control
+        self.engine = ModeEngine('enhanced')
+        self.mode = None
         self.ani = None
-        self.frame = 0
+        
+        # Scene changes tween the main scatter's points (one per dataset row)
+        self.transition = PointTransition(frames=20)
+        self.points = None
+        self.point_rows = None
+        
+        # Optional colour channel: predicted potability (model loaded on first use)
+        self.color_by_potability = False
+        self.potability_model = None
+        self.potability_cache = {}
+        
+        # Optional outlier highlighting: top-K rows per indicator and overall
+        self.show_outliers = False
+        self.outlier_cache = {}
+        
+        # Embedding mode: 2-D projections computed on a background thread
+        self.embedding_worker = None
+        self.embedding_futures = {}
+        
+        # Full records of the drawn rows, shown by the hover inspector
+        self.record_cache = {}
+        
+        # Range filters per indicator ({indicator: (lo, hi)}), answered by a sorted index
+        self.filters = {}
+        self.keep = None
+        self.query_cache = {}
+        self.range_slider = None
         
         # Create control panel
         self.create_control_panel()
+        self.create_filter_controls()
+        
+        # Hovering a point shows its full record in a blitted tooltip
+        self.inspector = HoverInspector(self, self.ax_main)
+        
+        # Hot-path timers and profilers, off until toggled with the 'i' key
+        self.instrumentation = Instrumentation(self)
+        if instrument:
+            self.instrumentation.enable()
         
         # Initialize visualization
         self.update_visualization()
         
+        # Poll the stream source periodically and redraw with the new samples
+        if self.stream is not None:
+            self.stream_timer = self.fig.canvas.new_timer(interval=refresh_interval)
+            self.stream_timer.add_callback(self.poll_stream)
+            self.stream_timer.start()
+        
         print("Enhanced Interactive Water Quality Art Visualization started!")
         print("Left: Switch indicators | Right: Switch art modes | Data stats shown on right panel")
+        print("Hover a point to inspect its sample | Slider: filter the current indicator's range")
+        print("Keys: i timing overlay | u cProfile | m tracemalloc | j dump timings to JSON")
+    
+    def normalize(self, data, bounds=None):
+        """Data normalization to 0-1 range (optionally against given min/max bounds)"""
+        data = np.asarray(data)
+        data_min, data_max = bounds if bounds is not None else (data.min(), data.max())
+        return (data - data_min) / (data_max - data_min + 1e-8)
+    
+    def column(self, indicator):
+        """Current values of one indicator as a NumPy array"""
+        if self.stream is not None:
+            values = self.stream.column(indicator)
+            if self.impute is None:
+                return values[~np.isnan(values)]
+            # Live samples: fill gaps with the running (t-digest) median
+            return np.where(np.isnan(values), self.summaries[indicator].quantile(0.5), values)
+        if self.store is not None:
+            if self.impute is None:
+                return self.store.column(indicator, complete_only=True)
+            return self.store.column(indicator, fill=self.impute)
+        return self.df[indicator].values
+    
+    def row_ids(self, indices):
+        """Dataset rows of drawn points, stable across indicators and modes"""
+        if self.stream is not None and self.impute is None:
+            present = np.flatnonzero(~np.isnan(self.stream.column(self.current_indicator)))
+            return present[indices]
+        return np.asarray(indices)
+    
+    def row_set(self):
+        """Cache key of the rows drawn for the current indicator (None: the same rows for every indicator)"""
+        # Only a stream without imputation leaves out different rows per indicator
+        return self.current_indicator if self.stream is not None and self.impute is None else None
+    
+    def records(self, columns):
+        """Values of several columns for the same rows as column(current_indicator)"""
+        if self.stream is not None:
+            if self.impute is not None:
+                return np.column_stack([self.column(col) for col in columns])
+            present = ~np.isnan(self.stream.column(self.current_indicator))
+            return np.column_stack([self.stream.column(col)[present] for col in columns])
+        if self.store is not None:
+            return np.column_stack([self.column(col) for col in columns])
+        return self.df[columns].to_numpy(dtype=np.float32)
+    
+    def imputed(self, columns):
+        """Which values of records(columns) were filled in rather than measured (None: none were)"""
+        if self.impute is None:
+            return None  # incomplete rows are left out instead
+        if self.stream is not None:
+            return np.column_stack([np.isnan(self.stream.column(col)) for col in columns])
+        if self.store is not None:
+            return np.column_stack([np.isnan(self.store.column(col)) for col in columns])
+        return self.df_missing[columns].to_numpy()
+    
+    def potability_scores(self):
+        """Predicted potability probability of every drawn sample"""
+        if self.row_set() not in self.potability_cache:
+            if self.potability_model is None:
+                self.potability_model = load_or_train(data_path=self.data_path)
+            features = self.records(FEATURES)
+            self.potability_cache[self.row_set()] = self.potability_model.predict_proba(features)
+        return self.potability_cache[self.row_set()]
+    
+    def point_colors(self, indices, default):
+        """Per-point colours: predicted potability when enabled, else the mode's own colours"""
+        if not self.color_by_potability:
+            return default
+        return plt.get_cmap('RdYlGn')(self.potability_scores()[indices])
+    
+    def toggle_potability_colors(self):
+        """Switch the potability colour channel on or off"""
+        self.color_by_potability = not self.color_by_potability
+        print(f"Potability colours: {'on' if self.color_by_potability else 'off'}")
+        self.buttons['potability'].color = '#7CFC00' if self.color_by_potability else '#444444'
+        self.update_visualization()
+    
+    def outlier_index(self):
+        """Outlier index over every indicator, for the rows drawn for the current one"""
+        if self.row_set() not in self.outlier_cache:
+            values = self.records(self.indicators)
+            columns = [values[:, j] for j in range(len(self.indicators))]
+            top_k = max(10, len(values) // 100)  # the most extreme 1% of the rows
+            self.outlier_cache[self.row_set()] = OutlierIndex.build(self.indicators, columns, top_k)
+        return self.outlier_cache[self.row_set()]
+    
+    def point_edges(self, indices, default, width):
+        """Per-point edge colours and widths, ringing outliers when highlighting is on
+        
+        Red rings mark the current indicator's robust z-score outliers, orange
+        rings the joint (Mahalanobis) outliers across all indicators.
+        """
+        if not self.show_outliers:
+            return default, width
+        index = self.outlier_index()
+        edges = np.tile(to_rgba(default), (len(indices), 1))
+        widths = np.full(len(indices), float(width))
+        joint = index.is_outlier(indices, 'mahalanobis')
+        single = index.is_outlier(indices, self.current_indicator)
+        edges[joint] = to_rgba('#FFA500')
+        edges[single] = to_rgba('#FF2020')
+        widths[joint | single] = 3.0
+        return edges, widths
+    
+    def toggle_outliers(self):
+        """Switch outlier highlighting on or off"""
+        self.show_outliers = not self.show_outliers
+        print(f"Outlier highlighting: {'on' if self.show_outliers else 'off'}")
+        self.buttons['outliers'].color = '#FF4500' if self.show_outliers else '#444444'
+        self.update_visualization()
+    
+    def embedding_future(self):
+        """Future of the 2-D embedding of the rows drawn for the current indicator"""
+        if self.row_set() not in self.embedding_futures:
+            if self.embedding_worker is None:
+                self.embedding_worker = EmbeddingWorker()
+            values = self.records(self.indicators)
+            self.embedding_futures[self.row_set()] = self.embedding_worker.submit(values)
+        return self.embedding_futures[self.row_set()]
+    
+    def record_table(self):
+        """Every indicator and Potability of the rows drawn for the current indicator, and which were filled in"""
+        if self.row_set() not in self.record_cache:
+            columns = self.indicators + (['Potability'] if 'Potability' in self.columns else [])
+            self.record_cache[self.row_set()] = (columns, self.records(columns), self.imputed(columns))
+        return self.record_cache[self.row_set()]
+    
+    def query_index(self):
+        """Sorted index over every indicator, for the rows drawn for the current one"""
+        if self.row_set() not in self.query_cache:
+            columns, values, _ = self.record_table()
+            self.query_cache[self.row_set()] = QueryIndex(
+                self.indicators, [values[:, j] for j in range(len(self.indicators))])
+        return self.query_cache[self.row_set()]
+    
+    def apply_filter(self):
+        """Restrict the drawn points to the rows inside every indicator's range"""
+        self.keep = self.query_index().select(self.filters) if self.filters else None
+        if self.mode is not None and (self.keep is not None or self.mode.visible is not None
+                                      or self.mode.hidden is not None):
+            self.transition.cancel()  # the tween runs over all points
+            self.mode.show_only(self.keep)
+            if self.engine.t > 0:
+                self.mode.apply(self.engine.out)
+        ranges = ' and '.join(f'{lo:.2f} <= {name} <= {hi:.2f}' for name, (lo, hi) in self.filters.items())
+        count = len(self.normalized_data) if self.keep is None else int(self.keep.sum())
+        self.filter_text.set_text(f'Filter: {ranges} ({count:,} samples)' if ranges else 'Filter: none')
+    
+    def on_range_changed(self, values):
+        """Range slider moved: update the current indicator's filter"""
+        lo, hi = values
+        if lo <= self.range_slider.valmin and hi >= self.range_slider.valmax:
+            self.filters.pop(self.current_indicator, None)
+        else:
+            self.filters[self.current_indicator] = (float(lo), float(hi))
+        self.apply_filter()
+        self.fig.canvas.draw_idle()
+    
+    def clear_filters(self):
+        """Drop every range filter"""
+        self.filters.clear()
+        self.update_range_slider()
+        self.apply_filter()
+        self.fig.canvas.draw_idle()
+    
+    def update_range_slider(self):
+        """Range slider over the current indicator's values, set to its filter"""
+        if self.range_slider is not None:
+            self.range_slider.disconnect_events()
+        self.ax_range.clear()
+        summary = self.column_summary(self.current_indicator)
+        lo, hi = float(summary.min), float(summary.max)
+        if not hi > lo:
+            hi = lo + 1.0
+        self.range_slider = RangeSlider(self.ax_range, self.current_indicator, lo, hi,
+                                        valinit=self.filters.get(self.current_indicator, (lo, hi)),
+                                        color=self.indicator_colors.get(self.current_indicator, '#888888'))
+        self.range_slider.on_changed(self.on_range_changed)
+    
+    def column_summary(self, indicator):
+        """Online statistics summary of one indicator (batch mode builds it on first use)"""
+        if indicator not in self.summaries:
+            # Summarize the observed values only, not the imputed ones (NaNs are skipped)
+            imputed = self.store is not None and self.impute is not None
+            values = self.store.column(indicator) if imputed else self.column(indicator)
+            self.summaries[indicator] = ColumnSummary(bins=20).update(values)
+        return self.summaries[indicator]
     
-    def normalize(self, data):
-        """Data normalization to 0-1 range"""
-        data = np.array(data)
-        return (data - data.min()) / (data.max() - data.min() + 1e-8)
+    def column_stats(self, indicator):
+        """Summary statistics of one indicator"""
+        return self.column_summary(indicator).summary()
+    
+    def poll_stream(self):
+        """Ingest newly arrived samples and refresh the visualization"""
+        if self.stream.poll():
+            self.potability_cache.clear()
+            self.outlier_cache.clear()
+            self.embedding_futures.clear()
+            self.record_cache.clear()
+            self.query_cache.clear()
+            self.engine.cache.clear()
+            self.update_visualization()
     
     def create_control_panel(self):
         """Create enhanced control buttons with better layout"""
@@ -91,30 +376,49 @@ class EnhancedWaterArtVisualization:
             button.on_clicked(lambda x, ind=indicator: self.change_indicator(ind))
             self.buttons[indicator] = button
         
-        # Art mode buttons (bottom)
-        modes = [
-            ('🌌 Galaxy', 'galaxy'),
-            ('✨ Particle', 'particle'), 
-            ('🌊 Wave', 'wave'),
-            ('⚡ Energy Field', 'energy')
-        ]
-        
+        # Art mode buttons (bottom), one per registered mode
+        modes = self.engine.modes
         mode_y = 0.02
-        mode_width = 0.15
+        mode_width = 0.1
         
-        for i, (name, mode) in enumerate(modes):
-            x_pos = 0.2 + i * (mode_width + 0.02)
+        for i, (mode, art_mode) in enumerate(modes.items()):
+            x_pos = 0.2 + i * (mode_width + 0.01)
             ax_button = self.fig.add_axes([x_pos, mode_y, mode_width, 0.06])
             
             color = '#FFD700' if mode == self.current_mode else '#444444'
-            button = Button(ax_button, name, color=color, hovercolor='lightgray')
+            button = Button(ax_button, art_mode.label, color=color, hovercolor='lightgray')
             button.label.set_fontweight('bold')
             button.on_clicked(lambda x, m=mode: self.change_mode(m))
             self.buttons[f'mode_{mode}'] = button
+        
+        # Potability colour channel toggle
+        ax_button = self.fig.add_axes([0.2 + len(modes) * (mode_width + 0.01), mode_y, 0.1, 0.06])
+        button = Button(ax_button, '💧 Potability', color='#444444', hovercolor='lightgray')
+        button.label.set_fontweight('bold')
+        button.on_clicked(lambda x: self.toggle_potability_colors())
+        self.buttons['potability'] = button
+        
+        # Outlier highlighting toggle
+        ax_button = self.fig.add_axes([0.31 + len(modes) * (mode_width + 0.01), mode_y, 0.1, 0.06])
+        button = Button(ax_button, '⚠ Outliers', color='#444444', hovercolor='lightgray')
+        button.label.set_fontweight('bold')
+        button.on_clicked(lambda x: self.toggle_outliers())
+        self.buttons['outliers'] = button
+    
+    def create_filter_controls(self):
+        """Range slider of the current indicator, a clear button and the active filter"""
+        self.ax_range = self.fig.add_axes([0.3, 0.125, 0.34, 0.03])
+        ax_button = self.fig.add_axes([0.78, 0.115, 0.1, 0.05])
+        button = Button(ax_button, '✖ Clear filter', color='#444444', hovercolor='lightgray')
+        button.label.set_fontweight('bold')
+        button.on_clicked(lambda x: self.clear_filters())
+        self.buttons['clear_filter'] = button
+        self.filter_text = self.fig.text(0.2, 0.18, 'Filter: none', fontsize=10, color='lightgray')
     
     def update_data_panels(self):
         """Update data statistics and distribution panels"""
-        current_data = self.df[self.current_indicator]
+        summary = self.column_summary(self.current_indicator)
+        current_stats = summary.summary()
         
         # Clear previous content
         self.ax_stats.clear()
@@ -127,13 +431,13 @@ class EnhancedWaterArtVisualization:
         
         # Calculate statistics
         stats = {
-            'Count': len(current_data),
-            'Mean': f'{current_data.mean():.2f}',
-            'Median': f'{current_data.median():.2f}',
-            'Std': f'{current_data.std():.2f}',
-            'Min': f'{current_data.min():.2f}',
-            'Max': f'{current_data.max():.2f}',
-            'Range': f'{current_data.max() - current_data.min():.2f}'
+            'Count': current_stats['count'],
+            'Mean': f"{current_stats['mean']:.2f}",
+            'Median': f"{current_stats['median']:.2f}",
+            'Std': f"{current_stats['std']:.2f}",
+            'Min': f"{current_stats['min']:.2f}",
+            'Max': f"{current_stats['max']:.2f}",
+            'Range': f"{current_stats['max'] - current_stats['min']:.2f}"
         }
         
         # Display statistics as text
@@ -150,9 +454,11 @@ class EnhancedWaterArtVisualization:
         self.ax_stats.set_xticks([])
         self.ax_stats.set_yticks([])
         
-        # Distribution panel (histogram)
+        # Distribution panel (histogram drawn from the precomputed bin counts)
         self.ax_dist.set_facecolor('#1a1a2e')
-        self.ax_dist.hist(current_data, bins=20, 
+        histogram = summary.histogram
+        edges = histogram.edges if histogram.lo is not None else np.linspace(0, 1, histogram.bins + 1)
+        self.ax_dist.hist(edges[:-1], bins=edges, weights=histogram.counts, 
                          color=self.indicator_colors.get(self.current_indicator, 'white'),
                          alpha=0.7, edgecolor='white', linewidth=0.5)
         self.ax_dist.set_title('Distribution', fontsize=10, color='white', fontweight='bold')
@@ -185,8 +491,7 @@ class EnhancedWaterArtVisualization:
         print(f"Switched to mode: {mode}")
         
         # Update mode button colors
-        modes = ['galaxy', 'particle', 'wave', 'energy']
-        for m in modes:
+        for m in self.engine.modes:
             button_key = f'mode_{m}'
             if button_key in self.buttons:
                 if m == mode:
@@ -203,8 +508,13 @@ class EnhancedWaterArtVisualization:
         if self.ani:
             self.ani.event_source.stop()
         
-        # Clear main canvas
+        self.rng = np.random.default_rng(self.seed)
+        
+        # Remember where the points were, then clear main canvas
+        previous = PointTransition.capture(self.points, self.point_rows)
+        self.points = None
         self.ax_main.clear()
+        self.inspector.reset()
         
         # Update data panels
         self.update_data_panels()
@@ -220,37 +530,38 @@ class EnhancedWaterArtVisualization:
         for spine in self.ax_main.spines.values():
             spine.set_visible(False)
         
-        # Get current data
-        data = self.df[self.current_indicator].values
-        self.normalized_data = self.normalize(data)
+        # Get current data (normalized against the bounds of the whole dataset or stream)
+        data = self.column(self.current_indicator)
+        if len(data) == 0:
+            self.ax_main.set_title('Waiting for samples...', fontsize=16, color='white')
+            plt.draw()
+            return
+        summary = self.column_summary(self.current_indicator)
+        self.normalized_data = self.normalize(data, (summary.min, summary.max))
         
         # Set enhanced title with data info
-        current_stats = self.df[self.current_indicator]
-        mode_names = {
-            'galaxy': 'Galaxy Mode',
-            'particle': 'Enhanced Particle Mode',
-            'wave': 'Wave Mode', 
-            'energy': 'Energy Field Mode'
-        }
+        current_stats = self.column_stats(self.current_indicator)
         
-        title = f'{self.current_indicator} - {mode_names.get(self.current_mode)}\n'
-        title += f'Range: {current_stats.min():.1f} - {current_stats.max():.1f} | '
-        title += f'Mean: {current_stats.mean():.2f} | Samples: {len(current_stats)}'
+        # Lay the mode out (reused from the engine's cache when seen before)
+        self.mode = self.engine.activate(self.current_mode, self.normalized_data, self.rng,
+                                         key=(self.current_indicator, len(data)))
+        
+        title = f'{self.current_indicator} - {self.mode.title}\n'
+        title += f"Range: {current_stats['min']:.1f} - {current_stats['max']:.1f} | "
+        title += f"Mean: {current_stats['mean']:.2f} | Samples: {current_stats['count']}"
         
         self.ax_main.set_title(title, fontsize=16, color='white', fontweight='bold', pad=20)
         
-        # Initialize based on mode
-        if self.current_mode == 'galaxy':
-            self.init_galaxy()
-        elif self.current_mode == 'particle':
-            self.init_enhanced_particle()  # Enhanced particle mode
-        elif self.current_mode == 'wave':
-            self.init_wave()
-        elif self.current_mode == 'energy':
-            self.init_energy_field()
+        self.mode.draw(self.ax_main, self)
+        self.points = self.mode.points
+        self.point_rows = None if self.points is None else self.row_ids(self.mode.rows)
+        
+        # Glide the points from the previous layout into this one; lines and other artists fade in
+        self.transition.start(previous, self.points, self.point_rows, self.mode.faded_artists(self.ax_main))
+        self.update_range_slider()
+        self.apply_filter()
         
         # Start animation
-        self.frame = 0
         self.ani = animation.FuncAnimation(
             self.fig, self.animate, frames=1000, 
             interval=60, blit=False, repeat=True
@@ -258,345 +569,15 @@ class EnhancedWaterArtVisualization:
         
         plt.draw()
     
-    def init_galaxy(self):
-        """Initialize enhanced galaxy mode"""
-        n_points = min(len(self.normalized_data), 1000)  # Limit for performance
-        
-        # Create multiple spiral arms based on data quartiles
-        indices = np.linspace(0, len(self.normalized_data)-1, n_points, dtype=int)
-        selected_data = self.normalized_data[indices]
-        
-        # Create spiral coordinates with data-driven radius
-        t = np.linspace(0, 6 * np.pi, n_points)
-        r = 2 + 4 * selected_data  # Radius varies with data values
-        
-        self.x = r * np.cos(t) + np.random.normal(0, 0.3, n_points)
-        self.y = r * np.sin(t) + np.random.normal(0, 0.3, n_points)
-        
-        # Enhanced point styling
-        sizes = selected_data * 80 + 20
-        color = self.indicator_colors.get(self.current_indicator, '#888888')
-        
-        # Create color gradient based on data values
-        colors = plt.cm.get_cmap('viridis')(selected_data)
-        
-        self.scatter = self.ax_main.scatter(self.x, self.y, s=sizes, c=colors, 
-                                          alpha=0.8, edgecolors=color, linewidths=1)
-        
-        # Enhanced central black hole with data-based size
-        avg_value = np.mean(selected_data)
-        hole_size = 0.5 + avg_value * 0.8
-        center = Circle((0, 0), hole_size, color='black', alpha=0.9)
-        self.ax_main.add_patch(center)
-        
-        # Add data value indicators around the galaxy
-        for i in range(0, n_points, n_points//8):
-            angle = t[i]
-            text_x = (r[i] + 1) * np.cos(angle)
-            text_y = (r[i] + 1) * np.sin(angle)
-            original_idx = indices[i]
-            value = self.df[self.current_indicator].iloc[original_idx]
-            self.ax_main.text(text_x, text_y, f'{value:.1f}', 
-                            fontsize=8, color='white', alpha=0.7,
-                            ha='center', va='center')
-    
-    def init_enhanced_particle(self):
-        """Initialize enhanced particle mode with better data representation"""
-        n_points = min(len(self.normalized_data), 800)
-        indices = np.linspace(0, len(self.normalized_data)-1, n_points, dtype=int)
-        selected_data = self.normalized_data[indices]
-        
-        # Create clusters based on data value ranges
-        low_mask = selected_data < 0.33
-        mid_mask = (selected_data >= 0.33) & (selected_data < 0.67)
-        high_mask = selected_data >= 0.67
-        
-        # Position particles based on data ranges
-        self.x = np.zeros(n_points)
-        self.y = np.zeros(n_points)
-        
-        # Low values: left side
-        self.x[low_mask] = np.random.uniform(-8, -2, np.sum(low_mask))
-        self.y[low_mask] = np.random.uniform(-6, 6, np.sum(low_mask))
-        
-        # Medium values: center
-        self.x[mid_mask] = np.random.uniform(-2, 2, np.sum(mid_mask))
-        self.y[mid_mask] = np.random.uniform(-4, 4, np.sum(mid_mask))
-        
-        # High values: right side  
-        self.x[high_mask] = np.random.uniform(2, 8, np.sum(high_mask))
-        self.y[high_mask] = np.random.uniform(-6, 6, np.sum(high_mask))
-        
-        # Data-driven velocities
-        self.vx = (selected_data - 0.5) * 0.3
-        self.vy = np.random.uniform(-0.15, 0.15, n_points)
-        
-        # Enhanced particle styling
-        sizes = selected_data * 100 + 30
-        color = self.indicator_colors.get(self.current_indicator, '#888888')
-        
-        self.scatter = self.ax_main.scatter(self.x, self.y, s=sizes, c=color, 
-                                          alpha=0.7, edgecolors='white', linewidths=1)
-        
-        # Add data range labels
-        self.ax_main.text(-6, -7, 'Low Values', fontsize=12, color='lightblue', 
-                         fontweight='bold', ha='center')
-        self.ax_main.text(0, -7, 'Medium Values', fontsize=12, color='yellow', 
-                         fontweight='bold', ha='center')
-        self.ax_main.text(6, -7, 'High Values', fontsize=12, color='orange', 
-                         fontweight='bold', ha='center')
-        
-        # Store data for animation
-        self.particle_data = selected_data
-        self.particle_indices = indices
-    
-    def init_wave(self):
-        """Initialize enhanced wave mode"""
-        x = np.linspace(-10, 10, len(self.normalized_data))
-        self.wave_x = x
-        self.base_y = (self.normalized_data - 0.5) * 6  # Increased amplitude
-        
-        color = self.indicator_colors.get(self.current_indicator, '#888888')
-        
-        # Main wave with data points
-        self.line, = self.ax_main.plot(x, self.base_y, color=color, linewidth=4, alpha=0.9)
-        
-        # Add data points on the wave
-        sample_indices = np.linspace(0, len(x)-1, 20, dtype=int)
-        self.ax_main.scatter(x[sample_indices], self.base_y[sample_indices], 
-                           s=80, c='white', edgecolors=color, linewidths=2, zorder=5)
-        
-        # Multi-layer waves with different frequencies
-        self.wave_lines = []
-        for i in range(4):
-            frequency = 0.5 + i * 0.2
-            line, = self.ax_main.plot(x, self.base_y + i*0.8, 
-                                    color=color, linewidth=3-i*0.5, 
-                                    alpha=0.7-i*0.15)
-            self.wave_lines.append(line)
-    
-    def init_energy_field(self):
-        """Initialize energy field mode - electromagnetic field visualization"""
-        n_points = min(len(self.normalized_data), 600)
-        indices = np.linspace(0, len(self.normalized_data)-1, n_points, dtype=int)
-        selected_data = self.normalized_data[indices]
-        
-        # Create energy field nodes based on data values
-        # High energy nodes (high data values) in center
-        # Lower energy distributed around
-        
-        # Create grid-based energy field
-        grid_size = int(np.sqrt(n_points))
-        x_grid = np.linspace(-8, 8, grid_size)
-        y_grid = np.linspace(-6, 6, grid_size)
-        
-        self.field_x = []
-        self.field_y = []
-        self.field_energies = []
-        
-        for i, energy in enumerate(selected_data[:grid_size*grid_size]):
-            row = i // grid_size
-            col = i % grid_size
-            
-            # Base position on grid
-            base_x = x_grid[col]
-            base_y = y_grid[row]
-            
-            # Distort position based on energy level
-            distortion = energy * 2
-            angle = energy * 4 * np.pi
-            
-            final_x = base_x + distortion * np.cos(angle)
-            final_y = base_y + distortion * np.sin(angle)
-            
-            self.field_x.append(final_x)
-            self.field_y.append(final_y)
-            self.field_energies.append(energy)
-        
-        self.field_x = np.array(self.field_x)
-        self.field_y = np.array(self.field_y)
-        self.field_energies = np.array(self.field_energies)
-        
-        # Create energy nodes with varying sizes and intensities
-        sizes = self.field_energies * 120 + 40
-        color = self.indicator_colors.get(self.current_indicator, '#888888')
-        
-        # Use colormap for energy intensity
-        energy_colors = plt.cm.plasma(self.field_energies)
-        
-        self.energy_nodes = self.ax_main.scatter(self.field_x, self.field_y, 
-                                               s=sizes, c=energy_colors, 
-                                               alpha=0.8, edgecolors=color, linewidths=2)
-        
-        # Create energy field lines connecting high-energy nodes
-        self.field_lines = []
-        energy_threshold = np.percentile(self.field_energies, 70)  # Top 30% energy nodes
-        
-        high_energy_indices = np.where(self.field_energies > energy_threshold)[0]
-        
-        # Connect high-energy nodes with field lines
-        for i, idx1 in enumerate(high_energy_indices[:-1]):
-            for idx2 in high_energy_indices[i+1:i+4]:  # Connect to next 3 nodes max
-                if idx1 != idx2:
-                    x1, y1 = self.field_x[idx1], self.field_y[idx1]
-                    x2, y2 = self.field_x[idx2], self.field_y[idx2]
-                    
-                    # Only draw line if nodes are reasonably close
-                    distance = np.sqrt((x2-x1)**2 + (y2-y1)**2)
-                    if distance < 6:
-                        line_alpha = (self.field_energies[idx1] + self.field_energies[idx2]) / 2
-                        line, = self.ax_main.plot([x1, x2], [y1, y2], 
-                                                color=color, alpha=line_alpha*0.6, 
-                                                linewidth=2, linestyle='--')
-                        self.field_lines.append(line)
-        
-        # Add central energy core
-        core_energy = np.mean(self.field_energies)
-        core_size = core_energy * 200 + 100
-        self.energy_core = self.ax_main.scatter([0], [0], s=core_size, 
-                                              c='white', alpha=0.9, 
-                                              edgecolors=color, linewidths=3,
-                                              marker='*')
-        
-        # Add energy level indicators
-        max_energy_idx = np.argmax(self.field_energies)
-        min_energy_idx = np.argmin(self.field_energies)
-        
-        max_val = self.df[self.current_indicator].iloc[indices[max_energy_idx]]
-        min_val = self.df[self.current_indicator].iloc[indices[min_energy_idx]]
-        
-        self.ax_main.text(self.field_x[max_energy_idx], self.field_y[max_energy_idx] + 1, 
-                         f'Max: {max_val:.1f}', fontsize=10, color='yellow', 
-                         fontweight='bold', ha='center')
-        self.ax_main.text(self.field_x[min_energy_idx], self.field_y[min_energy_idx] - 1, 
-                         f'Min: {min_val:.1f}', fontsize=10, color='cyan', 
-                         fontweight='bold', ha='center')
-        
-        # Store for animation
-        self.energy_base_x = self.field_x.copy()
-        self.energy_base_y = self.field_y.copy()
-    
     def animate(self, frame_num):
         """Enhanced animation with better effects"""
-        self.frame += 1
-        
-        if self.current_mode == 'galaxy':
-            return self.animate_galaxy()
-        elif self.current_mode == 'particle':
-            return self.animate_enhanced_particle()
-        elif self.current_mode == 'wave':
-            return self.animate_wave()
-        elif self.current_mode == 'energy':
-            return self.animate_energy_field()
-        
-        return []
-    
-    def animate_galaxy(self):
-        """Enhanced galaxy animation with pulsing effect"""
-        # Rotation with variable speed
-        angle = self.frame * 0.015
-        cos_a, sin_a = np.cos(angle), np.sin(angle)
-        
-        new_x = self.x * cos_a - self.y * sin_a
-        new_y = self.x * sin_a + self.y * cos_a
-        
-        self.scatter.set_offsets(np.column_stack([new_x, new_y]))
-        
-        # Pulsing effect based on data values
-        pulse = 1 + 0.3 * np.sin(self.frame * 0.1)
-        current_sizes = self.scatter.get_sizes() * pulse
-        self.scatter.set_sizes(current_sizes)
+        # The mode's own animation starts once the transition has finished
+        if self.transition.active:
+            changed = self.transition.artists
+            self.transition.step()
+            return changed
         
-        return [self.scatter]
-    
-    def animate_enhanced_particle(self):
-        """Enhanced particle animation with data-driven behavior"""
-        # Update positions with data-influenced movement
-        attraction_strength = 0.02
-        
-        # Attract particles towards their data-appropriate regions
-        target_x = np.where(self.particle_data < 0.33, -5,
-                           np.where(self.particle_data < 0.67, 0, 5))
-        
-        # Apply gentle attraction
-        self.vx += (target_x - self.x) * attraction_strength
-        self.vy *= 0.99  # Slight damping
-        
-        # Update positions
-        self.x += self.vx
-        self.y += self.vy
-        
-        # Boundary conditions with wrapping
-        self.x = np.where(self.x < -10, 10, np.where(self.x > 10, -10, self.x))
-        self.y = np.where(self.y < -8, 8, np.where(self.y > 8, -8, self.y))
-        
-        self.scatter.set_offsets(np.column_stack([self.x, self.y]))
-        
-        # Size variation based on velocity
-        speeds = np.sqrt(self.vx**2 + self.vy**2)
-        dynamic_sizes = (self.particle_data * 80 + 30) * (1 + speeds * 2)
-        self.scatter.set_sizes(dynamic_sizes)
-        
-        return [self.scatter]
-    
-    def animate_wave(self):
-        """Enhanced wave animation with data-driven frequency"""
-        wave_phase = self.frame * 0.15
-        
-        # Main wave with data-driven amplitude modulation
-        data_modulation = 1 + 0.5 * np.sin(self.frame * 0.05)
-        y = self.base_y * data_modulation + 3 * np.sin(self.wave_x * 0.4 + wave_phase)
-        self.line.set_ydata(y)
-        
-        # Secondary waves with different phases
-        for i, line in enumerate(self.wave_lines):
-            phase_offset = i * np.pi / 4
-            frequency = 0.4 + i * 0.1
-            amplitude = 2 - i * 0.3
-            y_wave = (self.base_y * (1 - i * 0.2) + 
-                     amplitude * np.sin(self.wave_x * frequency + wave_phase + phase_offset))
-            line.set_ydata(y_wave)
-        
-        return [self.line] + self.wave_lines
-    
-    def animate_energy_field(self):
-        """Energy field animation with pulsing and field fluctuations"""
-        # Energy field oscillation
-        time_factor = self.frame * 0.1
-        
-        # Create energy waves that propagate through the field
-        wave1 = np.sin(time_factor + self.field_energies * 8) * 0.3
-        wave2 = np.cos(time_factor * 0.7 + self.field_energies * 5) * 0.2
-        
-        # Update node positions with energy-based oscillations
-        new_x = self.energy_base_x + wave1 * self.field_energies
-        new_y = self.energy_base_y + wave2 * self.field_energies
-        
-        self.energy_nodes.set_offsets(np.column_stack([new_x, new_y]))
-        
-        # Pulsing effect for node sizes
-        pulse = 1 + 0.4 * np.sin(time_factor * 2 + self.field_energies * 10)
-        base_sizes = self.field_energies * 120 + 40
-        pulsing_sizes = base_sizes * pulse
-        self.energy_nodes.set_sizes(pulsing_sizes)
-        
-        # Update energy core with strong pulsing
-        core_pulse = 1 + 0.6 * np.sin(time_factor * 3)
-        core_base_size = np.mean(self.field_energies) * 200 + 100
-        core_size = core_base_size * core_pulse
-        self.energy_core.set_sizes([core_size])
-        
-        # Animate field line transparency
-        line_pulse = 0.3 + 0.4 * np.sin(time_factor * 1.5)
-        for line in self.field_lines:
-            line.set_alpha(line_pulse)
-        
-        # Update energy node colors with time-based shifting
-        color_shift = (self.field_energies + time_factor * 0.1) % 1.0
-        shifted_colors = plt.cm.plasma(color_shift)
-        self.energy_nodes.set_color(shifted_colors)
-        
-        return [self.energy_nodes, self.energy_core] + self.field_lines
+        return self.mode.apply(self.engine.step())
     
     def show(self):
         """Display the enhanced visualization"""
@@ -605,6 +586,21 @@ class EnhancedWaterArtVisualization:
 
 # Launch enhanced application
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Enhanced Interactive Water Quality Art Visualization')
+    parser.add_argument('--stream', metavar='SOURCE',
+                        help="live sample source: growing CSV path, '-' for stdin, tcp://host:port or unix:///path")
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--sample', type=int, metavar='N',
+                        help='scan the CSV out-of-core and draw a uniform sample of N rows')
+    parser.add_argument('--impute', default='median', choices=['none', 'median', 'class_median', 'knn'],
+                        help="how to fill missing values ('none' drops incomplete rows)")
+    parser.add_argument('--instrument', action='store_true',
+                        help="start with the timing overlay on (toggle with 'i'; 'u' cProfile, "
+                             "'m' tracemalloc, 'j' dump JSON)")
+    args = parser.parse_args()
+    
     print("Starting Enhanced Interactive Water Quality Art Visualization...")
-    app = EnhancedWaterArtVisualization()
+    source = open_source(args.stream) if args.stream else None
+    app = EnhancedWaterArtVisualization(source=source, data_path=args.data, sample_size=args.sample,
+                                        impute=args.impute, instrument=args.instrument)
     app.show()
\ No newline at end of file
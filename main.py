@@ -1,39 +1,231 @@
-import os
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+import numpy as np
+
+class TableRowParser(HTMLParser):
+    """Collect the text of every <td> cell, row by row, using only the standard library"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._close_row()
+            self._row = []
+        elif tag == 'td' and self._row is not None:
+            self._close_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == 'td':
+            self._close_cell()
+        elif tag in ('tr', 'table', 'tbody'):
+            self._close_row()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
 
 def parse_tide_heights(html_file):
     with open(html_file, encoding='utf-8') as f:
-        soup = BeautifulSoup(f, 'html.parser')
+        parser = TableRowParser()
+        parser.feed(f.read())
+        parser.close()
     heights = []
     dates = []
-    for table in soup.find_all('table'):
-        for tr in table.find_all('tr'):
-            tds = tr.find_all('td')
-            if len(tds) >= 4:
-                # Only process rows with tide height
-                try:
-                    date = f"{tds[0].text.strip()}-{tds[1].text.strip()}"
-                    for i in range(3, len(tds), 2):
-                        h = tds[i].text.strip().replace('\xa0','').replace('&nbsp;','')
-                        if h:
-                            try:
-                                heights.append(float(h))
-                                dates.append(date)
-                            except ValueError:
-                                pass
-                except Exception:
-                    pass
+    for tds in parser.rows:
+        if len(tds) >= 4:
+            # Only process rows with tide height
+            try:
+                date = f"{tds[0].strip()}-{tds[1].strip()}"
+                for i in range(3, len(tds), 2):
+                    h = tds[i].strip().replace('\xa0','').replace('&nbsp;','')
+                    if h:
+                        try:
+                            heights.append(float(h))
+                            dates.append(date)
+                        except ValueError:
+                            pass
+            except Exception:
+                pass
     return dates, heights
 
+def parse_tide_series(html_file, year=2023):
+    """Turning points as sorted (datetime64[m] times, float64 heights); each height follows its HHMM cell"""
+    with open(html_file, encoding='utf-8') as f:
+        parser = TableRowParser()
+        parser.feed(f.read())
+        parser.close()
+    stamps = []
+    heights = []
+    for tds in parser.rows:
+        if len(tds) < 4:
+            continue
+        month, day = tds[0].strip(), tds[1].strip()
+        for i in range(3, len(tds), 2):
+            hhmm = tds[i-1].strip()
+            h = tds[i].strip().replace('\xa0', '')
+            if len(hhmm) == 4 and hhmm.isdigit() and h:
+                try:
+                    heights.append(float(h))
+                except ValueError:
+                    continue
+                stamps.append(f'{year}-{month}-{day}T{hhmm[:2]}:{hhmm[2:]}')
+    times = np.array(stamps, dtype='datetime64[m]')
+    order = np.argsort(times, kind='stable')
+    return times[order], np.array(heights)[order]
+
+def play_tides(times, heights, window_hours=72, speed=6, step=np.timedelta64(10, 'm'), max_segments=1000, bands=8):
+    """Reveal the resampled tide curve through a sliding window, blitting only the line and the "now" markers
+
+    Keys: space pause, up/down double/halve the speed, left/right seek a day
+    (shift: 30 days); clicking the overview seeks there.
+    """
+    import matplotlib.animation as animation
+    import matplotlib.dates as mdates
+    from matplotlib.transforms import Affine2D
+    from tide_series import aggregate, resample
+
+    grid, curve = resample(times, heights, step)
+    hours = (grid - grid[0]) / np.timedelta64(1, 'h')
+    sample_hours = step / np.timedelta64(1, 'h')
+    # Long windows are drawn from every stride-th sample so a frame never has more than max_segments segments
+    window = int(window_hours / sample_hours)
+    stride = max(1, -(-window // max_segments))
+    xs = hours[::stride]
+    values = curve[::stride]
+    window //= stride
+
+    plt.style.use('dark_background')
+    fig, (ax, overview) = plt.subplots(2, 1, figsize=(14, 7), gridspec_kw={'height_ratios': [4, 1]})
+    ax.set_title('Chek Lap Kok Tide Height', fontsize=18, fontweight='bold')
+    ax.set_xlabel('Hours before now', fontsize=12)
+    ax.set_ylabel('Tide Height (m)', fontsize=14)
+    ax.set_xlim(-window_hours, window_hours * 0.05)
+    ax.set_ylim(curve.min() - 0.2, curve.max() + 0.2)
+    ax.grid(True, linestyle='--', alpha=0.3)
+
+    # Daily range of the whole series; drawn once, so it costs nothing per frame
+    daily = aggregate(grid, curve, 'D')
+    overview.fill_between(daily['time'], daily['min'], daily['max'], color='#45B7D1', alpha=0.6, linewidth=0)
+    overview.set_xlim(grid[0], grid[-1])
+    overview.set_yticks([])
+
+    # The curve stays in hours since the start; the transform shifts it so "now" sits at x = 0.
+    # Colour follows height in rainbow bands: one Line2D per band whose points outside the band are NaN
+    # (the line breaks there), so a frame hands each line two array views instead of building a Path
+    # per segment. The cost is bands x the visible points (at most max_segments + 1) per frame.
+    shift = Affine2D()
+    cmap, norm = plt.get_cmap('rainbow'), plt.Normalize(curve.min(), curve.max())
+    band = np.minimum((norm(values) * bands).astype(int), bands - 1)
+    lines = []
+    for b in range(bands):
+        inside = band == b
+        inside[1:] |= band[:-1] == b  # a segment is coloured by its start point, so keep its end point too
+        line, = ax.plot([], [], color=cmap((b + 0.5) / bands), linewidth=2,
+                        transform=shift + ax.transData, animated=True)
+        lines.append((line, np.where(inside, values, np.nan)))
+    marker, = ax.plot([0], [curve[0]], 'o', color='white', markersize=9, animated=True)
+    cursor = overview.axvline(grid[0], color='#FF6B6B', linewidth=1.5, animated=True)
+    # Text is slow to rasterise, so the clock is only refreshed on pause, seek and speed changes
+    clock = ax.text(0.01, 0.95, '', transform=ax.transAxes, fontsize=12, color='white')
+
+    state = {'pos': 0.0, 'speed': float(speed), 'paused': False}
+    last = len(grid) - 1
+
+    def update(_):
+        if not state['paused']:
+            state['pos'] = (state['pos'] + state['speed']) % last
+        pos = state['pos']
+        i = int(pos)
+        now = hours[i] + (pos - i) * sample_hours
+        height = curve[i] + (pos - i) * (curve[i + 1] - curve[i])
+        hi = i // stride
+        lo = max(0, hi - window)
+        for line, ys in lines:
+            line.set_data(xs[lo:hi + 1], ys[lo:hi + 1])
+        shift.clear().translate(-now, 0)
+        marker.set_ydata([height])
+        cursor.set_xdata([grid[i], grid[i]])
+        return *[line for line, _ in lines], marker, cursor
+
+    def show_clock():
+        i = int(state['pos'])
+        status = ' (paused)' if state['paused'] else ''
+        clock.set_text(f'{str(grid[i])[:16].replace("T", " ")}  {curve[i]:.2f} m  '
+                       f'{state["speed"] * sample_hours:g} h/frame{status}')
+        fig.canvas.draw_idle()
+
+    def seek(pos):
+        state['pos'] = min(max(pos, 0.0), last - 1e-9)
+
+    def on_key(event):
+        day = 24 / sample_hours
+        if event.key == ' ':
+            state['paused'] = not state['paused']
+        elif event.key == 'up':
+            state['speed'] *= 2
+        elif event.key == 'down':
+            state['speed'] /= 2
+        elif event.key in ('right', 'left', 'shift+right', 'shift+left'):
+            jump = day * (30 if event.key.startswith('shift') else 1)
+            seek(state['pos'] + (jump if event.key.endswith('right') else -jump))
+        else:
+            return
+        show_clock()
+
+    def on_click(event):
+        if event.inaxes is overview and event.xdata is not None:
+            clicked = mdates.num2date(event.xdata).replace(tzinfo=None)
+            seek(float(np.searchsorted(grid, np.datetime64(clicked, 'm'))))
+            show_clock()
+
+    fig.canvas.mpl_connect('key_press_event', on_key)
+    fig.canvas.mpl_connect('button_press_event', on_click)
+    plt.tight_layout()
+    show_clock()
+    fig.ani = animation.FuncAnimation(fig, update, interval=33, blit=True, cache_frame_data=False)
+    plt.show()
+    return fig
+
 def main():
+    import argparse
     import matplotlib.dates as mdates
     import matplotlib.font_manager as fm
     from datetime import datetime
 
+    parser = argparse.ArgumentParser(description='Chek Lap Kok tide height chart')
+    parser.add_argument('--html', default='crawled-page-2023.html', help='tide table page')
+    parser.add_argument('--play', action='store_true', help='animated playback through a sliding window')
+    parser.add_argument('--window', type=float, default=72, help='playback window in hours')
+    parser.add_argument('--speed', type=float, default=6, help='playback speed in 10-minute samples per frame')
+    parser.add_argument('--years', type=int, help='play this many years of synthetic tides instead of the table')
+    args = parser.parse_args()
+
+    if args.play:
+        if args.years:
+            from tide_series import synthetic_tides
+            times, tide = synthetic_tides(args.years)
+        else:
+            times, tide = parse_tide_series(args.html)
+        play_tides(times, tide, args.window, args.speed)
+        return
 
-    html_file = 'crawled-page-2023.html'
+    html_file = args.html
     dates, heights = parse_tide_heights(html_file)
 
     # Try to convert date strings to datetime objects for better x-axis formatting
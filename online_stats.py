@@ -0,0 +1,295 @@
+# Online (single-pass) statistics for water quality columns
+import numpy as np
+
+
+class RunningStats:
+    """Running count, mean, variance (Welford) and min/max for each column"""
+
+    def __init__(self, num_columns):
+        self.count = np.zeros(num_columns, dtype=np.int64)
+        self.mean = np.zeros(num_columns)
+        self.m2 = np.zeros(num_columns)
+        self.min = np.full(num_columns, np.inf)
+        self.max = np.full(num_columns, -np.inf)
+
+    def update(self, chunk):
+        """Fold a (rows, num_columns) chunk into the running state, skipping NaNs"""
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        valid = ~np.isnan(chunk)
+        chunk_count = valid.sum(axis=0)
+        if not chunk_count.any():
+            return
+
+        # Chunk mean and sum of squared deviations, then Welford/Chan merge
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chunk_mean = np.where(valid, chunk, 0.0).sum(axis=0) / chunk_count
+        chunk_mean = np.nan_to_num(chunk_mean)
+        deviation = np.where(valid, chunk - chunk_mean, 0.0)
+        chunk_m2 = (deviation * deviation).sum(axis=0)
+        self._merge_moments(chunk_count, chunk_mean, chunk_m2)
+
+        self.min = np.minimum(self.min, np.where(valid, chunk, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(valid, chunk, -np.inf).max(axis=0))
+
+    def _merge_moments(self, count_b, mean_b, m2_b):
+        """Combine (count, mean, M2) of another partition into this one"""
+        total = self.count + count_b
+        safe_total = np.maximum(total, 1)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * count_b / safe_total
+        self.m2 = self.m2 + m2_b + delta * delta * self.count * count_b / safe_total
+        self.count = total
+
+    def merge(self, other):
+        """Merge the running state of another partition (chunk or worker)"""
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1, matching pandas)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class TDigest:
+    """Merging t-digest for approximate quantiles of a single column
+
+    Centroids are compressed in one vectorized pass: sorted centroids are
+    grouped by the integer part of the arcsine scale function of their
+    cumulative weight, so the tails keep fine resolution.
+    """
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are skipped)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other):
+        """Merge another digest (from a chunk or worker) into this one"""
+        if len(other.weights):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._absorb(other.means, other.weights)
+        return self
+
+    def _absorb(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Scale function k(q) = compression / (2 pi) * asin(2q - 1) at each centroid midpoint
+        cumulative = np.cumsum(weights)
+        q_mid = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1)
+        bucket = np.floor(k).astype(np.int64)
+
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1]"""
+        if not len(self.weights):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        centers = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return np.interp(q, np.r_[0.0, centers, 1.0], np.r_[self.min, self.means, self.max])
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram updated with np.bincount
+
+    The range is taken from the first chunk and widened (re-binning the
+    existing counts by bin centre) whenever later values fall outside it.
+    """
+
+    def __init__(self, bins=20, lo=None, hi=None):
+        self.bins = bins
+        self.lo = lo
+        self.hi = hi
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    @property
+    def edges(self):
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    def _bin_index(self, values):
+        index = ((values - self.lo) * (self.bins / (self.hi - self.lo))).astype(np.int64)
+        return np.clip(index, 0, self.bins - 1, out=index)
+
+    def _cover(self, vmin, vmax):
+        """Widen the range to cover [vmin, vmax], re-binning the existing counts"""
+        if self.lo is None:
+            self.lo, self.hi = vmin, (vmax if vmax > vmin else vmin + 1.0)
+            return
+        if vmin >= self.lo and vmax <= self.hi:
+            return
+        # Leave some headroom on the side that grew so a drifting stream rarely re-bins
+        lo, hi = min(self.lo, vmin), max(self.hi, vmax)
+        margin = 0.1 * (hi - lo)
+        lo -= margin if vmin < self.lo else 0.0
+        hi += margin if vmax > self.hi else 0.0
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        self.lo, self.hi = lo, hi
+        self.counts = np.bincount(self._bin_index(centers), weights=self.counts,
+                                  minlength=self.bins).astype(np.int64)
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are skipped)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._cover(values.min(), values.max())
+            self.counts += np.bincount(self._bin_index(values), minlength=self.bins)
+        return self
+
+    def merge(self, other):
+        """Merge another histogram; exact when both share the same edges"""
+        if other.lo is None:
+            return self
+        self._cover(other.lo, other.hi)
+        centers = (other.edges[:-1] + other.edges[1:]) / 2
+        self.counts += np.bincount(self._bin_index(centers), weights=other.counts,
+                                   minlength=self.bins).astype(np.int64)
+        return self
+
+
+class ColumnSummary:
+    """Moments, extremes, approximate quantiles and histogram of one column
+
+    The same object serves the batch path (one update with the whole column)
+    and the streaming path (one update per chunk); partial summaries from
+    chunks or workers combine with merge().
+    """
+
+    def __init__(self, bins=20, compression=100):
+        self.moments = RunningStats(1)
+        self.digest = TDigest(compression)
+        self.histogram = StreamingHistogram(bins)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.moments.update(values)
+            self.digest.update(values)
+            self.histogram.update(values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.histogram.merge(other.histogram)
+        return self
+
+    @property
+    def count(self):
+        return int(self.moments.count[0])
+
+    @property
+    def min(self):
+        return self.moments.min[0]
+
+    @property
+    def max(self):
+        return self.moments.max[0]
+
+    def quantile(self, q):
+        return self.digest.quantile(q)
+
+    def summary(self):
+        """Statistics shown in the data panels"""
+        return {
+            'count': self.count,
+            'mean': self.moments.mean[0],
+            'median': self.quantile(0.5),
+            'std': self.moments.std[0],
+            'min': self.min,
+            'max': self.max,
+        }
+
+
+class CovarianceAccumulator:
+    """Streaming pairwise-complete covariance and correlation (NaN-aware, like pandas)
+
+    Keeps, for every column pair, the count of rows where both are present
+    and shifted sums over those rows, so chunks and workers merge by addition.
+    """
+
+    def __init__(self, num_columns, shift=None):
+        p = num_columns
+        self.shift = None if shift is None else np.asarray(shift, dtype=np.float64)
+        self.n = np.zeros((p, p))
+        self.sx = np.zeros((p, p))   # sx[i, j]: sum of x_i over rows where i and j are present
+        self.sxx = np.zeros((p, p))  # sxx[i, j]: sum of x_i**2 over the same rows
+        self.sxy = np.zeros((p, p))  # sxy[i, j]: sum of x_i * x_j over the same rows
+
+    def update(self, chunk):
+        """Fold a (rows, num_columns) chunk in"""
+        chunk = np.asarray(chunk, dtype=np.float64)
+        valid = ~np.isnan(chunk)
+        if self.shift is None:
+            # Shift by the first chunk's column means for numerical stability
+            with np.errstate(invalid='ignore', divide='ignore'):
+                shift = np.where(valid, chunk, 0.0).sum(axis=0) / valid.sum(axis=0)
+            self.shift = np.nan_to_num(shift)
+        x = np.where(valid, chunk - self.shift, 0.0)
+        mask = valid.astype(np.float64)
+        self.n += mask.T @ mask
+        self.sx += x.T @ mask
+        self.sxx += (x * x).T @ mask
+        self.sxy += x.T @ x
+        return self
+
+    def merge(self, other):
+        """Merge another accumulator, re-expressing its sums relative to this shift"""
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        d = (other.shift - self.shift)[:, None]
+        sx = other.sx + d * other.n
+        self.sxx += other.sxx + 2 * d * other.sx + d * d * other.n
+        self.sxy += other.sxy + d * other.sx.T + d.T * other.sx + d * d.T * other.n
+        self.sx += sx
+        self.n += other.n
+        return self
+
+    def mean(self):
+        """Per-column mean over the rows where that column is present"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.shift + np.diag(self.sx) / np.diag(self.n)
+
+    def covariance(self, ddof=1):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.sxy - self.sx * self.sx.T / self.n) / (self.n - ddof)
+
+    def correlation(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = self.sxx - self.sx * self.sx / self.n
+            return (self.sxy - self.sx * self.sx.T / self.n) / np.sqrt(var * var.T)
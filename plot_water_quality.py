@@ -1,34 +1,88 @@
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from water_data import open_columns
+from water_analysis import analyze_store
 
-# Read water quality data
 csv_file = 'water_potability.csv'
-df = pd.read_csv(csv_file)
+indicators = ['ph', 'Hardness', 'Solids', 'Chloramines', 'Sulfate', 'Conductivity', 'Organic_carbon', 'Trihalomethanes', 'Turbidity']
 
-# Show basic info
-df.info()
-print(df.head())
 
-# Plot distributions of key indicators
-plt.figure(figsize=(16, 10))
-indicators = ['ph', 'Hardness', 'Solids', 'Chloramines', 'Sulfate', 'Conductivity', 'Organic_carbon', 'Trihalomethanes', 'Turbidity']
-for i, col in enumerate(indicators):
-    plt.subplot(3, 3, i+1)
-    sns.histplot(df[col].dropna(), kde=True, bins=30, color='skyblue')
-    plt.title(col)
-plt.tight_layout()
-plt.show()
-
-# Correlation heatmap
-plt.figure(figsize=(10, 8))
-corr = df[indicators].corr()
-sns.heatmap(corr, annot=True, cmap='coolwarm', fmt='.2f')
-plt.title('Correlation of Water Quality Indicators')
-plt.show()
-
-# Potability bar plot
-plt.figure(figsize=(6,4))
-sns.countplot(x='Potability', data=df, palette='Set2')
-plt.title('Potability Distribution (0=Not Potable, 1=Potable)')
-plt.show()
+def compute_statistics(store, rows=None):
+    """Precomputed arrays behind every standard figure (a plain, picklable dict)
+
+    Histograms, KDEs and correlations of all indicators come from one pass over
+    the data; rows optionally restricts them to a subset (e.g. one site).
+    """
+    engine = analyze_store(store, indicators, bins=30, rows=rows)
+    counts, edges = engine.histograms()
+    kde_x, kde_density = engine.kde()
+    potability = store.column('Potability')
+    if rows is not None:
+        potability = potability[rows]
+    return {
+        'rows': len(store) if rows is None else len(rows),
+        'non_null': engine.counts,
+        'counts': counts,
+        'edges': edges,
+        'kde_x': kde_x,
+        'kde_density': kde_density,
+        'corr': engine.correlation(),
+        'potability_counts': np.bincount(potability[~np.isnan(potability)].astype(np.int64), minlength=2),
+    }
+
+
+def plot_distributions(stats):
+    """Distributions of key indicators"""
+    fig = plt.figure(figsize=(16, 10))
+    for i, col in enumerate(indicators):
+        plt.subplot(3, 3, i+1)
+        edges = stats['edges'][i]
+        plt.hist(edges[:-1], bins=edges, weights=stats['counts'][i], color='skyblue', edgecolor='white', alpha=0.75)
+        # Scale the density to the histogram's counts per bin
+        bin_width = edges[1] - edges[0]
+        plt.plot(stats['kde_x'][i], stats['kde_density'][i] * stats['non_null'][i] * bin_width, color='skyblue', linewidth=2)
+        plt.title(col)
+    plt.tight_layout()
+    return fig
+
+
+def plot_correlation(stats):
+    """Correlation heatmap"""
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(stats['corr'], annot=True, cmap='coolwarm', fmt='.2f', xticklabels=indicators, yticklabels=indicators)
+    plt.title('Correlation of Water Quality Indicators')
+    return fig
+
+
+def plot_potability(stats):
+    """Potability bar plot"""
+    fig = plt.figure(figsize=(6,4))
+    plt.bar(['0', '1'], stats['potability_counts'][:2], color=sns.color_palette('Set2', 2))
+    plt.xlabel('Potability')
+    plt.ylabel('count')
+    plt.title('Potability Distribution (0=Not Potable, 1=Potable)')
+    return fig
+
+
+# Standard figures, in display order
+FIGURES = {
+    'distributions': plot_distributions,
+    'correlation': plot_correlation,
+    'potability': plot_potability,
+}
+
+
+if __name__ == '__main__':
+    # Read water quality data (memory-mapped binary columns)
+    store = open_columns(csv_file)
+    stats = compute_statistics(store)
+
+    # Show basic info
+    print(f"{stats['rows']} rows, {len(store.columns)} columns")
+    for col, non_null in zip(indicators, stats['non_null']):
+        print(f'{col:16s} {non_null:8d} non-null')
+
+    for plot in FIGURES.values():
+        plot(stats)
+        plt.show()
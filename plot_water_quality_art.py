@@ -1,23 +1,24 @@
 
 # Artistic tide-like animation: volume, color, speed, height represent different indicators
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.animation as animation
+from water_data import open_columns
 
 plt.style.use('dark_background')
 fig, ax = plt.subplots(figsize=(14, 8))
 
-# Load data
-df = pd.read_csv('water_potability.csv')
-df = df.dropna()
+# Load data (memory-mapped binary columns; pandas is only needed to build the cache).
+# Missing values are median-imputed so every sample is kept.
+store = open_columns('water_potability.csv')
 
 
 
 # Particle/point cloud art animation for water quality indicators
-indicators = [col for col in df.columns if col != 'Potability']
+indicators = [col for col in store.columns if col != 'Potability']
+data = {ind: store.column(ind, fill='median') for ind in indicators}
 num_ind = len(indicators)
-num_points = len(df)
+num_points = len(store)
 colors = plt.cm.rainbow(np.linspace(0, 1, num_ind))
 
  # Normalization function
@@ -26,11 +27,12 @@ def norm(arr):
     return (arr - arr.min()) / (arr.max() - arr.min() + 1e-8)
 
  # Point attributes: position, color, size, speed
-point_x = np.random.uniform(0, 1, (num_ind, num_points)) * 12 - 6  # Random initial position
-point_y = np.random.uniform(0, 1, (num_ind, num_points)) * 6 - 3
-sizes = [norm(df[ind]) * 80 + 20 for ind in indicators]
-speeds = [norm(df[ind]) * 0.08 + 0.02 for ind in indicators]
-color_vals = [norm(df[ind]) for ind in indicators]
+rng = np.random.default_rng(42)  # fixed seed: the same start layout on every run
+point_x = rng.uniform(0, 1, (num_ind, num_points)) * 12 - 6  # Random initial position
+point_y = rng.uniform(0, 1, (num_ind, num_points)) * 6 - 3
+sizes = [norm(data[ind]) * 80 + 20 for ind in indicators]
+speeds = [norm(data[ind]) * 0.08 + 0.02 for ind in indicators]
+color_vals = [norm(data[ind]) for ind in indicators]
 
 scatters = []
 for i in range(num_ind):
@@ -60,7 +62,7 @@ def animate(frame):
     for i in range(num_ind):
     # Make points drift along circular trajectories, with speed and radius controlled by data
         angle = frame * speeds[i] + np.linspace(0, 2*np.pi, num_points)
-        radius = norm(df[indicators[i]]) * 2 + 1
+        radius = norm(data[indicators[i]]) * 2 + 1
         cx = np.cos(angle) * radius
         cy = np.sin(angle) * radius
     # Make points slowly drift on the canvas
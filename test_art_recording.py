@@ -0,0 +1,63 @@
+# A recording must play back exactly the quantized frames of a live run, in any order
+import numpy as np
+import pandas as pd
+import pytest
+from art_frames import FrameDecoder, FrameEncoder
+from art_modes import ModeEngine
+from art_recording import Recording, record
+from water_data import open_columns
+from water_stream import COLUMNS
+
+
+@pytest.fixture
+def csv(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(10, 3, (400, len(COLUMNS))), columns=COLUMNS)
+    frame['Potability'] = rng.integers(0, 2, len(frame))
+    path = tmp_path / 'samples.csv'
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def live_frames(csv, mode, indicator, frames, seed=0):
+    """Quantized frames of the same run, each encoded as a keyframe"""
+    data = open_columns(csv).column(indicator, fill='median').astype(np.float64)
+    normalized = (data - data.min()) / (data.max() - data.min() + 1e-8)
+    engine = ModeEngine('enhanced')
+    art_mode = engine.activate(mode, normalized, np.random.default_rng(seed))
+    encoder = FrameEncoder()
+    out = []
+    for _ in range(frames):
+        encoder.update(*art_mode.as_points(engine.step()))
+        out.append(tuple(a.copy() for a in FrameDecoder().decode(encoder.keyframe())))
+    return out
+
+
+@pytest.mark.parametrize('mode', ['galaxy', 'wave'])
+def test_recording_round_trip(tmp_path, csv, mode):
+    path = str(tmp_path / f'{mode}.aqrec')
+    header = record(path, mode=mode, indicator='ph', frames=45, data_path=csv, chunk_frames=16)
+    expected = live_frames(csv, mode, 'ph', 45)
+
+    recording = Recording(path)
+    try:
+        assert len(recording) == 45 and recording.header == header
+        assert header['points'] == len(expected[0][1])
+        for k in range(45):
+            for got, want in zip(recording.frame(k), expected[k]):
+                np.testing.assert_array_equal(got, want)
+        # Seeking backwards, across chunks and within a chunk
+        for k in (44, 3, 31, 16, 15, 0, 17):
+            for got, want in zip(recording.frame(k), expected[k]):
+                np.testing.assert_array_equal(got, want)
+        with pytest.raises(IndexError):
+            recording.frame(45)
+    finally:
+        recording.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_recording.aqrec'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        Recording(str(path))
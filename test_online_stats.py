@@ -0,0 +1,67 @@
+# Chunked and merged online statistics must match pandas on the whole data
+import numpy as np
+import pandas as pd
+from online_stats import CovarianceAccumulator, RunningStats, TDigest
+
+
+def sample(rows=5000, seed=0):
+    """Correlated columns with a large offset and about 10% missing values"""
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(rows, 4)) @ rng.normal(size=(4, 4)) + [1e6, 50, -3, 0]
+    base[rng.random(base.shape) < 0.1] = np.nan
+    return base
+
+
+def split(data, bounds=(0, 1, 700, 2400, 5000)):
+    return [data[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def test_running_stats_chunks_and_merge_match_pandas():
+    data = sample()
+    frame = pd.DataFrame(data)
+    chunked = RunningStats(4)
+    for chunk in split(data):
+        chunked.update(chunk)
+    left, right = RunningStats(4), RunningStats(4)
+    left.update(data[:1800])
+    right.update(data[1800:])
+    merged = left.merge(right)
+    for stats in (chunked, merged):
+        np.testing.assert_array_equal(stats.count, frame.count().to_numpy())
+        np.testing.assert_allclose(stats.mean, frame.mean().to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(stats.variance, frame.var().to_numpy(), rtol=1e-9)
+        np.testing.assert_array_equal(stats.min, frame.min().to_numpy())
+        np.testing.assert_array_equal(stats.max, frame.max().to_numpy())
+
+
+def test_covariance_chunks_and_merge_match_pandas():
+    data = sample(seed=1)
+    frame = pd.DataFrame(data)
+    chunked = CovarianceAccumulator(4)
+    for chunk in split(data):
+        chunked.update(chunk)
+    # Different shifts on each side exercise the re-expression in merge()
+    merged = CovarianceAccumulator(4).update(data[:3000]).merge(CovarianceAccumulator(4).update(data[3000:]))
+    for acc in (chunked, merged):
+        np.testing.assert_allclose(acc.mean(), frame.mean().to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(acc.covariance(), frame.cov().to_numpy(), rtol=1e-8, atol=1e-8)
+        np.testing.assert_allclose(acc.correlation(), frame.corr().to_numpy(), rtol=1e-8, atol=1e-10)
+
+
+def test_tdigest_quantile_ranks_close_to_exact():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([rng.normal(7, 1.5, 40_000), rng.exponential(3, 20_000)])
+    values[rng.random(len(values)) < 0.05] = np.nan
+    q = np.array([0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999])
+
+    digests = [TDigest().update(chunk) for chunk in np.array_split(values, 7)]
+    merged = digests[0]
+    for digest in digests[1:]:
+        merged.merge(digest)
+    single = TDigest().update(values)
+    for digest in (merged, single):
+        assert digest.count == np.count_nonzero(~np.isnan(values))
+        assert digest.min == np.nanmin(values) and digest.max == np.nanmax(values)
+        # Rank error, which the digest bounds (tighter in the tails)
+        ranks = np.searchsorted(np.sort(values[~np.isnan(values)]), digest.quantile(q)) / digest.count
+        np.testing.assert_allclose(ranks, q, atol=0.005)
@@ -0,0 +1,39 @@
+# Rolling windows and calendar aggregation must match pandas on irregular lengths
+import numpy as np
+import pandas as pd
+import pytest
+from tide_series import aggregate, resample, rolling, synthetic_tides
+
+
+@pytest.mark.parametrize('n, window', [(1, 1), (10, 1), (10, 3), (97, 8), (100, 10), (101, 100), (50, 50), (5, 6)])
+@pytest.mark.parametrize('stat', ['mean', 'std', 'max', 'min'])
+def test_rolling_matches_pandas(n, window, stat):
+    rng = np.random.default_rng(n * 1000 + window)
+    values = rng.normal(2, 0.7, n)
+    times = np.datetime64('2023-01-01T00:00') + np.arange(n) * np.timedelta64(10, 'm')
+    ends, result = rolling(times, values, window, stat)
+    series = pd.Series(values).rolling(window)
+    expected = (series.std(ddof=0) if stat == 'std' else getattr(series, stat)()).to_numpy()[window - 1:]
+    assert len(result) == len(ends) == max(0, n - window + 1)
+    # The std comes from running sums; sqrt turns their rounding near zero variance into ~1e-8
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-7 if stat == 'std' else 0)
+    np.testing.assert_array_equal(ends, times[window - 1:])
+
+
+def test_rolling_rejects_empty_window():
+    with pytest.raises(ValueError):
+        rolling(np.arange(5), np.arange(5.0), 0)
+
+
+@pytest.mark.parametrize('unit, freq', [('D', 'D'), ('M', 'MS'), ('Y', 'YS')])
+def test_aggregate_matches_pandas_resample(unit, freq):
+    turning_times, turning_heights = synthetic_tides(3)
+    times, heights = resample(turning_times, turning_heights, np.timedelta64(1, 'h'))
+    stats = aggregate(times, heights, unit)
+    expected = pd.Series(heights, index=pd.DatetimeIndex(times)).resample(freq).agg(
+        ['max', 'min', 'mean', 'count'])
+    expected = expected[expected['count'] > 0]
+    np.testing.assert_array_equal(stats['time'].astype('datetime64[ns]'), expected.index.to_numpy())
+    for key in ('max', 'min', 'mean', 'count'):
+        np.testing.assert_allclose(stats[key], expected[key].to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(stats['range'], expected['max'] - expected['min'], rtol=1e-12)
@@ -0,0 +1,62 @@
+# The columnar cache must read back like pandas and follow changes to its CSV
+import os
+import numpy as np
+import pandas as pd
+from water_data import META_FILE, open_columns
+from water_stream import COLUMNS
+
+
+def write_csv(path, rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(10, 3, (rows, len(COLUMNS))), columns=COLUMNS)
+    frame = frame.mask(rng.random(frame.shape) < 0.1)
+    frame['Potability'] = rng.integers(0, 2, rows)
+    frame.to_csv(path, index=False)
+    return pd.read_csv(path, dtype=np.float32)
+
+
+def test_columns_match_pandas(tmp_path):
+    csv = tmp_path / 'samples.csv'
+    frame = write_csv(csv)
+    store = open_columns(str(csv))
+    assert len(store) == len(frame)
+    complete = frame.dropna()
+    for col in COLUMNS:
+        np.testing.assert_array_equal(store.column(col), frame[col].to_numpy())
+        np.testing.assert_array_equal(store.column(col, complete_only=True), complete[col].to_numpy())
+    np.testing.assert_array_equal(store.complete_rows, complete.index.to_numpy())
+
+
+def test_cache_is_reused_until_the_csv_changes(tmp_path):
+    csv = tmp_path / 'samples.csv'
+    write_csv(csv)
+    store = open_columns(str(csv))
+    meta_path = os.path.join(store.directory, META_FILE)
+    built = os.stat(meta_path).st_mtime_ns
+    store.column('ph', fill='median')
+    assert os.path.isdir(os.path.join(store.directory, 'filled_median'))
+
+    assert os.stat(os.path.join(open_columns(str(csv)).directory, META_FILE)).st_mtime_ns == built
+
+    frame = write_csv(csv, rows=300, seed=1)
+    fresh = open_columns(str(csv))
+    assert len(fresh) == 300
+    np.testing.assert_array_equal(fresh.column('Sulfate'), frame['Sulfate'].to_numpy())
+    # Imputed copies of the old conversion are gone, and no temporary directory is left behind
+    assert not os.path.exists(os.path.join(fresh.directory, 'filled_median'))
+    assert sorted(os.listdir(tmp_path)) == ['samples.columns', 'samples.csv']
+    filled = fresh.column('Sulfate', fill='median')
+    np.testing.assert_array_equal(filled, frame['Sulfate'].fillna(frame['Sulfate'].median()).to_numpy())
+
+
+def test_fill_is_recomputed_for_other_parameters(tmp_path):
+    csv = tmp_path / 'samples.csv'
+    write_csv(csv)
+    store = open_columns(str(csv))
+    default = np.array(store.column('ph', fill='knn'))
+    other = np.array(store.column('ph', fill='knn', k=3))
+    assert os.path.isdir(os.path.join(store.directory, 'filled_knn'))
+    assert os.path.isdir(os.path.join(store.directory, 'filled_knn_k=3'))
+    missing = np.isnan(store.column('ph'))
+    assert not np.isnan(default).any() and not np.isnan(other).any()
+    assert not np.array_equal(default[missing], other[missing])
@@ -0,0 +1,47 @@
+# Imputation must fill every gap it can, whatever the data looks like
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from water_impute import Imputer, synthetic_table
+
+
+def fit_transform(method, X, labels=None, **params):
+    columns = [X[:, j] for j in range(X.shape[1])]
+    return Imputer(method, **params).fit(columns, labels).transform(X.copy(), labels)
+
+
+@pytest.mark.parametrize('method', ['median', 'class_median', 'knn'])
+def test_fills_every_gap(method):
+    X, labels = synthetic_table(2000, seed=1)
+    filled = fit_transform(method, X, labels)
+    assert not np.isnan(filled).any()
+    observed = ~np.isnan(X)
+    np.testing.assert_array_equal(filled[observed], X[observed])
+
+
+def test_median_matches_pandas():
+    X, _ = synthetic_table(2000, seed=2)
+    filled = fit_transform('median', X)
+    frame = pd.DataFrame(X)
+    expected = frame.fillna(frame.median()).to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(filled, expected, rtol=1e-6)
+
+
+def test_class_median_matches_pandas():
+    X, labels = synthetic_table(2000, seed=3)
+    filled = fit_transform('class_median', X, labels)
+    frame = pd.DataFrame(X)
+    expected = frame.groupby(labels).transform(lambda col: col.fillna(col.median())).to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(filled, expected, rtol=1e-6)
+
+
+def test_knn_without_complete_rows_falls_back_to_medians():
+    X, _ = synthetic_table(500, seed=4)
+    X[:, 3] = np.nan  # one indicator is never measured, so no row is complete
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        filled = fit_transform('knn', X, k=5)
+        medians = fit_transform('median', X)
+    np.testing.assert_array_equal(filled, medians)
+    assert not np.isnan(np.delete(filled, 3, axis=1)).any()
@@ -0,0 +1,69 @@
+# Range queries through sorted indexes and bitsets must match brute-force comparisons
+import numpy as np
+import pytest
+from water_query import QueryIndex, parse_predicates
+
+
+def columns(rows=3001, seed=0):
+    """float32 columns with ties on round values and about 10% missing"""
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.normal(7, 2, (3, rows)), 1).astype(np.float32)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    return ['ph', 'Sulfate', 'Turbidity'], list(values)
+
+
+def brute_force(names, cols, ranges):
+    keep = np.ones(len(cols[0]), dtype=bool)
+    for name, (lo, hi) in ranges.items():
+        values = cols[names.index(name)].astype(np.float64)
+        keep &= (values >= lo) & (values <= hi)
+    return keep
+
+
+# Narrow slices are scattered, nearly full ones scatter their complement, the rest are compared
+@pytest.mark.parametrize('lo, hi', [(7.0, 7.0), (6.95, 7.05), (-np.inf, 3.0), (2.0, np.inf),
+                                    (-np.inf, 100.0), (5.0, 9.0), (6.5, 6.4), (20.0, 30.0)])
+def test_bitset_matches_brute_force(lo, hi):
+    names, cols = columns()
+    index = QueryIndex(names, cols)
+    mask = np.unpackbits(index.bitset('ph', lo, hi), count=index.n).view(bool)
+    np.testing.assert_array_equal(mask, brute_force(names, cols, {'ph': (lo, hi)}))
+
+
+@pytest.mark.parametrize('predicates', [['ph<7'], ['ph<=7'], ['ph>7', 'ph<7.3'], ['ph>=6.5', 'Sulfate<8.1'],
+                                        ['ph>5', 'Sulfate>=4', 'Turbidity<=9.9'], ['Turbidity>0.05']])
+def test_select_matches_brute_force(predicates):
+    names, cols = columns(seed=1)
+    index = QueryIndex(names, cols)
+    ranges = parse_predicates(predicates)
+    np.testing.assert_array_equal(index.select(ranges), brute_force(names, cols, ranges))
+
+
+def test_strict_bounds_exclude_the_value():
+    names, cols = columns()
+    index = QueryIndex(names, cols)
+    at_seven = cols[0] == np.float32(7.0)
+    assert at_seven.any()
+    assert not index.select(parse_predicates(['ph<7']))[at_seven].any()
+    assert index.select(parse_predicates(['ph<=7']))[at_seven].all()
+
+
+def test_select_without_restriction_returns_none():
+    names, cols = columns()
+    index = QueryIndex(names, [np.nan_to_num(col) for col in cols])
+    assert index.select({}) is None
+    assert index.select({'ph': (-np.inf, np.inf)}) is None
+
+
+def test_dragging_a_range_replaces_the_cached_bitset():
+    names, cols = columns()
+    index = QueryIndex(names, cols)
+    for hi in (6.0, 6.5, 7.0, 8.0):
+        np.testing.assert_array_equal(index.select({'ph': (5.0, hi), 'Sulfate': (6.0, 8.0)}),
+                                      brute_force(names, cols, {'ph': (5.0, hi), 'Sulfate': (6.0, 8.0)}))
+    assert sorted(key[0] for key in index._bits) == ['Sulfate', 'ph']
+
+
+def test_parse_rejects_malformed_predicates():
+    with pytest.raises(ValueError):
+        parse_predicates(['ph = 7'])
@@ -0,0 +1,34 @@
+# Malformed stream input must not cost the rest of the chunk
+import io
+import numpy as np
+from water_stream import COLUMNS, CsvTailSource, LineSource, parse_csv_lines
+
+GOOD = '7.0,200,20000,7,330,420,14,66,4,1\n'
+BAD = '1,2,x,4,5,6,7,8,9,0\n'
+
+
+def test_parse_csv_lines_coerces_bad_fields():
+    rows = parse_csv_lines([GOOD, BAD, GOOD], COLUMNS)
+    assert rows.shape == (3, len(COLUMNS))
+    assert np.isnan(rows[1, 2])
+    assert rows[1, 3] == 4
+    assert rows[2, 0] == np.float32(7.0)
+
+
+def test_csv_tail_source_keeps_chunk_with_malformed_line(tmp_path):
+    path = tmp_path / 'samples.csv'
+    path.write_text(','.join(COLUMNS) + '\n' + GOOD + BAD + GOOD)
+    source = CsvTailSource(str(path))
+    rows = source.read_chunk()
+    source.close()
+    assert len(rows) == 3
+    assert np.isnan(rows[1, 2])
+
+
+def test_line_source_keeps_chunk_with_malformed_line():
+    source = LineSource(io.StringIO(GOOD + BAD + '{"ph": 6.5}\n'))
+    source.reader.join()
+    rows = source.read_chunk()
+    assert len(rows) == 3
+    assert np.isnan(rows[1, 2])
+    assert rows[2, 0] == np.float32(6.5)
@@ -0,0 +1,199 @@
+# Tide Series Aggregation: resampling, rolling windows and calendar statistics
+#
+# Tide tables list only the turning points (high and low waters). Between two
+# of them the height follows roughly half a cosine, so resample() builds a
+# fixed-step series from the turning points ('cosine', or a 'cubic' Hermite
+# curve). Calendar statistics run np.*.reduceat over the runs of equal day or
+# month in the sorted timestamps. Rolling means and standard deviations come
+# from cumulative sums, and rolling extrema from block-wise running maxima, so
+# decades of data take milliseconds.
+import argparse
+import time
+import numpy as np
+
+HTML_FILE = 'crawled-page-2023.html'
+
+
+def resample(times, heights, step=np.timedelta64(10, 'm'), method='cosine'):
+    """Heights on a fixed grid from the first to the last turning point
+
+    times must be sorted datetime64 values. Returns (grid times, heights).
+    """
+    times = np.asarray(times)
+    heights = np.asarray(heights, dtype=np.float64)
+    grid = np.arange(times[0], times[-1] + step, step)
+    grid = grid[grid <= times[-1]]
+    # Seconds since the first turning point
+    t = (times - times[0]) / np.timedelta64(1, 's')
+    g = (grid - times[0]) / np.timedelta64(1, 's')
+
+    # Interval of every grid sample: both are sorted, so count samples per
+    # interval (one search per turning point) instead of searching per sample
+    first = np.searchsorted(g, t, side='left')
+    k = np.repeat(np.arange(len(t)), np.diff(np.r_[first, len(g)]))
+    np.minimum(k, len(t) - 2, out=k)
+    dt = t[k + 1] - t[k]
+    u = np.divide(g - t[k], dt, out=np.zeros_like(g), where=dt > 0)
+    h0, h1 = heights[k], heights[k + 1]
+    if method == 'cosine':
+        return grid, h0 + (h1 - h0) * (1 - np.cos(np.pi * u)) / 2
+    if method == 'cubic':
+        # Cubic Hermite with finite-difference slopes at the turning points
+        slopes = np.gradient(heights, t) if len(t) > 2 else np.full(len(t), (h1[0] - h0[0]) / dt[0])
+        u2, u3 = u * u, u * u * u
+        return grid, ((2*u3 - 3*u2 + 1) * h0 + (u3 - 2*u2 + u) * dt * slopes[k] +
+                      (-2*u3 + 3*u2) * h1 + (u3 - u2) * dt * slopes[k + 1])
+    raise ValueError(f'unknown interpolation method {method!r}')
+
+
+def calendar_groups(times, unit='D'):
+    """(period starts, index of each period's first sample) of sorted times; unit 'D', 'M' or 'Y'"""
+    keys = np.asarray(times).astype(f'datetime64[{unit}]')
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], starts
+
+
+def aggregate(times, values, unit='D'):
+    """Max, min, mean, range and count of values per calendar period"""
+    values = np.asarray(values, dtype=np.float64)
+    periods, starts = calendar_groups(times, unit)
+    counts = np.diff(np.r_[starts, len(values)])
+    high = np.maximum.reduceat(values, starts)
+    low = np.minimum.reduceat(values, starts)
+    return {
+        'time': periods,
+        'max': high,
+        'min': low,
+        'mean': np.add.reduceat(values, starts) / counts,
+        'range': high - low,
+        'count': counts,
+    }
+
+
+def rolling_mean(values, window):
+    """Mean of every full window (length len(values) - window + 1)"""
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.cumsum(np.r_[0.0, values])
+    return (sums[window:] - sums[:-window]) / window
+
+
+def rolling_std(values, window):
+    """Population standard deviation of every full window"""
+    values = np.asarray(values, dtype=np.float64)
+    # Shift by the overall mean first, so the sum of squares does not cancel badly
+    centred = values - values.mean()
+    sums = np.cumsum(np.r_[0.0, centred])
+    squares = np.cumsum(np.r_[0.0, centred * centred])
+    mean = (sums[window:] - sums[:-window]) / window
+    return np.sqrt(np.maximum((squares[window:] - squares[:-window]) / window - mean * mean, 0.0))
+
+
+def _rolling_extreme(values, window, combine, fill):
+    """van Herk / Gil-Werman: running extremes within blocks of `window` samples"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if window > n:
+        return np.empty(0)  # no full window, as for the mean and std
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = values
+    padded = padded.reshape(blocks, window)
+    prefix = combine.accumulate(padded, axis=1).ravel()
+    suffix = combine.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    # Window [i, i + window) = the rest of i's block + the start of the next block
+    return combine(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def rolling_max(values, window):
+    """Maximum of every full window"""
+    return _rolling_extreme(values, window, np.maximum, -np.inf)
+
+
+def rolling_min(values, window):
+    """Minimum of every full window"""
+    return _rolling_extreme(values, window, np.minimum, np.inf)
+
+
+ROLLING = {'mean': rolling_mean, 'std': rolling_std, 'max': rolling_max, 'min': rolling_min}
+
+
+def rolling(times, values, window, stat='mean'):
+    """(window end times, statistic) over windows of `window` samples"""
+    if window < 1:
+        raise ValueError(f'rolling window must be at least 1 sample, got {window}')
+    return np.asarray(times)[window - 1:], ROLLING[stat](values, window)
+
+
+def synthetic_tides(years=30, start='1990-01-01', seed=0):
+    """Turning points of a mixed semi-diurnal tide (M2, S2, K1, O1) over many years"""
+    rng = np.random.default_rng(seed)
+    step = np.timedelta64(6, 'm')
+    hours = np.arange(int(years * 365.25 * 24 * 10)) / 10
+    h = (1.3 + 0.6 * np.cos(2 * np.pi * hours / 12.42) + 0.25 * np.cos(2 * np.pi * hours / 12.0)
+         + 0.35 * np.cos(2 * np.pi * hours / 23.93) + 0.25 * np.cos(2 * np.pi * hours / 25.82))
+    # Turning points: sign changes of the slope
+    slope = np.diff(h)
+    turning = np.flatnonzero(np.sign(slope[1:]) != np.sign(slope[:-1])) + 1
+    times = np.datetime64(start, 'm') + turning * step
+    return times, np.round(h[turning] + rng.normal(0, 0.03, len(turning)), 2)
+
+
+def plot_overlays(ax, times, heights, unit='D', step=np.timedelta64(10, 'm'), method='cosine'):
+    """Resampled curve with the per-period range as a band and the period means as steps"""
+    grid, curve = resample(times, heights, step, method)
+    stats = aggregate(grid, curve, unit)
+    edges = np.r_[stats['time'], stats['time'][-1] + np.timedelta64(1, unit)].astype('datetime64[m]')
+    ax.plot(grid, curve, color='#45B7D1', linewidth=0.6, alpha=0.8, label=f'{method} resampled')
+    ax.stairs(stats['max'], edges, baseline=stats['min'], fill=True, color='#FFD93D', alpha=0.25,
+              label=f'{unit} range')
+    ax.stairs(stats['mean'], edges, color='#FF6B6B', linewidth=1.5, label=f'{unit} mean')
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resample and aggregate tide heights')
+    parser.add_argument('--html', default=HTML_FILE, help='tide table page')
+    parser.add_argument('--year', type=int, default=2023, help='year of the tide table')
+    parser.add_argument('--unit', default='D', choices=['D', 'M', 'Y'], help='calendar period')
+    parser.add_argument('--method', default='cosine', choices=['cosine', 'cubic'])
+    parser.add_argument('--years', type=int, help='also time a synthetic series of this many years')
+    parser.add_argument('--plot', action='store_true', help='plot the overlays')
+    args = parser.parse_args()
+
+    from main import parse_tide_series
+    times, heights = parse_tide_series(args.html, args.year)
+    grid, curve = resample(times, heights, method=args.method)
+    monthly = aggregate(grid, curve, 'M')
+    print(f'{len(times)} turning points -> {len(grid):,} samples every 10 minutes')
+    for period, high, low, mean in zip(monthly['time'], monthly['max'], monthly['min'], monthly['mean']):
+        print(f'  {period}: max {high:.2f} m  min {low:.2f} m  mean {mean:.2f} m  range {high - low:.2f} m')
+
+    if args.years:
+        times_s, heights_s = synthetic_tides(args.years)
+        start = time.perf_counter()
+        grid_s, curve_s = resample(times_s, heights_s, method=args.method)
+        resampled = time.perf_counter()
+        daily = aggregate(grid_s, curve_s, 'D')
+        aggregate(grid_s, curve_s, 'M')
+        grouped = time.perf_counter()
+        rolling_max(curve_s, 6 * 24 * 30)
+        rolling_mean(curve_s, 6 * 24 * 30)
+        rolled = time.perf_counter()
+        print(f'{args.years} synthetic years ({len(times_s):,} turning points, {len(grid_s):,} samples): '
+              f'resample {(resampled - start) * 1e3:.0f}ms, daily+monthly {(grouped - resampled) * 1e3:.0f}ms, '
+              f'30-day rolling max+mean {(rolled - grouped) * 1e3:.0f}ms ({len(daily["time"]):,} days)')
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(14, 6))
+        ax.plot(times, heights, '.', color='white', markersize=2, label='turning points')
+        plot_overlays(ax, times, heights, args.unit, method=args.method)
+        ax.set_title(f'{args.year} Chek Lap Kok Tide Height', fontsize=18, fontweight='bold')
+        ax.set_ylabel('Tide Height (m)', fontsize=14)
+        ax.legend()
+        plt.tight_layout()
+        plt.show()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+# Multi-Site Dashboard: one enhanced art panel per dataset or site, in a grid
+#
+# Every dataset is loaded once, by the main process, into one
+# multiprocessing.shared_memory block holding all of its columns (missing values
+# filled with medians). Worker processes attach to the blocks by name and read
+# the columns as NumPy views, so memory grows with the number of distinct
+# datasets, not with the number of panels: two panels on the same file share
+# one block.
+#
+# The panels are split round-robin over the workers. Each worker owns an Agg
+# canvas per panel, steps the panel's art mode (art_modes.py) and rasterises
+# the frame straight into a shared RGBA frame block. Modes that support blitting
+# only redraw their moving artists. The main process shows the frames as
+# images. It asks for frame k + 1 as soon as frame k is copied out, so the
+# workers render the next frame while the main process draws this one.
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from art_frames import INDICATOR_COLORS
+from art_modes import MODES, ModeEngine
+from water_data import COLUMNS, DATA_FILE, open_columns
+
+
+class SharedDataset:
+    """Every column of one dataset as a (columns, rows) float32 array in shared memory"""
+
+    def __init__(self, label, columns, block, rows, owner):
+        self.label = label
+        self.columns = list(columns)
+        self.block = block
+        self.rows = rows
+        self.owner = owner
+        self.values = np.ndarray((len(self.columns), rows), dtype=np.float32, buffer=block.buf)
+
+    @classmethod
+    def create(cls, label, columns, arrays):
+        """Copy equal-length columns into a new block"""
+        rows = len(arrays[0]) if len(arrays) else 0
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(columns) * rows * 4))
+        dataset = cls(label, columns, block, rows, owner=True)
+        for j, values in enumerate(arrays):
+            dataset.values[j] = values
+        return dataset
+
+    @classmethod
+    def attach(cls, spec):
+        """The dataset behind spec() in another process, without copying"""
+        return cls(spec['label'], spec['columns'], shared_memory.SharedMemory(name=spec['name']),
+                   spec['rows'], owner=False)
+
+    def spec(self):
+        """Picklable description of the block for attach()"""
+        return {'label': self.label, 'name': self.block.name, 'columns': self.columns, 'rows': self.rows}
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def column(self, name):
+        return self.values[self.columns.index(name)]
+
+    def close(self):
+        """Detach; the creating process also frees the block"""
+        self.values = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+
+def load_csv(path):
+    """A CSV's columns in a new shared block (indicators median-filled, Potability as is)"""
+    store = open_columns(path)
+    arrays = [store.column(col) if col == 'Potability' else store.column(col, fill='median')
+              for col in store.columns]
+    label = os.path.splitext(os.path.basename(path))[0]
+    return SharedDataset.create(label, store.columns, arrays)
+
+
+def synthetic_site(k, rows):
+    """Seeded synthetic site k, shifted into water-quality-like ranges as the benchmarks do"""
+    from water_impute import synthetic_table
+
+    X, labels = synthetic_table(rows, len(COLUMNS) - 1, seed=k)
+    X = X * 10 + 50
+    X = np.where(np.isnan(X), np.nanmedian(X, axis=0), X)
+    return SharedDataset.create(f'Site {k + 1}', COLUMNS, [X[:, j] for j in range(X.shape[1])] + [labels])
+
+
+class SitePanel:
+    """One panel of a worker: an art mode over one shared dataset, drawn on its own Agg canvas
+
+    Also provides what ArtMode.draw() asks of a panel (no potability model or outliers).
+    """
+
+    show_outliers = False
+    color_by_potability = False
+    indicator_colors = INDICATOR_COLORS
+
+    def __init__(self, dataset, size, dpi=100):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.dataset = dataset
+        self.indicators = [col for col in dataset.columns if col != 'Potability']
+        self.fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi, facecolor='black')
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_axes([0, 0, 1, 0.9])
+        self.engine = ModeEngine('enhanced')
+        self.embedding = None
+        self.embedding_worker = None
+
+    def column(self, indicator):
+        return self.dataset.column(indicator)
+
+    def point_colors(self, indices, default):
+        return default
+
+    def point_edges(self, indices, default, width):
+        return default, width
+
+    def embedding_future(self):
+        if self.embedding is None:
+            from water_embedding import EmbeddingWorker
+            self.embedding_worker = EmbeddingWorker()
+            X = np.column_stack([self.dataset.column(col) for col in self.indicators])
+            self.embedding = self.embedding_worker.submit(X)
+        return self.embedding
+
+    def show(self, indicator, mode, seed=0):
+        """Lay out and draw a scene; the moving artists are left out of the blit background"""
+        self.current_indicator = indicator
+        data = self.dataset.column(indicator)
+        lo, hi = float(data.min()), float(data.max())
+        normalized = (data - lo) / (hi - lo + 1e-8)
+        self.mode = self.engine.activate(mode, normalized, np.random.default_rng(seed), key=indicator)
+        self.t = 0
+
+        ax = self.ax
+        ax.clear()
+        ax.set_facecolor('#0a0a1a')
+        ax.set_xlim(-10, 10)
+        ax.set_ylim(-8, 8)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        self.fig.texts.clear()
+        self.fig.text(0.5, 0.95, f'{self.dataset.label}: {indicator} - {self.mode.title}', ha='center',
+                      va='center', fontsize=12, color='white', fontweight='bold')
+        self.mode.draw(ax, self)
+
+        self.animated = self.mode.apply(self.engine.step()) if self.mode.supports_blit else None
+        for artist in self.animated or []:
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox) if self.animated is not None else None
+
+    def render(self, out):
+        """Advance one frame and rasterise it into out, an (height, width, 4) uint8 array"""
+        artists = self.mode.apply(self.engine.step())
+        if self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            for artist in artists:
+                self.ax.draw_artist(artist)
+        out[...] = np.asarray(self.canvas.buffer_rgba())
+
+
+def render_worker(conn, dataset_specs, frames_spec, panels, size):
+    """Worker process: renders its panels ([(panel index, dataset index)]) on request
+
+    Messages: ('scene', [(indicator, mode)] for every panel), ('frame',) and ('stop',).
+    """
+    datasets = {}
+    for _, d in panels:
+        if d not in datasets:
+            datasets[d] = SharedDataset.attach(dataset_specs[d])
+    frames_block = shared_memory.SharedMemory(name=frames_spec['name'])
+    frames = np.ndarray(frames_spec['shape'], dtype=np.uint8, buffer=frames_block.buf)
+    mine = [(i, SitePanel(datasets[d], size)) for i, d in panels]
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == 'stop':
+                break
+            start = time.perf_counter()
+            if message[0] == 'scene':
+                for i, panel in mine:
+                    panel.show(*message[1][i])
+            for i, panel in mine:
+                panel.render(frames[i])
+            conn.send(time.perf_counter() - start)
+    finally:
+        del frames
+        frames_block.close()
+        for dataset in datasets.values():
+            dataset.close()
+
+
+# Main window: figure size and the margins of its grid of panels
+FIGSIZE, DPI = (12.8, 7.2), 100
+GRID = dict(left=0.01, right=0.99, bottom=0.05, top=0.93, wspace=0.02, hspace=0.02)
+
+
+def grid_shape(n):
+    """(rows, cols) of a near-square grid of n panels"""
+    cols = math.ceil(math.sqrt(n))
+    return math.ceil(n / cols), cols
+
+
+def panel_size(n):
+    """Pixel (width, height) of one grid cell of the main window, the size the workers render"""
+    rows, cols = grid_shape(n)
+    width = FIGSIZE[0] * DPI * (GRID['right'] - GRID['left']) / (cols + GRID['wspace'] * (cols - 1))
+    height = FIGSIZE[1] * DPI * (GRID['top'] - GRID['bottom']) / (rows + GRID['hspace'] * (rows - 1))
+    return int(width), int(height)
+
+
+class Dashboard:
+    """Grid of panels (one per (dataset index, indicator)), rendered by worker processes"""
+
+    def __init__(self, datasets, panels, mode='galaxy', workers=None, size=None):
+        self.datasets = datasets
+        self.panels = panels
+        self.modes = list(MODES['enhanced'])
+        self.scenes = [(indicator, mode) for _, indicator in panels]
+        self.size = size or panel_size(len(panels))
+        workers = min(len(panels), workers or os.cpu_count() or 1)
+
+        # One (height, width, RGBA) frame per panel, written by the workers
+        shape = (len(panels), self.size[1], self.size[0], 4)
+        self.frames_block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self.frames = np.ndarray(shape, dtype=np.uint8, buffer=self.frames_block.buf)
+        self.frames[...] = 0
+        frames_spec = {'name': self.frames_block.name, 'shape': shape}
+
+        # Spawned, not forked: the workers must not inherit the main process's GUI state
+        context = multiprocessing.get_context('spawn')
+        specs = [dataset.spec() for dataset in datasets]
+        self.connections, self.processes = [], []
+        for w in range(workers):
+            mine = [(i, d) for i, (d, _) in enumerate(panels) if i % workers == w]
+            parent, child = context.Pipe()
+            process = context.Process(target=render_worker, args=(child, specs, frames_spec, mine, self.size),
+                                      daemon=True)
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.busy = 0.0
+        self.pending = ('frame',)
+        self.request(('scene', self.scenes))
+
+    @property
+    def shared_bytes(self):
+        return sum(dataset.nbytes for dataset in self.datasets)
+
+    def request(self, message):
+        for conn in self.connections:
+            conn.send(message)
+
+    def collect(self):
+        """Wait for every worker's frame; returns the slowest worker's render time"""
+        self.busy = max(conn.recv() for conn in self.connections)
+        return self.busy
+
+    def advance(self):
+        """Wait for the frame being rendered, then ask for the next one (or the pending scene change)"""
+        self.collect()
+        frames = self.frames.copy()  # the workers overwrite the block from now on
+        self.request(self.pending)
+        self.pending = ('frame',)
+        return frames
+
+    def switch(self, indicator_step=0, mode_step=0):
+        """Next or previous indicator and/or mode on every panel (applied with the next frame)"""
+        scenes = []
+        for (d, _), (indicator, mode) in zip(self.panels, self.scenes):
+            indicators = [col for col in self.datasets[d].columns if col != 'Potability']
+            indicator = indicators[(indicators.index(indicator) + indicator_step) % len(indicators)]
+            scenes.append((indicator, self.modes[(self.modes.index(mode) + mode_step) % len(self.modes)]))
+        self.scenes = scenes
+        self.pending = ('scene', scenes)
+
+    def close(self):
+        """Stop the workers and free the frame block (once; the window's close event also calls this)"""
+        if self.frames is None:
+            return
+        for conn in self.connections:
+            try:
+                conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        self.frames = None
+        self.frames_block.close()
+        self.frames_block.unlink()
+
+    def show(self, fps=20):
+        """Display the grid in a matplotlib window
+
+        Frames are pasted into regions of the canvas at their rendered size and
+        blitted, so the main process never resamples or redraws the panels.
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.transforms import Bbox
+
+        plt.style.use('dark_background')
+        n = len(self.panels)
+        rows, cols = grid_shape(n)
+        fig, axes = plt.subplots(rows, cols, figsize=FIGSIZE, dpi=DPI, squeeze=False)
+        fig.subplots_adjust(**GRID)
+        for ax in axes.flat:
+            ax.set_axis_off()
+        fig.suptitle(f'{n} panels over {len(self.datasets)} datasets ({self.shared_bytes / 2**20:.1f} MB shared), '
+                     f'{len(self.processes)} workers', color='white', fontsize=13)
+        status = fig.text(0.01, 0.015, 'n/p: indicator  m/M: mode', fontsize=9, color='lightgray')
+        canvas = fig.canvas
+        regions = []
+        latest = [self.advance()]
+
+        def paste():
+            for i, (region, pixels) in enumerate(regions):
+                height, width = pixels.shape[:2]
+                pixels[...] = latest[0][i, :height, :width]
+                canvas.restore_region(region)
+
+        def on_draw(event):
+            # Each cell's region (its top left, cropped to the cell), found again after every full draw
+            regions.clear()
+            for ax in axes.flat[:n]:
+                x0, y0, x1, y1 = ax.bbox.extents
+                width, height = min(self.size[0], int(x1 - x0)), min(self.size[1], int(y1 - y0))
+                region = canvas.copy_from_bbox(Bbox.from_bounds(int(x0), int(y1) - height, width, height))
+                regions.append((region, np.asarray(region)))
+            paste()
+
+        def tick():
+            latest[0] = self.advance()
+            paste()
+            canvas.blit(fig.bbox)
+            tick.count += 1
+            if tick.count % max(1, int(fps)) == 0:
+                status.set_text(f'workers {self.busy * 1e3:.0f} ms/frame | n/p: indicator  m/M: mode')
+                canvas.draw_idle()
+        tick.count = 0
+
+        def on_key(event):
+            steps = {'n': (1, 0), 'p': (-1, 0), 'm': (0, 1), 'M': (0, -1)}
+            if event.key in steps:
+                self.switch(*steps[event.key])
+
+        canvas.mpl_connect('draw_event', on_draw)
+        canvas.mpl_connect('key_press_event', on_key)
+        canvas.mpl_connect('close_event', lambda event: self.close())
+        fig.timer = canvas.new_timer(interval=1000 / fps)
+        fig.timer.add_callback(tick)
+        fig.timer.start()
+        plt.show()
+        return fig
+
+
+def parse_panel(text, default_indicator):
+    """(path, indicator) of a panel given as PATH or PATH:INDICATOR"""
+    path, _, indicator = text.partition(':')
+    return path, indicator or default_indicator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Art panels of several datasets or sites side by side')
+    parser.add_argument('panels', nargs='*', metavar='PATH[:INDICATOR]',
+                        help='one panel per entry; entries with the same file share its data (default: the CSV)')
+    parser.add_argument('--sites', type=int, help='add this many synthetic sites')
+    parser.add_argument('--rows', type=int, default=3276, help='rows of each synthetic site')
+    parser.add_argument('--indicator', default='ph', help='indicator of panels that name none')
+    parser.add_argument('--mode', default='galaxy', choices=list(MODES['enhanced']))
+    parser.add_argument('--workers', type=int, help='render processes (default: one per CPU, at most one per panel)')
+    parser.add_argument('--fps', type=float, default=20)
+    parser.add_argument('--bench', type=int, metavar='FRAMES', help='time FRAMES headless frames instead of showing')
+    args = parser.parse_args()
+    if not args.panels and not args.sites:
+        args.panels = [DATA_FILE]
+
+    start = time.perf_counter()
+    datasets, panels, loaded = [], [], {}
+    try:
+        for text in args.panels:
+            path, indicator = parse_panel(text, args.indicator)
+            key = os.path.realpath(path)
+            if key not in loaded:
+                loaded[key] = len(datasets)
+                datasets.append(load_csv(path))
+            panels.append((loaded[key], indicator))
+        for k in range(args.sites or 0):
+            datasets.append(synthetic_site(k, args.rows))
+            panels.append((len(datasets) - 1, args.indicator))
+        for d, indicator in panels:
+            if indicator not in datasets[d].columns or indicator == 'Potability':
+                parser.error(f'{datasets[d].label} has no indicator {indicator!r}')
+
+        dashboard = Dashboard(datasets, panels, args.mode, args.workers)
+        try:
+            if args.bench:
+                dashboard.advance()  # the first scene
+                print(f'{len(panels)} panels over {len(datasets)} datasets '
+                      f'({dashboard.shared_bytes / 2**20:.1f} MB shared), {len(dashboard.processes)} workers, '
+                      f'ready in {time.perf_counter() - start:.2f}s')
+                began = time.perf_counter()
+                for _ in range(args.bench):
+                    dashboard.advance()
+                elapsed = time.perf_counter() - began
+                print(f'{args.mode}: {elapsed / args.bench * 1e3:.2f} ms per dashboard frame over {args.bench} '
+                      f'frames (slowest worker {dashboard.busy * 1e3:.2f} ms)')
+            else:
+                dashboard.show(args.fps)
+        finally:
+            dashboard.close()
+    finally:
+        for dataset in datasets:
+            dataset.close()
+
+
+if __name__ == '__main__':
+    main()
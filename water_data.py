@@ -0,0 +1,311 @@
+# Out-of-Core Water Quality Data Access
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from online_stats import ColumnSummary, CovarianceAccumulator
+from water_stream import COLUMNS
+from water_impute import Imputer
+
+DATA_FILE = 'water_potability.csv'
+
+
+def iter_csv_chunks(path=DATA_FILE, chunk_rows=100_000, columns=COLUMNS, dropna=False):
+    """Yield the CSV as (rows, len(columns)) float32 chunks without loading it whole"""
+    import pandas as pd
+
+    for frame in pd.read_csv(path, chunksize=chunk_rows, dtype=np.float32):
+        chunk = frame.reindex(columns=columns).to_numpy(dtype=np.float32)
+        if dropna:
+            chunk = chunk[~np.isnan(chunk).any(axis=1)]
+        yield chunk
+
+
+class ReservoirSample:
+    """Uniform fixed-size sample of rows over a stream of chunks
+
+    Every row gets a random key and the rows with the largest keys are kept,
+    which is a uniform sample without replacement however the rows are chunked.
+    """
+
+    def __init__(self, size, num_columns, seed=None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.empty((0, num_columns), dtype=np.float32)
+        self.keys = np.empty(0)
+
+    def update(self, chunk):
+        keys = np.concatenate([self.keys, self.rng.random(len(chunk))])
+        rows = np.concatenate([self.rows, chunk])
+        if len(keys) > self.size:
+            # Keep arrival order among the surviving rows
+            keep = np.sort(np.argpartition(keys, -self.size)[-self.size:])
+            keys, rows = keys[keep], rows[keep]
+        self.keys, self.rows = keys, rows
+        return self
+
+
+class DatasetScan:
+    """Single-pass aggregates of a dataset: column summaries, covariance and a row sample"""
+
+    def __init__(self, columns=COLUMNS, bins=20, sample_size=10_000, seed=None):
+        self.columns = list(columns)
+        self.rows = 0
+        self.summaries = {col: ColumnSummary(bins) for col in self.columns}
+        self.covariance = CovarianceAccumulator(len(self.columns))
+        self.sample = ReservoirSample(sample_size, len(self.columns), seed)
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for j, col in enumerate(self.columns):
+            self.summaries[col].update(chunk[:, j])
+        self.covariance.update(chunk)
+        self.sample.update(chunk)
+        return self
+
+    def bounds(self):
+        """Per-column (min, max) arrays, e.g. for normalization"""
+        mins = np.array([self.summaries[col].min for col in self.columns])
+        maxs = np.array([self.summaries[col].max for col in self.columns])
+        return mins, maxs
+
+    def correlation(self, columns=None):
+        """Pairwise-complete correlation matrix of the given columns (default: all)"""
+        corr = self.covariance.correlation()
+        if columns is None:
+            return corr
+        index = [self.columns.index(col) for col in columns]
+        return corr[np.ix_(index, index)]
+
+    def sample_frame(self):
+        """The row sample as a DataFrame"""
+        import pandas as pd
+
+        return pd.DataFrame(self.sample.rows, columns=self.columns)
+
+
+def scan_csv(path=DATA_FILE, chunk_rows=100_000, bins=20, sample_size=10_000,
+             dropna=False, seed=None):
+    """Compute bounds, histograms, correlation and a row sample in one streaming pass
+
+    Peak memory is bounded by chunk_rows and sample_size, not by the file size.
+    """
+    scan = DatasetScan(COLUMNS, bins, sample_size, seed)
+    for chunk in iter_csv_chunks(path, chunk_rows, COLUMNS, dropna):
+        scan.update(chunk)
+    return scan
+
+
+# Binary columnar cache: one raw float32 file per column plus a JSON metadata header
+COLUMN_DTYPE = np.float32
+META_FILE = 'meta.json'
+FORMAT_VERSION = 1
+
+
+def column_cache_dir(csv_path):
+    """Default cache directory for a CSV file, e.g. water_potability.columns/"""
+    return os.path.splitext(csv_path)[0] + '.columns'
+
+
+def source_signature(csv_path):
+    """Size and modification time of a CSV, which caches derived from it store and compare"""
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _temp_sibling(path):
+    """New empty directory next to path"""
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f'.{os.path.basename(path)}.tmp-', dir=parent)
+
+
+@contextmanager
+def _replacing_dir(out_dir):
+    """Temporary directory that replaces out_dir whole once the block completes
+
+    Readers find the old directory, the new one or none at all (and then
+    build their own), never a partly written one.
+    """
+    tmp_dir = _temp_sibling(out_dir)
+    try:
+        yield tmp_dir
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if os.path.exists(out_dir):
+        old_dir = _temp_sibling(out_dir)
+        try:
+            os.replace(out_dir, old_dir)
+        except FileNotFoundError:
+            pass  # another writer moved it away first
+        shutil.rmtree(old_dir, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, out_dir)
+    except OSError:
+        # Another process published the same cache in the meantime; keep theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def convert_to_columns(csv_path=DATA_FILE, out_dir=None, chunk_rows=100_000, columns=COLUMNS):
+    """Convert a CSV to per-column binary files in one chunked pass
+
+    Also stores the indices of complete rows (no NaN in any column), so the
+    scripts' dropna() view of a single column needs no other column. The
+    files are written to a temporary directory that then replaces out_dir
+    whole (imputed copies of the previous conversion go with it).
+    """
+    out_dir = out_dir or column_cache_dir(csv_path)
+    with _replacing_dir(out_dir) as tmp_dir:
+        files = {col: open(os.path.join(tmp_dir, f'{col}.f32'), 'wb') for col in columns}
+        complete_file = open(os.path.join(tmp_dir, 'complete_rows.i64'), 'wb')
+        rows = 0
+        try:
+            for chunk in iter_csv_chunks(csv_path, chunk_rows, columns):
+                for j, col in enumerate(columns):
+                    files[col].write(np.ascontiguousarray(chunk[:, j]).tobytes())
+                complete = np.flatnonzero(~np.isnan(chunk).any(axis=1)) + rows
+                complete_file.write(complete.astype(np.int64).tobytes())
+                rows += len(chunk)
+        finally:
+            for f in files.values():
+                f.close()
+            complete_file.close()
+
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': rows,
+            'dtype': np.dtype(COLUMN_DTYPE).str,
+            'columns': list(columns),
+            'source': source_signature(csv_path),
+        }
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    return ColumnStore(out_dir)
+
+
+class ColumnStore:
+    """Lazy loader that memory-maps only the columns actually requested"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.columns = self.meta['columns']
+        self.rows = self.meta['rows']
+        self.dtype = np.dtype(self.meta['dtype'])
+        self._maps = {}
+        self._complete = {}
+        self._complete_rows = None
+        self._filled = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _map(self, filename, dtype, count):
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, filename), dtype=dtype, mode='r', shape=(count,))
+
+    @property
+    def complete_rows(self):
+        """Indices of rows with no missing value in any column"""
+        if self._complete_rows is None:
+            path = os.path.join(self.directory, 'complete_rows.i64')
+            self._complete_rows = self._map('complete_rows.i64', np.int64,
+                                            os.path.getsize(path) // 8)
+        return self._complete_rows
+
+    def column(self, name, complete_only=False, fill=None, **fill_params):
+        """Memory-mapped values of one column
+
+        complete_only keeps only the rows dropna() would keep; fill instead keeps
+        every row with missing values imputed ('median', 'class_median' or 'knn',
+        with Imputer parameters fill_params, computed once and cached next to the
+        raw columns).
+        """
+        if fill is not None:
+            return self._filled_column(name, fill, fill_params)
+        if name not in self._maps:
+            if name not in self.columns:
+                raise KeyError(name)
+            self._maps[name] = self._map(f'{name}.f32', self.dtype, self.rows)
+        if not complete_only:
+            return self._maps[name]
+        if name not in self._complete:
+            self._complete[name] = self._maps[name][self.complete_rows]
+        return self._complete[name]
+
+    def _filled_column(self, name, method, params):
+        params = imputer_params(method, **params)
+        key = (name, method, tuple(sorted(params.items())))
+        if key not in self._filled:
+            filled_dir = os.path.join(self.directory, filled_dir_name(method, params))
+            meta_path = os.path.join(filled_dir, META_FILE)
+            meta = None
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+            # Fills of other parameters (or of caches that did not record them) are recomputed
+            if meta is None or meta.get('params') != params:
+                impute_store(self, method, **params)
+            if name not in self.columns:
+                raise KeyError(name)
+            self._filled[key] = np.memmap(os.path.join(filled_dir, f'{name}.f32'), dtype=self.dtype,
+                                          mode='r', shape=(self.rows,)) if self.rows else np.empty(0, self.dtype)
+        return self._filled[key]
+
+
+def imputer_params(method, **params):
+    """Every parameter of Imputer(method, **params), defaults included"""
+    imputer = Imputer(method, **params)
+    return {'k': imputer.k, 'reference_size': imputer.reference_size, 'seed': imputer.seed}
+
+
+def filled_dir_name(method, params):
+    """Directory of a store's imputed columns, e.g. filled_knn or filled_knn_k=10 (non-default params)"""
+    defaults = imputer_params(method)
+    changed = [f'{key}={value}' for key, value in sorted(params.items()) if value != defaults[key]]
+    return '_'.join([f'filled_{method}'] + changed)
+
+
+def impute_store(store, method='median', chunk_rows=1_000_000, label_column='Potability', **params):
+    """Write imputed copies of every column of a store, in chunks, to filled_<method>[_<params>]/
+
+    Like convert_to_columns, the copies are written to a temporary directory
+    that then replaces the previous one whole.
+    """
+    params = imputer_params(method, **params)
+    columns = [store.column(col) for col in store.columns]
+    labels = store.column(label_column) if label_column in store.columns else None
+    imputer = Imputer(method, **params).fit(columns, labels)
+
+    out_dir = os.path.join(store.directory, filled_dir_name(method, params))
+    with _replacing_dir(out_dir) as tmp_dir:
+        files = {col: open(os.path.join(tmp_dir, f'{col}.f32'), 'wb') for col in store.columns}
+        try:
+            for start in range(0, len(store), chunk_rows):
+                chunk = np.column_stack([col[start:start + chunk_rows] for col in columns]).astype(np.float32)
+                chunk_labels = None if labels is None else labels[start:start + chunk_rows]
+                imputer.transform(chunk, chunk_labels)
+                for j, col in enumerate(store.columns):
+                    files[col].write(np.ascontiguousarray(chunk[:, j]).tobytes())
+        finally:
+            for f in files.values():
+                f.close()
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'method': method, 'rows': len(store), 'params': params}, f, indent=2)
+
+
+def open_columns(csv_path=DATA_FILE, cache_dir=None):
+    """Open the columnar cache of a CSV, converting it first if missing or stale"""
+    cache_dir = cache_dir or column_cache_dir(csv_path)
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if os.path.exists(meta_path):
+        store = ColumnStore(cache_dir)
+        if (store.meta.get('version') == FORMAT_VERSION
+                and store.meta.get('source') == source_signature(csv_path)):
+            return store
+    return convert_to_columns(csv_path, cache_dir)
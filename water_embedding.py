@@ -0,0 +1,139 @@
+# 2-D Embedding of the water quality samples (principal components of all indicators)
+#
+# With only nine indicators the covariance matrix is 9x9, so an exact PCA from
+# one streaming covariance pass is cheaper than a randomized SVD. Projections
+# are computed on a background thread and cached on disk under a hash of the
+# data, so each dataset is projected once. The cache keeps the most recently
+# used projections only (a live stream makes a new one at every poll).
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from online_stats import CovarianceAccumulator
+from water_data import DATA_FILE, open_columns
+
+CACHE_DIR = 'embedding_cache'
+CACHE_ENTRIES = 32  # projections kept on disk, least recently used dropped first
+
+
+def dataset_hash(X):
+    """Content hash of a (rows, columns) float32 matrix"""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(X.shape).encode())
+    digest.update(memoryview(X).cast('B'))
+    return digest.hexdigest()
+
+
+def pca_embedding(X, components=2, chunk_rows=1_000_000):
+    """Project standardized rows onto the leading principal components
+
+    Missing values are treated as the column mean (they contribute nothing).
+    Returns float32 coordinates of shape (rows, components).
+    """
+    X = np.asarray(X)
+    covariance = CovarianceAccumulator(X.shape[1])
+    for start in range(0, len(X), chunk_rows):
+        covariance.update(X[start:start + chunk_rows])
+    mean = np.nan_to_num(covariance.mean())
+    cov = np.nan_to_num(covariance.covariance())
+    std = np.sqrt(np.diag(cov))
+    std[std == 0] = 1.0
+    # Eigenvectors of the correlation matrix, largest eigenvalue first
+    values, vectors = np.linalg.eigh(cov / np.outer(std, std))
+    basis = vectors[:, ::-1][:, :components] / std[:, None]
+    # Fix each component's sign so the layout does not flip between runs
+    basis *= np.where(basis.sum(axis=0) < 0, -1.0, 1.0)
+
+    out = np.empty((len(X), components), dtype=np.float32)
+    for start in range(0, len(X), chunk_rows):
+        chunk = np.asarray(X[start:start + chunk_rows], dtype=np.float64) - mean
+        out[start:start + len(chunk)] = np.nan_to_num(chunk) @ basis
+    return out
+
+
+def fit_to_box(coords, half_width=9.0, half_height=7.0):
+    """Scale coordinates into [-half_width, half_width] x [-half_height, half_height]
+
+    The 0.5th and 99.5th percentiles map to the edges, so a few outliers do not
+    squash everything else into the centre.
+    """
+    if not len(coords):
+        return coords
+    lo, hi = np.percentile(coords, [0.5, 99.5], axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    unit = np.clip((coords - lo) / span, -0.05, 1.05) * 2 - 1
+    return (unit * [half_width, half_height]).astype(np.float32)
+
+
+def prune_cache(cache_dir=CACHE_DIR, keep=CACHE_ENTRIES):
+    """Delete all but the `keep` most recently used projections"""
+    try:
+        paths = [entry.path for entry in os.scandir(cache_dir) if entry.name.endswith('.npy')]
+    except FileNotFoundError:
+        return
+    paths.sort(key=lambda path: os.stat(path).st_mtime_ns, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # removed by a concurrent prune
+
+
+def load_or_compute(X, cache_dir=CACHE_DIR, keep=CACHE_ENTRIES):
+    """Embedding of X, read from the disk cache when this data was projected before"""
+    path = os.path.join(cache_dir, f'{dataset_hash(X)}.npy')
+    try:
+        coords = np.load(path)
+        os.utime(path)  # mark as recently used
+        return coords
+    except FileNotFoundError:
+        coords = fit_to_box(pca_embedding(X))
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp_path = path + '.tmp.npy'
+        np.save(tmp_path, coords)
+        os.replace(tmp_path, path)
+        prune_cache(cache_dir, keep)
+        return coords
+
+
+class EmbeddingWorker:
+    """Computes embeddings on a background thread; callers poll the returned futures"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, X):
+        return self.executor.submit(load_or_compute, X, self.cache_dir)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Project the water samples to 2-D and time it')
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--rows', type=int, help='also time a synthetic table of this many rows')
+    args = parser.parse_args()
+
+    store = open_columns(args.data)
+    names = [col for col in store.columns if col != 'Potability']
+    X = np.column_stack([store.column(col) for col in names])
+    start = time.perf_counter()
+    coords = load_or_compute(X)
+    print(f'{len(X):,} rows embedded in {time.perf_counter() - start:.3f}s (cached in {CACHE_DIR}/)')
+
+    if args.rows:
+        from water_impute import synthetic_table
+        X, _ = synthetic_table(args.rows)
+        start = time.perf_counter()
+        coords = fit_to_box(pca_embedding(X))
+        print(f'{len(coords):,} synthetic rows embedded in {time.perf_counter() - start:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# Hover Inspector: which dataset row is the point under the cursor?
+#
+# The points move every frame, so a spatial index over them goes stale after
+# each frame. SpatialGrid buckets the points into a uniform grid with one
+# radix sort of their 16-bit cell keys. HoverInspector rebuilds it lazily,
+# only when the cursor moves and the scatter's offsets have changed since the
+# last build. A query then only measures distances to the points of the few
+# cells around the cursor.
+#
+# Rendering text is slow, so the tooltip is rasterised once per hovered
+# point. After that its bitmap is pasted at the point's current position: over
+# each full frame on the draw event, and blitted on its own when the cursor
+# moves between frames. Inspecting never triggers a redraw of the scene.
+import numpy as np
+from matplotlib.transforms import Bbox
+
+
+class SpatialGrid:
+    """Uniform grid over 2-D points for nearest-point queries"""
+
+    def __init__(self, cells=128):
+        if cells > 256:
+            raise ValueError('at most 256 x 256 cells (16-bit cell keys)')
+        self.cells = cells
+        self.points = None
+
+    def build(self, points):
+        """Bucket (N, 2) points; returns self"""
+        points = np.asarray(points, dtype=np.float64)
+        cells = self.cells
+        self.points = points
+        # Per-column reductions: much faster than min(axis=0) over an (N, 2) array
+        x, y = points[:, 0], points[:, 1]
+        self.lo = np.array([x.min(), y.min()])
+        self.size = np.maximum(np.array([x.max(), y.max()]) - self.lo, 1e-9) / cells
+        ij = ((points - self.lo) / self.size).astype(np.intp)
+        np.clip(ij, 0, cells - 1, out=ij)
+        keys = (ij[:, 0] * cells + ij[:, 1]).astype(np.uint16)
+        # A stable sort of 16-bit keys is a radix sort: linear in the number of points
+        self.order = np.argsort(keys, kind='stable')
+        self.starts = np.r_[0, np.cumsum(np.bincount(keys, minlength=cells * cells))]
+        return self
+
+    def nearest(self, x, y, rx, ry):
+        """Index of the point nearest to (x, y) within the ellipse of radii (rx, ry), or None"""
+        if self.points is None or len(self.points) == 0:
+            return None
+        cells = self.cells
+        i0, j0 = np.clip(((np.array([x - rx, y - ry]) - self.lo) / self.size).astype(np.intp), 0, cells - 1)
+        i1, j1 = np.clip(((np.array([x + rx, y + ry]) - self.lo) / self.size).astype(np.intp), 0, cells - 1)
+        # Cells of one grid column are consecutive in key order, so each column is one slice
+        candidates = [self.order[self.starts[i * cells + j0]:self.starts[i * cells + j1 + 1]]
+                      for i in range(i0, i1 + 1)]
+        candidates = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.intp)
+        if len(candidates) == 0:
+            return None
+        d = ((self.points[candidates, 0] - x) / rx) ** 2 + ((self.points[candidates, 1] - y) / ry) ** 2
+        best = np.argmin(d)
+        return int(candidates[best]) if d[best] <= 1.0 else None
+
+
+def format_record(row, columns, values, imputed=None):
+    """Tooltip text of one sample: its dataset row, every indicator and Potability
+
+    imputed flags the values that were filled in rather than measured.
+    """
+    if imputed is None:
+        imputed = np.zeros(len(columns), dtype=bool)
+    lines = [f'Row {row}']
+    for column, value, filled in zip(columns, values, imputed):
+        mark = ' (imputed)' if filled else ''
+        if column == 'Potability':
+            lines[0] += '  ' + ('unknown' if np.isnan(value) else 'Potable' if value >= 0.5 else 'Not potable') + mark
+        else:
+            lines.append(f'{column:<16s}{value:>10.2f}{mark}')
+    return '\n'.join(lines)
+
+
+class HoverInspector:
+    """Tooltip with the full record of the point under the cursor
+
+    The panel provides points (the main scatter), mode.rows (positions of its
+    points in the record table), point_rows (their dataset rows) and
+    record_table() -> (column names, values with one row per data position,
+    boolean mask of the filled-in values or None).
+    """
+
+    def __init__(self, panel, ax, tolerance=10, cells=128):
+        self.panel = panel
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.tolerance = tolerance  # pixels
+        self.grid = SpatialGrid(cells)
+        self.built_from = None
+        self.background = None
+        self.image = None
+        self.inside = False
+        self.reset()
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('motion_notify_event', self.on_move)
+
+    def reset(self):
+        """Forget the hovered point and add a fresh tooltip (ax.clear() removes the old one)"""
+        self.index = None
+        self.image = None
+        self.built_from = None
+        self.grid.points = None
+        # Square and opaque, so the rasterised box holds no pixels of the scene behind it
+        self.tooltip = self.ax.annotate('', xy=(0, 0), xytext=(12, 12), textcoords='offset points',
+                                        fontsize=9, family='monospace', color='black', animated=True,
+                                        bbox=dict(boxstyle='square,pad=0.4', fc='#FFFFE0', ec='white'))
+
+    def lookup(self, x, y):
+        """Index (in the scatter) of the point nearest to data position (x, y), or None"""
+        points = self.panel.points
+        if points is None:
+            return None
+        offsets = points.get_offsets()
+        if offsets is not self.built_from:
+            # set_offsets() stores a new array every frame: rebuild only for the first query after it
+            self.grid.build(offsets)
+            self.built_from = offsets
+        # Tolerance in pixels as radii in data units
+        scale_x, scale_y = np.abs(self.ax.transData.get_matrix()[[0, 1], [0, 1]])
+        return self.grid.nearest(x, y, self.tolerance / scale_x, self.tolerance / scale_y)
+
+    def text(self, index):
+        columns, values, imputed = self.panel.record_table()
+        # A filtered scatter holds only the visible points
+        visible = self.panel.mode.visible
+        i = index if visible is None else visible[index]
+        row = self.panel.mode.rows[i]
+        return format_record(self.panel.point_rows[i], columns, values[row],
+                             None if imputed is None else imputed[row])
+
+    def _pixel(self, xy):
+        """Canvas pixel (from the top left, as copied regions use) of a data position"""
+        x, y = self.ax.transData.transform(xy)
+        return x, self.ax.figure.bbox.height - y
+
+    def render(self):
+        """Rasterise the tooltip of the hovered point once, remembering its offset from the point"""
+        self.tooltip.xy = self.panel.points.get_offsets()[self.index]
+        self.ax.draw_artist(self.tooltip)
+        # The annotation's own extent leaves out the padding of its box
+        extent = Bbox.union([self.tooltip.get_window_extent(), self.tooltip.get_bbox_patch().get_window_extent()])
+        self.image = self.canvas.copy_from_bbox(extent.padded(1))
+        x0, y0, _, _ = self.image.get_extents()
+        px, py = self._pixel(self.tooltip.xy)
+        self.anchor = (x0 - px, y0 - py)
+
+    def paste(self):
+        """Paste the tooltip bitmap next to the hovered point's current position"""
+        points = self.panel.points
+        if self.image is None or points is None or self.index >= len(points.get_offsets()):
+            return
+        px, py = self._pixel(points.get_offsets()[self.index])
+        x0, y0, x1, y1 = self.image.get_extents()
+        w, h = x1 - x0, y1 - y0
+        width, height = self.ax.figure.bbox.width, self.ax.figure.bbox.height
+        x, y = px + self.anchor[0], py + self.anchor[1]
+        # Mirror the box to the other side of the point where it would leave the canvas
+        if x + w > width:
+            x = px - self.anchor[0] - w
+        if y < 0:
+            y = py - self.anchor[1] - h
+        x = min(max(x, 0), width - w)
+        y = min(max(y, 0), height - h)
+        self.canvas.restore_region(self.image, None, (int(x), int(y)))
+
+    def on_draw(self, event):
+        # Copying the frame costs milliseconds, so only while the cursor is over the scene
+        self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox) if self.inside else None
+        self.paste()
+
+    def on_move(self, event):
+        self.inside = event.inaxes is self.ax
+        index = self.lookup(event.xdata, event.ydata) if self.inside else None
+        if index == self.index or self.background is None:
+            return
+        self.index = index
+        self.image = None
+        self.canvas.restore_region(self.background)
+        if index is not None:
+            self.tooltip.set_text(self.text(index))
+            self.render()
+            self.canvas.restore_region(self.background)
+            self.paste()
+        self.canvas.blit(self.ax.figure.bbox)
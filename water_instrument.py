@@ -0,0 +1,213 @@
+# Instrumentation Layer for the interactive panels
+#
+# Wraps the layout/step/draw/apply methods of the panel's art modes (phases
+# named like 'galaxy.step'), its scene updates, Collection.set_offsets, the main
+# axes' draw and the whole canvas draw with perf_counter_ns timers, keeps the
+# last samples of each phase in fixed-size rings for rolling percentiles, and
+# shows them in an on-canvas overlay. Keyboard toggles:
+#
+#   i  timers and overlay on/off     u  cProfile on/off (stats saved on stop)
+#   m  tracemalloc on/off            j  dump the timings to JSON
+#
+# While the timers are off the wrappers are removed, so they cost nothing.
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+import numpy as np
+from matplotlib.collections import Collection
+
+# set_offsets is shared by every scatter, so it is timed at the class level for
+# all panels whose instrumentation is on
+_original_set_offsets = Collection.set_offsets
+_active = []
+
+
+def _timed_set_offsets(self, offsets):
+    start = time.perf_counter_ns()
+    try:
+        return _original_set_offsets(self, offsets)
+    finally:
+        elapsed = time.perf_counter_ns() - start
+        for instrumentation in _active:
+            instrumentation.timings.record('set_offsets', elapsed)
+
+
+class RollingTimings:
+    """Last `window` durations (ns) of every phase, in preallocated rings"""
+
+    def __init__(self, window=256):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, phase, ns):
+        ring = self.samples.get(phase)
+        if ring is None:
+            ring = self.samples[phase] = np.zeros(self.window, dtype=np.int64)
+            self.counts[phase] = 0
+        ring[self.counts[phase] % self.window] = ns
+        self.counts[phase] += 1
+
+    def percentiles(self, q=(50, 95, 99)):
+        """{phase: {'count': n, 'p50_ms': ..., ...}} over each phase's ring"""
+        out = {}
+        for phase, ring in self.samples.items():
+            count = self.counts[phase]
+            values = ring[:min(count, self.window)] / 1e6
+            stats = {'count': count}
+            for p, v in zip(q, np.percentile(values, q)):
+                stats[f'p{p}_ms'] = float(v)
+            out[phase] = stats
+        return out
+
+
+class Instrumentation:
+    """Hot-path timers, profilers and an overlay for one interactive panel"""
+
+    def __init__(self, panel, window=256, out_dir='.', overlay_interval=0.5):
+        self.panel = panel
+        self.fig = panel.fig
+        self.axes = getattr(panel, 'ax_main', None) or panel.ax
+        self.timings = RollingTimings(window)
+        self.out_dir = out_dir
+        self.overlay_interval = overlay_interval
+        self.enabled = False
+        self.profiler = None
+        self._wrapped = []
+        self._last_overlay = 0.0
+        self.overlay = self.fig.text(0.005, 0.995, '', fontsize=7, family='monospace', color='#7CFC00',
+                                     va='top', ha='left', visible=False,
+                                     bbox=dict(facecolor='black', alpha=0.6, edgecolor='none'))
+        self.fig.canvas.mpl_connect('key_press_event', self.on_key)
+
+    def _timed(self, phase, fn):
+        record = self.timings.record
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(phase, time.perf_counter_ns() - start)
+        return wrapper
+
+    def _wrap(self, owner, name, phase):
+        setattr(owner, name, self._timed(phase, getattr(owner, name)))
+        self._wrapped.append((owner, name))
+
+    def enable(self):
+        if self.enabled:
+            return
+        for mode in self.panel.engine.modes.values():
+            for name in ('layout', 'step', 'draw', 'apply'):
+                self._wrap(mode, name, f'{mode.name}.{name}')
+        for name in ('update_visualization', 'update_data_panels'):
+            if hasattr(self.panel, name):
+                self._wrap(self.panel, name, name)
+        self._wrap(self.axes, 'draw', 'draw_main_axes')
+
+        # The canvas draw also refreshes the overlay, at most every overlay_interval
+        canvas_draw = self._timed('draw_canvas', self.fig.canvas.draw)
+
+        def draw(*args, **kwargs):
+            now = time.perf_counter()
+            if now - self._last_overlay > self.overlay_interval:
+                self._last_overlay = now
+                self.overlay.set_text(self.overlay_text())
+            return canvas_draw(*args, **kwargs)
+        self.fig.canvas.draw = draw
+        self._wrapped.append((self.fig.canvas, 'draw'))
+
+        _active.append(self)
+        Collection.set_offsets = _timed_set_offsets
+        self.overlay.set_visible(True)
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for owner, name in self._wrapped:
+            delattr(owner, name)  # the class attribute shows through again
+        self._wrapped = []
+        _active.remove(self)
+        if not _active:
+            Collection.set_offsets = _original_set_offsets
+        self.overlay.set_visible(False)
+        self.enabled = False
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        print(f"Instrumentation: {'on' if self.enabled else 'off'}")
+        self.fig.canvas.draw_idle()
+
+    def toggle_profiler(self):
+        """Start cProfile, or stop it, save the stats and print the hottest functions"""
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            print('cProfile: on')
+            return None
+        self.profiler.disable()
+        path = os.path.join(self.out_dir, f'profile_{time.strftime("%Y%m%d_%H%M%S")}.prof')
+        self.profiler.dump_stats(path)
+        pstats.Stats(self.profiler).sort_stats('cumulative').print_stats(15)
+        self.profiler = None
+        print(f'cProfile: off, stats saved to {path}')
+        return path
+
+    def toggle_tracemalloc(self, top=10):
+        """Start tracemalloc, or stop it and print the top allocation sites"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            print('tracemalloc: on')
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = snapshot.statistics('lineno')[:top]
+        print(f'tracemalloc: off (current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB)')
+        for stat in stats:
+            print(f'    {stat}')
+        return stats
+
+    def overlay_text(self):
+        lines = [f"{'phase':24s} {'n':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  (ms)"]
+        for phase, stats in sorted(self.timings.percentiles().items()):
+            lines.append(f"{phase:24s} {stats['count']:6d} {stats['p50_ms']:8.2f} "
+                         f"{stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f}")
+        flags = [name for name, on in (('cProfile', self.profiler is not None),
+                                       ('tracemalloc', tracemalloc.is_tracing())) if on]
+        if flags:
+            lines.append('sampling: ' + ', '.join(flags))
+        return '\n'.join(lines)
+
+    def dump(self, path=None):
+        """Write the rolling percentiles of every phase to JSON"""
+        path = path or os.path.join(self.out_dir, f'instrumentation_{time.strftime("%Y%m%d_%H%M%S")}.json')
+        report = {
+            'panel': type(self.panel).__name__,
+            'mode': getattr(self.panel, 'current_mode', None),
+            'indicator': getattr(self.panel, 'current_indicator', None),
+            'window': self.timings.window,
+            'phases': self.timings.percentiles(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'Timings written to {path}')
+        return path
+
+    def on_key(self, event):
+        if event.key == 'i':
+            self.toggle()
+        elif event.key == 'u':
+            self.toggle_profiler()
+        elif event.key == 'm':
+            self.toggle_tracemalloc()
+        elif event.key == 'j':
+            self.dump()
@@ -0,0 +1,115 @@
+# Outlier Engine: robust z-scores and Mahalanobis distances over all indicators
+#
+# Both scores are computed chunk by chunk over whole columns (in-memory arrays
+# or memory maps), keeping only a running top-K per score, so the art modes
+# can highlight outliers by index lookup instead of re-scanning the data.
+import argparse
+import time
+import numpy as np
+from online_stats import CovarianceAccumulator
+from water_data import DATA_FILE, open_columns
+
+# Scale that makes the MAD a consistent estimate of the standard deviation
+MAD_SCALE = 1.4826
+
+
+def _top_k(scores, index, k):
+    """Indices and scores of the k largest scores, largest first"""
+    if len(scores) > k:
+        keep = np.argpartition(scores, len(scores) - k)[-k:]
+        scores, index = scores[keep], index[keep]
+    order = np.argsort(scores, kind='stable')[::-1]
+    return index[order], scores[order]
+
+
+class OutlierIndex:
+    """Top-K outlier rows per indicator (|robust z|) and overall (Mahalanobis)
+
+    top[name] and top_scores[name] hold row indices and scores, most extreme
+    first; 'mahalanobis' is the joint score. Missing values never count as
+    outlying: their z-score is 0 and they drop out of the Mahalanobis sum.
+    """
+
+    def __init__(self, names, top_k=100):
+        self.names = list(names)
+        self.top_k = top_k
+        self.top = {}
+        self.top_scores = {}
+        self._sorted = {}
+
+    @classmethod
+    def build(cls, names, columns, top_k=100, chunk_rows=1_000_000):
+        """Score every row of a list of equal-length 1-D columns"""
+        index = cls(names, top_k)
+        columns = [np.asarray(col) for col in columns]
+        rows = len(columns[0]) if columns else 0
+
+        # Robust location and scale per column (MAD == 0 falls back to the std)
+        index.median = np.array([np.nanmedian(col) if rows else np.nan for col in columns])
+        index.mad = np.array([np.nanmedian(np.abs(col - m)) if rows else np.nan
+                              for col, m in zip(columns, index.median)]) * MAD_SCALE
+        covariance = CovarianceAccumulator(len(columns))
+        for start in range(0, rows, chunk_rows):
+            covariance.update(np.column_stack([col[start:start + chunk_rows] for col in columns]))
+        std = np.sqrt(np.diag(covariance.covariance())) if rows else np.full(len(columns), np.nan)
+        index.mad = np.where(index.mad > 0, index.mad, std)
+        index.mad = np.where(index.mad > 0, index.mad, 1.0)
+        index.mean = np.nan_to_num(covariance.mean()) if rows else np.zeros(len(columns))
+        index.precision = np.linalg.pinv(np.nan_to_num(covariance.covariance())) if rows \
+            else np.zeros((len(columns), len(columns)))
+
+        best = {name: (np.empty(0, np.int64), np.empty(0)) for name in index.names + ['mahalanobis']}
+        for start in range(0, rows, chunk_rows):
+            chunk = np.column_stack([col[start:start + chunk_rows] for col in columns]).astype(np.float64)
+            row_ids = np.arange(start, start + len(chunk))
+            z, distance = index.score(chunk)
+            for j, name in enumerate(index.names):
+                best[name] = _top_k(np.concatenate([best[name][1], np.abs(z[:, j])]),
+                                    np.concatenate([best[name][0], row_ids]), top_k)
+            best['mahalanobis'] = _top_k(np.concatenate([best['mahalanobis'][1], distance]),
+                                         np.concatenate([best['mahalanobis'][0], row_ids]), top_k)
+        for name, (ids, scores) in best.items():
+            index.top[name] = ids
+            index.top_scores[name] = scores
+            index._sorted[name] = np.sort(ids)
+        return index
+
+    def score(self, chunk):
+        """Robust z-scores (rows, columns) and Mahalanobis distances (rows,) of a chunk"""
+        chunk = np.asarray(chunk, dtype=np.float64)
+        missing = np.isnan(chunk)
+        z = np.where(missing, 0.0, (chunk - self.median) / self.mad)
+        # Missing values sit at the mean, so they add nothing to the distance
+        d = np.where(missing, 0.0, chunk - self.mean)
+        distance = np.sqrt(np.maximum(((d @ self.precision) * d).sum(axis=1), 0.0))
+        return z, distance
+
+    def is_outlier(self, rows, name='mahalanobis'):
+        """Boolean mask: which of the given row indices are in the top-K of a score"""
+        ranked = self._sorted[name]
+        rows = np.asarray(rows)
+        if not len(ranked):
+            return np.zeros(rows.shape, dtype=bool)
+        pos = np.minimum(np.searchsorted(ranked, rows), len(ranked) - 1)
+        return ranked[pos] == rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank the most outlying water samples')
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--top', type=int, default=10, help='rows to list per score')
+    args = parser.parse_args()
+
+    store = open_columns(args.data)
+    names = [col for col in store.columns if col != 'Potability']
+    start = time.perf_counter()
+    index = OutlierIndex.build(names, [store.column(col) for col in names], top_k=max(args.top, 100))
+    print(f'Scored {len(store):,} rows in {time.perf_counter() - start:.3f}s')
+    for name in ['mahalanobis'] + names:
+        pairs = ', '.join(f'{row}:{score:.1f}' for row, score in
+                          zip(index.top[name][:args.top], index.top_scores[name][:args.top]))
+        print(f'{name:16s} {pairs}')
+
+
+if __name__ == '__main__':
+    main()
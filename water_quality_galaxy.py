@@ -1,97 +1,56 @@
 # Water Quality Galaxy Art Visualization
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.animation as animation
 from matplotlib.patches import Circle
-import random
+from galaxy_layout import create_galaxy_layout, GalaxyFrameBuffers
+from water_data import open_columns
 
 # Set dark theme
 plt.style.use('dark_background')
 fig, ax = plt.subplots(figsize=(16, 10))
 
-# Load data
-df = pd.read_csv('water_potability.csv')
-df = df.dropna()
+# Load data (memory-mapped binary columns; pandas is only needed to build the cache).
+# Missing values are median-imputed so every sample is kept.
+store = open_columns('water_potability.csv')
+num_samples = len(store)
 
-print(f"Data loaded successfully, {len(df)} records found")
+print(f"Data loaded successfully, {num_samples} records found")
 
 # Water quality indicators
-indicators = [col for col in df.columns if col != 'Potability']
-num_samples = len(df)
+indicators = [col for col in store.columns if col != 'Potability']
 
 # Normalization function
 def normalize_data(data):
-    """Normalize data to 0-1 range"""
-    data = np.array(data)
-    return (data - data.min()) / (data.max() - data.min() + 1e-8)
-
-# Create galaxy spiral arms effect
-def create_galaxy_arms(num_arms=3, points_per_arm=None):
-    """Create galaxy spiral arm coordinates"""
-    if points_per_arm is None:
-        points_per_arm = num_samples // num_arms
-    
-    galaxy_x = []
-    galaxy_y = []
-    arm_ids = []
-    
-    for arm in range(num_arms):
-        # Parameters for each spiral arm
-        arm_offset = arm * 2 * np.pi / num_arms
-        
-        # Spiral parameters
-        t = np.linspace(0, 4 * np.pi, points_per_arm)
-        r = 0.5 + 2 * t / (4 * np.pi)  # Radius increases with angle
-        
-        # Spiral coordinates
-        x = r * np.cos(t + arm_offset)
-        y = r * np.sin(t + arm_offset)
-        
-        # Add random noise for more natural appearance
-        noise_scale = 0.3
-        x += np.random.normal(0, noise_scale, len(x))
-        y += np.random.normal(0, noise_scale, len(y))
-        
-        galaxy_x.extend(x)
-        galaxy_y.extend(y)
-        arm_ids.extend([arm] * points_per_arm)
-    
-    return np.array(galaxy_x), np.array(galaxy_y), np.array(arm_ids)
-
-# Generate galaxy coordinates
-galaxy_x, galaxy_y, arm_ids = create_galaxy_arms(num_arms=len(indicators))
+    """Normalize data to 0-1 range (per column for 2-D input)"""
+    data = np.asarray(data, dtype=np.float32)
+    data_min = data.min(axis=0)
+    return (data - data_min) / (data.max(axis=0) - data_min + 1e-8)
 
 # Assign colors and attributes for each water quality indicator
 colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE']
 indicator_colors = colors[:len(indicators)]
 
-# Set point attributes based on water quality data
-point_sizes = []
-point_alphas = []
-point_colors_mapped = []
+# One spiral arm per indicator; arm i takes its point attributes from indicator i
+num_arms = len(indicators)
+points_per_arm = num_samples // num_arms
+indicator_data = np.column_stack([store.column(ind, fill='median') for ind in indicators])
+normalized_values = normalize_data(indicator_data).T[:, :points_per_arm]
 
-for i, indicator in enumerate(indicators):
-    # Normalize current indicator data
-    normalized_values = normalize_data(df[indicator])
-    
-    # Point size: larger values = larger points
-    sizes = normalized_values * 60 + 10
-    point_sizes.extend(sizes[:len(galaxy_x)//len(indicators)])
-    
-    # Transparency: larger values = brighter
-    alphas = normalized_values * 0.8 + 0.2
-    point_alphas.extend(alphas[:len(galaxy_x)//len(indicators)])
-    
-    # Color mapping
-    colors_for_indicator = [indicator_colors[i]] * (len(galaxy_x)//len(indicators))
-    point_colors_mapped.extend(colors_for_indicator)
+# Generate galaxy coordinates with aligned sizes, alphas and colours
+layout = create_galaxy_layout(normalized_values, indicator_colors, seed=42)
+galaxy_x, galaxy_y = layout.x, layout.y
+point_sizes = layout.sizes
+point_alphas = layout.alphas
+point_colors_mapped = layout.colors
+
+# Per-frame RGBA and size buffers (alpha channel carries the data-driven transparency)
+frame_buffers = GalaxyFrameBuffers(layout)
 
 # Create scatter plot
 scatter = ax.scatter(galaxy_x, galaxy_y, 
                     s=point_sizes, 
                     c=point_colors_mapped, 
-                    alpha=0.7, 
                     edgecolors='white', 
                     linewidths=0.5)
 
@@ -132,10 +91,10 @@ ax.legend(handles=legend_elements, loc='upper left',
           fontsize=12, frameon=False, labelcolor='white')
 
 # Add starry background
-np.random.seed(42)
-star_x = np.random.uniform(-8, 8, 200)
-star_y = np.random.uniform(-6, 6, 200)
-star_sizes = np.random.uniform(1, 5, 200)
+rng = np.random.default_rng(42)
+star_x = rng.uniform(-8, 8, 200)
+star_y = rng.uniform(-6, 6, 200)
+star_sizes = rng.uniform(1, 5, 200)
 ax.scatter(star_x, star_y, s=star_sizes, c='white', alpha=0.3, marker='*')
 
 # Animation function
@@ -158,10 +117,12 @@ def animate(frame):
     # Update scatter plot positions
     scatter.set_offsets(np.column_stack((rotated_x, rotated_y)))
     
-    # Add breathing effect (size changes)
+    # Add breathing effect (size changes) and a gentle shimmer on the per-point alphas
     breathing_effect = 1 + 0.1 * np.sin(frame * 0.1)
-    new_sizes = np.array(point_sizes) * breathing_effect
-    scatter.set_sizes(new_sizes)
+    shimmer = 0.85 + 0.15 * np.sin(frame * 0.05)
+    frame_colors, frame_sizes = frame_buffers.update(alpha_scale=shimmer, size_scale=breathing_effect)
+    scatter.set_facecolors(frame_colors)
+    scatter.set_sizes(frame_sizes)
     
     return scatter,
 
@@ -0,0 +1,186 @@
+# Query Engine: range filters over the indicators through presorted indexes
+#
+# Every column gets a stable argsort once. A range predicate lo <= value <= hi
+# then needs only two binary searches: the matching rows are one slice of the
+# sort order, and its length is the match count. Each predicate becomes a packed
+# bitset (one bit per row). A narrow slice (or a narrow complement) is scattered
+# into it. A wide one is cheaper as one streaming comparison over the column.
+# Predicates combine with a bitwise AND over N/8 bytes. Bitsets are cached per
+# column and slice, so dragging one range slider only rebuilds that column's
+# bitset. Missing values sort last and never match.
+import argparse
+import re
+import time
+import numpy as np
+from water_data import DATA_FILE, open_columns
+
+PREDICATE = re.compile(r'^\s*(\w+)\s*(<=|>=|<|>)\s*([-+\d.eE]+)\s*$')
+
+
+class SortedIndex:
+    """Row order and sorted values of one column"""
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.values = values
+        self.order = np.argsort(values, kind='stable')
+        self.sorted = values[self.order]
+
+    def bounds(self, lo, hi):
+        """lo and hi in the column's dtype, rounded inwards so that comparisons stay exact
+
+        Searching a float32 column for a float64 value would convert the whole column first.
+        """
+        dtype = self.sorted.dtype
+        if dtype.kind != 'f' or dtype == np.float64:
+            return lo, hi
+        lo_cast, hi_cast = dtype.type(lo), dtype.type(hi)
+        if lo_cast < lo:
+            lo_cast = np.nextafter(lo_cast, dtype.type(np.inf))
+        if hi_cast > hi:
+            hi_cast = np.nextafter(hi_cast, dtype.type(-np.inf))
+        return lo_cast, hi_cast
+
+    def span(self, lo=-np.inf, hi=np.inf):
+        """(start, stop) of the rows with lo <= value <= hi in the sort order"""
+        lo, hi = self.bounds(lo, hi)
+        return (int(np.searchsorted(self.sorted, lo, side='left')),
+                int(np.searchsorted(self.sorted, hi, side='right')))
+
+    def rows(self, lo=-np.inf, hi=np.inf):
+        """Rows with lo <= value <= hi, in value order (a view of the sort order)"""
+        start, stop = self.span(lo, hi)
+        return self.order[start:stop]
+
+
+class QueryIndex:
+    """Sorted indexes over several equal-length columns, queried by value ranges"""
+
+    # Slices up to this fraction of the rows are scattered; wider ones are compared
+    scatter_fraction = 1 / 16
+
+    def __init__(self, names, columns):
+        self.names = list(names)
+        self.n = len(columns[0]) if len(columns) else 0
+        self.indexes = {name: SortedIndex(col) for name, col in zip(self.names, columns)}
+        self._bits = {}
+
+    def bitset(self, name, lo=-np.inf, hi=np.inf):
+        """Packed bitset of the rows with lo <= name <= hi"""
+        index = self.indexes[name]
+        span = index.span(lo, hi)
+        key = (name,) + span
+        if key not in self._bits:
+            start, stop = span
+            limit = self.n * self.scatter_fraction
+            if stop - start <= limit:
+                mask = np.zeros(self.n, dtype=bool)
+                mask[index.order[start:stop]] = True
+            elif self.n - (stop - start) <= limit:
+                mask = np.ones(self.n, dtype=bool)
+                mask[index.order[:start]] = False
+                mask[index.order[stop:]] = False
+            else:
+                values = index.values
+                lo, hi = index.bounds(lo, hi)
+                mask = values >= lo
+                mask &= values <= hi
+            # Only the latest bitset of each column is kept (that is what a slider drags)
+            self._bits = {k: v for k, v in self._bits.items() if k[0] != name}
+            self._bits[key] = np.packbits(mask)
+        return self._bits[key]
+
+    def select(self, ranges):
+        """Boolean mask of the rows matching every (lo, hi) range of ranges ({name: (lo, hi)})
+
+        Returns None when no range excludes anything.
+        """
+        bits = None
+        for name, (lo, hi) in ranges.items():
+            start, stop = self.indexes[name].span(lo, hi)
+            if start == 0 and stop == self.n:
+                continue  # the whole column matches
+            if bits is None:
+                bits = self.bitset(name, lo, hi).copy()
+            else:
+                np.bitwise_and(bits, self.bitset(name, lo, hi), out=bits)
+        if bits is None:
+            return None
+        return np.unpackbits(bits, count=self.n).view(bool)
+
+
+def parse_predicates(predicates):
+    """{name: (lo, hi)} of predicates such as 'ph<6.5' or 'Turbidity >= 4' (several per name intersect)"""
+    ranges = {}
+    for text in predicates:
+        match = PREDICATE.match(text)
+        if match is None:
+            raise ValueError(f'cannot parse predicate {text!r} (expected e.g. ph<6.5)')
+        name, op, value = match.group(1), match.group(2), float(match.group(3))
+        lo, hi = ranges.get(name, (-np.inf, np.inf))
+        # Strict bounds become inclusive ones just inside the value
+        if op == '<':
+            hi = min(hi, np.nextafter(value, -np.inf))
+        elif op == '<=':
+            hi = min(hi, value)
+        elif op == '>':
+            lo = max(lo, np.nextafter(value, np.inf))
+        else:
+            lo = max(lo, value)
+        ranges[name] = (lo, hi)
+    return ranges
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Filter water samples by indicator ranges')
+    parser.add_argument('predicates', nargs='*', default=['ph<6.5', 'Turbidity>4'],
+                        help="e.g. 'ph<6.5' 'Turbidity>4' (default)")
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--rows', type=int, help='also time a synthetic table of this many rows')
+    args = parser.parse_args()
+    try:
+        ranges = parse_predicates(args.predicates)
+    except ValueError as e:
+        parser.error(str(e))
+
+    store = open_columns(args.data)
+    names = [col for col in store.columns if col != 'Potability']
+    unknown = [name for name in ranges if name not in names]
+    if unknown:
+        parser.error(f'no indicator {", ".join(map(repr, unknown))}; choose from {", ".join(names)}')
+    columns = [store.column(col, fill='median') for col in names]
+    start = time.perf_counter()
+    index = QueryIndex(names, columns)
+    built = time.perf_counter()
+    keep = index.select(ranges)
+    queried = time.perf_counter()
+    count = index.n if keep is None else int(keep.sum())
+    potable = store.column('Potability')[keep] if keep is not None else store.column('Potability')
+    print(f'{" and ".join(args.predicates)}: {count:,} of {index.n:,} samples '
+          f'({np.nanmean(potable) * 100 if count else 0:.0f}% potable); '
+          f'index {(built - start) * 1e3:.1f}ms, query {(queried - built) * 1e3:.3f}ms')
+
+    if args.rows:
+        rng = np.random.default_rng(0)
+        synthetic = [rng.normal(np.mean(col), np.std(col), args.rows).astype(np.float32) for col in columns]
+        index = QueryIndex(names, synthetic)
+        start = time.perf_counter()
+        keep = index.select(ranges)
+        first = time.perf_counter()
+        # Dragging one slider: only that column's bitset is rebuilt
+        name = next(iter(ranges))
+        lo, hi = ranges[name]
+        index.select({**ranges, name: (lo, hi + 0.1)})
+        drag = time.perf_counter()
+        mask = np.ones(args.rows, dtype=bool)
+        for name, (lo, hi) in ranges.items():
+            col = synthetic[names.index(name)]
+            mask &= (col >= lo) & (col <= hi)
+        brute = time.perf_counter()
+        assert keep is None or np.array_equal(keep, mask)
+        print(f'{args.rows:,} synthetic rows: first query {(first - start) * 1e3:.2f}ms, '
+              f'slider drag {(drag - first) * 1e3:.2f}ms, boolean masks {(brute - drag) * 1e3:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
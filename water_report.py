@@ -0,0 +1,115 @@
+# Batch Report Generator: renders every standard water quality figure headlessly
+#
+# Statistics are computed once in the parent process and handed to each pool
+# worker when it starts; workers then render figures on the Agg backend in
+# parallel and report how long each one took.
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from water_data import DATA_FILE, open_columns
+
+# Statistics per group, installed in each worker by the pool initializer
+_worker_stats = None
+
+
+def _init_worker(stats_by_group):
+    global _worker_stats
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker_stats = stats_by_group
+
+
+def render_figure(group, name, out_dir, formats):
+    """Render one figure of one group to every requested format; return timings"""
+    import matplotlib.pyplot as plt
+    from plot_water_quality import FIGURES
+
+    start = time.perf_counter()
+    fig = FIGURES[name](_worker_stats[group])
+    drawn = time.perf_counter()
+    group_dir = os.path.join(out_dir, group)
+    os.makedirs(group_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(group_dir, f'{name}.{fmt}')
+        fig.savefig(path, format=fmt, bbox_inches='tight')
+        paths.append(path)
+    plt.close(fig)
+    end = time.perf_counter()
+    return {'group': group, 'figure': name, 'paths': paths,
+            'build_s': drawn - start, 'save_s': end - drawn, 'total_s': end - start}
+
+
+def split_rows(store, column):
+    """Row indices per distinct value of a column (e.g. a site or date code)"""
+    values = np.asarray(store.column(column))
+    present = np.flatnonzero(~np.isnan(values))
+    keys, inverse = np.unique(values[present], return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(keys) + 1))
+    return {f'{column}={key:g}': present[order[bounds[i]:bounds[i + 1]]]
+            for i, key in enumerate(keys)}
+
+
+def build_report(data_path=DATA_FILE, out_dir='report', formats=('png',), figures=None,
+                 split_by=None, workers=None):
+    """Compute statistics once, then render all (group, figure) pairs in a process pool"""
+    from plot_water_quality import FIGURES, compute_statistics
+
+    figures = list(figures or FIGURES)
+    unknown = [name for name in figures if name not in FIGURES]
+    if unknown:
+        raise ValueError(f'unknown figures {unknown} (choose from {list(FIGURES)})')
+    store = open_columns(data_path)
+    start = time.perf_counter()
+    stats_by_group = {'all': compute_statistics(store)}
+    if split_by:
+        for group, rows in split_rows(store, split_by).items():
+            stats_by_group[group] = compute_statistics(store, rows)
+    stats_s = time.perf_counter() - start
+
+    tasks = [(group, name) for group in stats_by_group for name in figures]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(stats_by_group,)) as pool:
+        futures = [pool.submit(render_figure, group, name, out_dir, list(formats))
+                   for group, name in tasks]
+        timings = [future.result() for future in futures]
+
+    report = {
+        'data': data_path,
+        'statistics_s': stats_s,
+        'wall_s': time.perf_counter() - start,
+        'figures': timings,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'timings.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    from plot_water_quality import FIGURES
+
+    parser = argparse.ArgumentParser(description='Render all standard water quality figures headlessly')
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--out', default='report', help='output directory')
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--figures', nargs='+', choices=list(FIGURES), help='subset of figures to render')
+    parser.add_argument('--split-by', metavar='COLUMN',
+                        help='also render one set of figures per distinct value of COLUMN')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    report = build_report(args.data, args.out, args.formats, args.figures, args.split_by, args.workers)
+    print(f"Statistics computed in {report['statistics_s']:.3f}s")
+    for timing in report['figures']:
+        print(f"{timing['group']:20s} {timing['figure']:14s} {timing['total_s']:7.3f}s "
+              f"(build {timing['build_s']:.3f}s, save {timing['save_s']:.3f}s)")
+    print(f"Report written to {args.out}/ in {report['wall_s']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+# Live Streaming Ingestion of water quality samples
+import io
+import json
+import queue
+import socket
+import sys
+import threading
+import numpy as np
+from online_stats import ColumnSummary
+
+# Column order of water_potability.csv
+COLUMNS = ['ph', 'Hardness', 'Solids', 'Chloramines', 'Sulfate', 'Conductivity',
+           'Organic_carbon', 'Trihalomethanes', 'Turbidity', 'Potability']
+
+
+def parse_csv_lines(lines, header, columns=COLUMNS):
+    """Parse comma-separated lines into a (rows, len(columns)) float32 array
+
+    Like bad JSON records, malformed input never fails the chunk: lines with
+    too many fields are skipped and fields that are not numbers become NaN.
+    """
+    import pandas as pd
+
+    if not lines:
+        return np.empty((0, len(columns)), dtype=np.float32)
+    frame = pd.read_csv(io.StringIO(''.join(lines)), header=None, names=header,
+                        dtype=str, on_bad_lines='skip')
+    frame = frame.apply(pd.to_numeric, errors='coerce')
+    return frame.reindex(columns=columns).to_numpy(dtype=np.float32)
+
+
+def parse_json_line(line, columns=COLUMNS):
+    """Parse one JSON object record into a float32 row (missing keys become NaN)"""
+    record = json.loads(line)
+    row = [record.get(col) for col in columns]
+    return np.array([np.nan if v is None or v == '' else v for v in row], dtype=np.float32)
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer of float32 columns"""
+
+    def __init__(self, columns, capacity):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.index = {col: j for j, col in enumerate(self.columns)}
+        # Column-major storage so each column is a contiguous view
+        self.data = np.full((len(self.columns), capacity), np.nan, dtype=np.float32)
+        self.head = 0
+        self.size = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, rows):
+        """Append a (k, num_columns) chunk, overwriting the oldest rows when full"""
+        rows = np.asarray(rows, dtype=np.float32)
+        k = len(rows)
+        if k == 0:
+            return
+        self.total += k
+        if k >= self.capacity:
+            self.data[:] = rows[-self.capacity:].T
+            self.head = 0
+            self.size = self.capacity
+            return
+
+        end = self.head + k
+        if end <= self.capacity:
+            self.data[:, self.head:end] = rows.T
+        else:
+            first = self.capacity - self.head
+            self.data[:, self.head:] = rows[:first].T
+            self.data[:, :k - first] = rows[first:].T
+        self.head = end % self.capacity
+        self.size = min(self.size + k, self.capacity)
+
+    def column(self, name):
+        """View of the buffered values of one column (storage order, no copy)"""
+        return self.data[self.index[name], :self.size]
+
+
+class CsvTailSource:
+    """Tail a growing CSV file, returning newly appended rows in chunks"""
+
+    def __init__(self, path, chunk_rows=4096, columns=COLUMNS):
+        self.file = open(path, 'r', encoding='utf-8', newline='')
+        self.chunk_rows = chunk_rows
+        self.columns = columns
+        self.header = None
+        self._partial = ''
+
+    def _read_line(self):
+        """Next complete line, or None (a partially written line is kept for later)"""
+        line = self.file.readline()
+        if not line:
+            return None
+        line = self._partial + line
+        if not line.endswith('\n'):
+            self._partial = line
+            return None
+        self._partial = ''
+        return line
+
+    def read_chunk(self):
+        if self.header is None:
+            line = self._read_line()
+            if line is None:
+                return np.empty((0, len(self.columns)), dtype=np.float32)
+            self.header = line.strip().split(',')
+
+        lines = []
+        while len(lines) < self.chunk_rows:
+            line = self._read_line()
+            if line is None:
+                break
+            if line.strip():
+                lines.append(line)
+        return parse_csv_lines(lines, self.header, self.columns)
+
+    def close(self):
+        self.file.close()
+
+
+class LineSource:
+    """Newline-delimited records from a pipe or socket, read on a background thread
+
+    Each line is either a JSON object keyed by column name or comma-separated
+    values in column order.
+    """
+
+    def __init__(self, stream, chunk_rows=4096, columns=COLUMNS):
+        self.stream = stream
+        self.chunk_rows = chunk_rows
+        self.columns = columns
+        self.lines = queue.Queue()
+        self.reader = threading.Thread(target=self._read_lines, daemon=True)
+        self.reader.start()
+
+    def _read_lines(self):
+        for line in self.stream:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if line.strip():
+                self.lines.put(line if line.endswith('\n') else line + '\n')
+
+    def read_chunk(self):
+        csv_lines = []
+        json_rows = []
+        while len(csv_lines) + len(json_rows) < self.chunk_rows:
+            try:
+                line = self.lines.get_nowait()
+            except queue.Empty:
+                break
+            if line.lstrip().startswith('{'):
+                try:
+                    json_rows.append(parse_json_line(line, self.columns))
+                except ValueError:
+                    pass
+            else:
+                csv_lines.append(line)
+
+        rows = parse_csv_lines(csv_lines, self.columns, self.columns)
+        if json_rows:
+            rows = np.vstack([rows, np.array(json_rows, dtype=np.float32)])
+        return rows
+
+    def close(self):
+        self.stream.close()
+
+
+def open_source(spec, chunk_rows=4096):
+    """Open a stream source: '-' (stdin), 'tcp://host:port', 'unix:///path' or a CSV path"""
+    if spec == '-':
+        return LineSource(sys.stdin, chunk_rows)
+    if spec.startswith('tcp://'):
+        host, port = spec[len('tcp://'):].rsplit(':', 1)
+        sock = socket.create_connection((host, int(port)))
+        return LineSource(sock.makefile('rb'), chunk_rows)
+    if spec.startswith('unix://'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(spec[len('unix://'):])
+        return LineSource(sock.makefile('rb'), chunk_rows)
+    return CsvTailSource(spec, chunk_rows)
+
+
+class StreamingDataset:
+    """Ring-buffered live samples with running statistics over everything ingested"""
+
+    def __init__(self, source, capacity=100_000, columns=COLUMNS, bins=20):
+        self.source = source
+        self.columns = list(columns)
+        self.buffer = RingBuffer(self.columns, capacity)
+        self.summaries = {col: ColumnSummary(bins) for col in self.columns}
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def poll(self, max_chunks=8):
+        """Pull up to max_chunks chunks from the source; return the number of new rows"""
+        added = 0
+        for _ in range(max_chunks):
+            rows = self.source.read_chunk()
+            if not len(rows):
+                break
+            self.buffer.append(rows)
+            for j, col in enumerate(self.columns):
+                self.summaries[col].update(rows[:, j])
+            added += len(rows)
+        return added
+
+    def column(self, name):
+        return self.buffer.column(name)
+
+    def bounds(self, name):
+        """Running (min, max) of a column across all ingested samples"""
+        summary = self.summaries[name]
+        return summary.min, summary.max
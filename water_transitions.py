@@ -0,0 +1,140 @@
+# Transition Engine: tweens scatter points between layouts when the scene changes
+#
+# Each drawn point is one dataset row, so a point keeps its identity across
+# indicators and modes. Positions, sizes and RGBA colours live side by side in
+# one preallocated (N, 7) float32 buffer; every frame is a single eased
+# multiply-add over that buffer. The scene's other artists (lines, secondary
+# scatters) have no row identity; they fade in over the same frames instead.
+import numpy as np
+
+
+def smoothstep(t):
+    return t * t * (3 - 2 * t)
+
+
+def ease_in_out_cubic(t):
+    return np.where(t < 0.5, 4 * t ** 3, 1 - (-2 * t + 2) ** 3 / 2)
+
+
+EASINGS = {
+    'linear': lambda t: t,
+    'smoothstep': smoothstep,
+    'cubic': ease_in_out_cubic,
+}
+
+
+class PointTransition:
+    """Tween one scatter artist from a captured old state to its freshly drawn state
+
+    Rows present in both layouts glide from their old position, size and
+    colour; rows that are new grow in from nothing at their new position.
+    stagger spreads the start times over the points (0 moves them all at once).
+    Artists passed as fade go from transparent to their drawn alpha.
+    """
+
+    def __init__(self, frames=20, easing='smoothstep', stagger=0.3):
+        self.frames = frames
+        self.easing = EASINGS[easing]
+        self.stagger = stagger
+        self.frame = 0
+        self.artist = None
+        self.fade = []  # (artist, drawn alpha)
+        self._capacity = 0
+
+    @staticmethod
+    def capture(artist, rows):
+        """Snapshot (rows, offsets, sizes, colours) of a scatter, or None if there is none"""
+        if artist is None or rows is None:
+            return None
+        offsets = np.asarray(artist.get_offsets(), dtype=np.float32)
+        n = len(offsets)
+        if n == 0 or len(rows) != n:
+            return None
+        sizes = np.broadcast_to(np.asarray(artist.get_sizes(), dtype=np.float32), (n,))
+        colors = np.broadcast_to(np.asarray(artist.get_facecolors(), dtype=np.float32), (n, 4))
+        return np.asarray(rows), offsets.copy(), sizes.copy(), colors.copy()
+
+    def _reserve(self, n):
+        """Grow the preallocated buffers only when a larger layout arrives"""
+        if n > self._capacity:
+            self._capacity = max(n, 2 * self._capacity)
+            self._start = np.empty((self._capacity, 7), dtype=np.float32)
+            self._delta = np.empty((self._capacity, 7), dtype=np.float32)
+            self._out = np.empty((self._capacity, 7), dtype=np.float32)
+            self._delay = np.empty(self._capacity, dtype=np.float32)
+            self._t = np.empty(self._capacity, dtype=np.float32)
+
+    def start(self, previous, artist, rows, fade=()):
+        """Begin tweening artist (already drawn in its final state) from a captured state"""
+        self.cancel()
+        self.fade = [(a, a.get_alpha()) for a in fade]
+        self.frame = 0
+        target = self.capture(artist, rows)
+        if previous is not None and target is not None:
+            self._tween(previous, target, artist)
+        if self.active:
+            self.step()
+
+    def _tween(self, previous, target, artist):
+        old_rows, old_offsets, old_sizes, old_colors = previous
+        rows, offsets, sizes, colors = target
+        n = len(rows)
+        self._reserve(n)
+        start, delta, out = self._start[:n], self._delta[:n], self._out[:n]
+
+        # Final state, then each row's starting state looked up by row identity
+        out[:, :2], out[:, 2], out[:, 3:] = offsets, sizes, colors
+        order = np.argsort(old_rows, kind='stable')
+        pos = np.minimum(np.searchsorted(old_rows[order], rows), len(order) - 1)
+        source = order[pos]
+        found = old_rows[source] == rows
+        start[:] = out
+        start[found, :2] = old_offsets[source[found]]
+        start[found, 2] = old_sizes[source[found]]
+        start[found, 3:] = old_colors[source[found]]
+        start[~found, 2] = 0.0  # new rows grow in from nothing
+        np.subtract(out, start, out=delta)
+
+        # Start times spread evenly over the points, as a fraction of the tween
+        self._delay[:n] = np.linspace(0, self.stagger, n, dtype=np.float32)
+        self.n = n
+        self.artist = artist
+
+    def cancel(self):
+        """Stop tweening, leaving the artist in whatever state it was last given (faded artists at full alpha)"""
+        for artist, alpha in self.fade:
+            artist.set_alpha(alpha)
+        self.fade = []
+        self.artist = None
+
+    @property
+    def active(self):
+        return self.artist is not None or bool(self.fade)
+
+    @property
+    def artists(self):
+        """The artists step() changes"""
+        return ([] if self.artist is None else [self.artist]) + [artist for artist, _ in self.fade]
+
+    def step(self):
+        """Advance one frame and push the interpolated state to the artists"""
+        progress = min(1.0, self.frame / self.frames) if self.frames else 1.0
+        out = None
+        if self.artist is not None:
+            n = self.n
+            t = self._t[:n]
+            np.clip(progress * (1 + self.stagger) - self._delay[:n], 0, 1, out=t)
+            out = self._out[:n]
+            np.multiply(self._delta[:n], self.easing(t)[:, None], out=out)
+            out += self._start[:n]
+
+            self.artist.set_offsets(out[:, :2])
+            self.artist.set_sizes(out[:, 2])
+            self.artist.set_facecolors(out[:, 3:])
+        level = float(self.easing(progress))
+        for artist, alpha in self.fade:
+            artist.set_alpha((1.0 if alpha is None else alpha) * level)
+        self.frame += 1
+        if progress >= 1.0:
+            self.cancel()
+        return out
@@ -0,0 +1,485 @@
+# Web Renderer: the art modes served to browsers over a local WebSocket
+#
+# The art-mode math (art_modes.py) runs once per scene on the server; every
+# viewer of the same indicator and mode receives the same quantized binary
+# frames (art_frames.py), encoded once per tick and written to all of them.
+# A new viewer, or one whose socket has fallen behind, gets a keyframe, one
+# delta and then second-order deltas, all zlib-compressed (a steady motion's
+# second-order deltas are mostly zeros, about 4-9x smaller than a keyframe).
+# Viewers switch scenes with JSON text messages:
+#
+#   {"indicator": "Sulfate", "mode": "energy"}
+#
+# The WebSocket layer (RFC 6455, no extensions) uses only the standard
+# library. `--clients N` runs N local stand-in viewers against the server
+# instead of waiting for browsers, and reports frame rate and bandwidth.
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import time
+import numpy as np
+from art_frames import DELTA, DELTA2, INDICATOR_COLORS, KEYFRAME, FrameDecoder, FrameEncoder, compress, palette_rgb
+from art_modes import ModeEngine
+from water_data import DATA_FILE, open_columns
+from water_embedding import EmbeddingWorker
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_MESSAGE = 1 << 16  # viewers only send small JSON messages
+MAX_BACKLOG = 4 << 20  # bytes queued on a viewer's socket before it skips frames
+
+def ws_frame(opcode, payload):
+    """One unmasked, unfragmented server-to-client WebSocket frame"""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def ws_read_frame(reader, max_size=MAX_MESSAGE):
+    """(fin, opcode, payload) of the next WebSocket frame, unmasked"""
+    first, second = await reader.readexactly(2)
+    n = second & 0x7F
+    if n == 126:
+        n, = struct.unpack('!H', await reader.readexactly(2))
+    elif n == 127:
+        n, = struct.unpack('!Q', await reader.readexactly(8))
+    if max_size is not None and n > max_size:
+        raise ConnectionError(f'message of {n} bytes is too large')
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(n)
+    if mask:
+        payload = (np.frombuffer(payload, np.uint8) ^ np.resize(np.frombuffer(mask, np.uint8), n)).tobytes()
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+async def ws_read_message(reader, writer):
+    """(opcode, payload) of the next complete data message; answers pings; None on close"""
+    parts, message_opcode = [], None
+    while True:
+        fin, opcode, payload = await ws_read_frame(reader)
+        if opcode == OP_CLOSE:
+            return None
+        if opcode == OP_PING:
+            writer.write(ws_frame(OP_PONG, payload))
+            continue
+        if opcode == OP_PONG:
+            continue
+        if opcode != OP_CONTINUATION:
+            message_opcode = opcode
+        parts.append(payload)
+        if sum(map(len, parts)) > MAX_MESSAGE:
+            raise ConnectionError('message is too large')
+        if fin:
+            return message_opcode, b''.join(parts)
+
+
+async def read_http_request(reader):
+    """Request line and lower-cased headers of an HTTP request"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+class Viewer:
+    """One connected browser (or stand-in client)"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.scene = None
+        self.needs_keyframe = True
+        self.needs_delta = False  # second-order deltas need one plain delta after the keyframe
+
+    def lagging(self):
+        return self.writer.transport.get_write_buffer_size() > MAX_BACKLOG
+
+
+class Scene:
+    """One indicator and mode, advanced once per tick for all of its viewers"""
+
+    def __init__(self, server, indicator, mode):
+        self.indicator = indicator
+        self.engine = ModeEngine(server.family)
+        self.mode = self.engine.activate(mode, server.normalized(indicator), np.random.default_rng(server.seed))
+        if hasattr(self.mode, 'wait_for'):
+            self.mode.wait_for(server.embedding_future())
+        self.encoder = FrameEncoder()
+        self.encoder.update(*self.mode.as_points(self.engine.step()))
+        self.packed = {}
+        self.viewers = set()
+        color = INDICATOR_COLORS.get(indicator, '#888888')
+        self.info = json.dumps({
+            'type': 'scene', 'indicator': indicator, 'mode': mode, 'title': f'{indicator} - {self.mode.title}',
+            'palette': palette_rgb(self.mode.palette, color).ravel().tolist(),
+        }).encode()
+
+    def advance(self):
+        """Step the mode; its frames are encoded and compressed on first request"""
+        self.encoder.update(*self.mode.as_points(self.engine.step()))
+        self.packed = {}
+
+    def frame(self, kind):
+        """The current frame as a compressed keyframe, delta or second-order delta"""
+        if kind not in self.packed:
+            encode = {KEYFRAME: self.encoder.keyframe, DELTA: self.encoder.delta, DELTA2: self.encoder.delta2}[kind]
+            self.packed[kind] = compress(encode())
+        return self.packed[kind]
+
+
+class ArtServer:
+    """Serves the page at / and the frame stream at /ws"""
+
+    def __init__(self, data_path=DATA_FILE, family='enhanced', fps=20, seed=0):
+        self.store = open_columns(data_path)
+        self.indicators = [col for col in self.store.columns if col != 'Potability']
+        self.family = family
+        self.modes = ModeEngine(family).modes
+        self.fps = fps
+        self.seed = seed
+        self.scenes = {}
+        self.viewers = set()
+        self._normalized = {}
+        self._embedding = None
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def normalized(self, indicator):
+        if indicator not in self._normalized:
+            data = np.asarray(self.store.column(indicator, fill='median'), dtype=np.float64)
+            self._normalized[indicator] = (data - data.min()) / (data.max() - data.min() + 1e-8)
+        return self._normalized[indicator]
+
+    def embedding_future(self):
+        if self._embedding is None:
+            X = np.column_stack([self.store.column(col, fill='median') for col in self.indicators])
+            self._embedding = EmbeddingWorker().submit(X)
+        return self._embedding
+
+    def hello(self):
+        return json.dumps({'type': 'hello', 'indicators': self.indicators,
+                           'modes': [[name, mode.label] for name, mode in self.modes.items()]})
+
+    def join(self, viewer, indicator, mode):
+        """Move a viewer to the scene of indicator and mode (created on first use)"""
+        if indicator not in self.indicators or mode not in self.modes:
+            raise ValueError(f'unknown scene {indicator!r}/{mode!r}')
+        if viewer.scene is not None:
+            viewer.scene.viewers.discard(viewer)
+        key = (indicator, mode)
+        if key not in self.scenes:
+            self.scenes[key] = Scene(self, indicator, mode)
+        viewer.scene = self.scenes[key]
+        viewer.scene.viewers.add(viewer)
+        viewer.needs_keyframe = True
+        viewer.writer.write(ws_frame(OP_TEXT, viewer.scene.info))
+
+    def leave(self, viewer):
+        if viewer.scene is not None:
+            viewer.scene.viewers.discard(viewer)
+        self.viewers.discard(viewer)
+
+    def send(self, viewer, data):
+        viewer.writer.write(ws_frame(OP_BINARY, data))
+        self.frames_sent += 1
+        self.bytes_sent += len(data)
+
+    def tick(self):
+        """Advance every watched scene one frame and send it to its viewers"""
+        for key, scene in list(self.scenes.items()):
+            if not scene.viewers:
+                del self.scenes[key]  # nobody is watching: free the layout
+                continue
+            scene.advance()
+            for viewer in scene.viewers:
+                if viewer.lagging():
+                    viewer.needs_keyframe = True  # skip frames until the socket drains
+                elif viewer.needs_keyframe:
+                    self.send(viewer, scene.frame(KEYFRAME))
+                    viewer.needs_keyframe = False
+                    viewer.needs_delta = True
+                else:
+                    self.send(viewer, scene.frame(DELTA if viewer.needs_delta else DELTA2))
+                    viewer.needs_delta = False
+
+    async def run_ticks(self):
+        interval = 1 / self.fps
+        next_tick = time.perf_counter()
+        while True:
+            self.tick()
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    async def handle(self, reader, writer):
+        viewer = None
+        try:
+            request, headers = await read_http_request(reader)
+            path = request.split()[1] if len(request.split()) > 1 else '/'
+            if headers.get('upgrade', '').lower() != 'websocket':
+                if path != '/':
+                    writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n')
+                else:
+                    body = INDEX_HTML.encode()
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n'
+                                 b'Content-Length: %d\r\n\r\n' % len(body) + body)
+                await writer.drain()
+                return
+            writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                          f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n").encode())
+            viewer = Viewer(writer)
+            self.viewers.add(viewer)
+            writer.write(ws_frame(OP_TEXT, self.hello().encode()))
+            self.join(viewer, self.indicators[0], next(iter(self.modes)))
+            while True:
+                message = await ws_read_message(reader, writer)
+                if message is None:
+                    break
+                opcode, payload = message
+                if opcode != OP_TEXT:
+                    continue
+                try:
+                    request = json.loads(payload)
+                    scene = viewer.scene
+                    self.join(viewer, request.get('indicator', scene.indicator), request.get('mode', scene.mode.name))
+                except ValueError as e:
+                    writer.write(ws_frame(OP_TEXT, json.dumps({'type': 'error', 'message': str(e)}).encode()))
+            writer.write(ws_frame(OP_CLOSE, b''))
+        except (asyncio.IncompleteReadError, ConnectionError, KeyError):
+            pass
+        finally:
+            if viewer is not None:
+                self.leave(viewer)
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        ticks = asyncio.create_task(self.run_ticks())
+        return server, ticks
+
+
+class StandInClient:
+    """Minimal WebSocket viewer for offline tests and load runs (decodes every frame)"""
+
+    def __init__(self):
+        self.decoder = FrameDecoder()
+        self.scene = None
+        self.frames = 0
+        self.bytes = 0
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(np.random.default_rng().bytes(16)).decode()
+        self.writer.write((f'GET /ws HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n'
+                           f'Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n'
+                           'Sec-WebSocket-Version: 13\r\n\r\n').encode())
+        status, headers = await read_http_request(self.reader)
+        if ' 101 ' not in status or headers.get('sec-websocket-accept') != accept_key(key):
+            raise ConnectionError(f'handshake failed: {status}')
+
+    def request(self, indicator=None, mode=None):
+        """Ask for another scene (masked client text frame, as browsers send)"""
+        payload = json.dumps({k: v for k, v in (('indicator', indicator), ('mode', mode)) if v}).encode()
+        mask = np.random.default_rng().bytes(4)
+        masked = (np.frombuffer(payload, np.uint8) ^ np.resize(np.frombuffer(mask, np.uint8), len(payload))).tobytes()
+        self.writer.write(struct.pack('!BB', 0x80 | OP_TEXT, 0x80 | len(payload)) + mask + masked)
+
+    async def receive(self):
+        """Next message: decoded (xy, sizes, colours) for frames, a dict for text"""
+        while True:
+            fin, opcode, payload = await ws_read_frame(self.reader, max_size=None)
+            if opcode == OP_BINARY:
+                self.frames += 1
+                self.bytes += len(payload)
+                return self.decoder.decode(payload)
+            if opcode == OP_TEXT:
+                message = json.loads(payload)
+                if message['type'] == 'scene':
+                    self.scene = message
+                return message
+            if opcode == OP_CLOSE:
+                return None
+
+    def close(self):
+        self.writer.close()
+
+
+async def run_stand_ins(server, port, clients, seconds):
+    """Connect stand-in viewers spread over a few scenes and measure what they receive"""
+    async def viewer(i):
+        client = StandInClient()
+        await client.connect('127.0.0.1', port)
+        # Spread the viewers over the first three indicators and every mode
+        modes = list(server.modes)
+        client.request(server.indicators[i % 3], modes[i % len(modes)])
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            try:
+                await asyncio.wait_for(client.receive(), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+        client.close()
+        return client
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(viewer(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    frames = sum(c.frames for c in results)
+    received = sum(c.bytes for c in results)
+    print(f'{clients} viewers, {len(server.scenes)} scenes, {elapsed:.1f}s: '
+          f'{frames / elapsed / clients:.1f} frames/s per viewer, '
+          f'{received / elapsed / 1e6:.2f} MB/s total, {received / max(frames, 1):,.0f} bytes/frame')
+
+
+async def main_async(args):
+    server = ArtServer(args.data, args.family, args.fps, args.seed)
+    tcp_server, ticks = await server.serve(args.host, args.port)
+    port = tcp_server.sockets[0].getsockname()[1]
+    if args.clients:
+        await run_stand_ins(server, port, args.clients, args.seconds)
+        ticks.cancel()
+        tcp_server.close()
+        return
+    print(f'Serving the {args.family} art modes at http://{args.host}:{port}/ (Ctrl+C to stop)')
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the art modes to browsers over a local WebSocket')
+    parser.add_argument('--data', default=DATA_FILE, help='water quality CSV file')
+    parser.add_argument('--family', default='enhanced', choices=['enhanced', 'classic'], help='set of art modes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0 picks a free port')
+    parser.add_argument('--fps', type=float, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clients', type=int, metavar='N',
+                        help='run N local stand-in viewers for --seconds and report throughput, then exit')
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        pass
+
+
+# Browser client: inflates and decodes key/delta frames into typed arrays and draws them on a canvas
+INDEX_HTML = r'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>AquaArt Lab</title>
+<style>
+body { margin: 0; background: #0a0a1a; color: white; font: 14px sans-serif; }
+#bar { padding: 6px; } button { margin: 2px; background: #444; color: white; border: 0; padding: 4px 8px; }
+button.on { background: #FFD700; color: black; } canvas { display: block; width: 100vw; height: calc(100vh - 80px); }
+</style></head>
+<body><div id="bar"><div id="indicators"></div><div id="modes"></div></div>
+<canvas id="art"></canvas><div id="title" style="position:fixed;top:90px;width:100%;text-align:center"></div>
+<script>
+const canvas = document.getElementById('art'), ctx = canvas.getContext('2d');
+const ws = new WebSocket(`ws://${location.host}/ws`);
+ws.binaryType = 'arraybuffer';
+let xy = null, sizes = null, colors = null, frame = -1, palette = [], scene = {};
+let step = null;  // last applied difference: [xy, sizes, colours]
+let inflating = Promise.resolve();  // frames inflate asynchronously but apply in arrival order
+
+function buttons(id, items, key) {
+  const div = document.getElementById(id);
+  div.innerHTML = '';
+  for (const [value, label] of items) {
+    const b = document.createElement('button');
+    b.textContent = label; b.dataset.value = value;
+    b.onclick = () => ws.send(JSON.stringify({[key]: value}));
+    div.appendChild(b);
+  }
+}
+
+async function inflate(data) {
+  const bytes = new Uint8Array(data);
+  if (bytes[0] !== 0x80) return data;
+  const stream = new Blob([bytes.subarray(1)]).stream().pipeThrough(new DecompressionStream('deflate'));
+  return await new Response(stream).arrayBuffer();
+}
+
+function apply(data) {
+  const view = new DataView(data), kind = view.getUint8(0), n = view.getUint32(8, true);
+  const dxy = new Int16Array(data, 12, 2 * n);
+  const ds = new Uint8Array(data, 12 + 4 * n, n), dc = new Uint8Array(data, 12 + 5 * n, n);
+  if (kind === 0) {
+    xy = Int16Array.from(dxy); sizes = Uint8Array.from(ds); colors = Uint8Array.from(dc); step = null;
+  } else if (xy !== null && xy.length === 2 * n) {
+    if (kind === 1) {
+      step = [Int16Array.from(dxy), Uint8Array.from(ds), Uint8Array.from(dc)];
+    } else if (step !== null) {
+      // Second-order delta: the change of the previous difference
+      for (let i = 0; i < 2 * n; i++) step[0][i] += dxy[i];
+      for (let i = 0; i < n; i++) { step[1][i] += ds[i]; step[2][i] += dc[i]; }
+    } else return;
+    // Typed arrays wrap on overflow, exactly like the server's delta arithmetic
+    for (let i = 0; i < 2 * n; i++) xy[i] += step[0][i];
+    for (let i = 0; i < n; i++) { sizes[i] += step[1][i]; colors[i] += step[2][i]; }
+  }
+  frame = view.getUint32(4, true);
+}
+
+ws.onmessage = (event) => {
+  if (typeof event.data === 'string') {
+    const msg = JSON.parse(event.data);
+    if (msg.type === 'hello') {
+      buttons('indicators', msg.indicators.map(i => [i, i]), 'indicator');
+      buttons('modes', msg.modes, 'mode');
+    } else if (msg.type === 'scene') {
+      inflating = inflating.then(() => { xy = null; step = null; });
+      scene = msg;
+      palette = [];
+      for (let i = 0; i < 256; i++) {
+        palette.push(`rgb(${msg.palette[3*i]},${msg.palette[3*i+1]},${msg.palette[3*i+2]})`);
+      }
+      document.getElementById('title').textContent = msg.title;
+      for (const b of document.querySelectorAll('button')) {
+        b.classList.toggle('on', b.dataset.value === msg.indicator || b.dataset.value === msg.mode);
+      }
+    }
+    return;
+  }
+  const pending = inflate(event.data);
+  inflating = inflating.then(() => pending).then(apply);
+};
+
+function draw() {
+  const w = canvas.clientWidth, h = canvas.clientHeight;
+  if (canvas.width !== w || canvas.height !== h) { canvas.width = w; canvas.height = h; }
+  ctx.fillStyle = '#0a0a1a'; ctx.fillRect(0, 0, w, h);
+  if (xy !== null) {
+    // Scene units: x in [-10, 10], y in [-8, 8]; sizes are 8 x the marker diameter in points
+    const scale = Math.min(w / 20, h / 16), px = scale / 1000, pt = h / 720 / 16;
+    ctx.globalAlpha = 0.8;
+    const n = sizes.length, big = n < 20000;
+    for (let i = 0; i < n; i++) {
+      const x = w / 2 + xy[2 * i] * px, y = h / 2 - xy[2 * i + 1] * px, r = Math.max(0.5, sizes[i] * pt);
+      ctx.fillStyle = palette[colors[i]];
+      if (big) { ctx.beginPath(); ctx.arc(x, y, r, 0, 2 * Math.PI); ctx.fill(); }
+      else ctx.fillRect(x - r, y - r, 2 * r, 2 * r);
+    }
+    ctx.globalAlpha = 1;
+  }
+  requestAnimationFrame(draw);
+}
+requestAnimationFrame(draw);
+</script></body></html>
+'''
+
+if __name__ == '__main__':
+    main()